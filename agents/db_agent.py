@@ -1,10 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
 import re
-from datetime import datetime, timedelta
+from datetime import datetime
 from agents.base_agent import BaseAgent
 from tools.database_tool import DatabaseTool
+from tools.meeting_query import (
+    MeetingFilter, query_compiler, is_plain_period, describe_filter, parse_aggregation
+)
 import logging
-import dateparser
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +16,9 @@ class DatabaseAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="DatabaseAgent", description="Handles database queries for meetings")
         self.db_tool = DatabaseTool()
+        # Dates, keywords, people and places are parsed by the query compiler
         self.patterns = {
-            'today': r'(today|now|current|right now)',
-            'tomorrow': r'(tomorrow|next day|day after)',
-            'this_week': r'(this week|current week|week)',
-            'next_week': r'(next week|following week|upcoming week)',
-            'search': r'(search|find|look for|query)\s+(.+)',
-            'all': r'(all|every|list|show)\s+meetings',
-            'specific_date': r'(on|for|at)\s+(\d{1,2}[/-]\d{1,2}[/-]\d{4}|\d{4}[/-]\d{1,2}[/-]\d{1,2})'
+            'all': r'(all|every|list|show)\s+meetings'
         }
     
     def can_handle(self, query: str) -> bool:
@@ -41,48 +38,58 @@ class DatabaseAgent(BaseAgent):
         try:
             query_lower = query.lower()
             
-            # Route to appropriate handler
-            if re.search(self.patterns['today'], query_lower):
-                meetings = self.db_tool.get_meetings_today()
-                response = self._format_today_response(meetings)
-                
-            elif re.search(self.patterns['tomorrow'], query_lower):
-                meetings = self.db_tool.get_meetings_tomorrow()
-                response = self._format_tomorrow_response(meetings)
-                
-            elif re.search(self.patterns['next_week'], query_lower):
-                meetings = self.db_tool.get_meetings_next_week()
-                response = self._format_next_week_response(meetings)
-                
-            elif re.search(self.patterns['all'], query_lower):
-                meetings = self.db_tool.get_all_meetings()
-                response = self._format_all_response(meetings)
-                
-            elif match := re.search(self.patterns['search'], query_lower):
-                keyword = match.group(2)
-                meetings = self.db_tool.search_meetings(keyword)
-                response = self._format_search_response(meetings, keyword)
-                
-            elif match := re.search(self.patterns['specific_date'], query_lower):
-                date_str = match.group(2)
-                date = dateparser.parse(date_str)
-                if date:
-                    meetings = self.db_tool.get_meetings_by_date(date)
-                    response = self._format_date_response(meetings, date)
+            aggregation = parse_aggregation(query)
+            if aggregation:
+                return self._process_stats(*aggregation)
+            
+            try:
+                meeting_filter = query_compiler.compile(query)
+            except ValueError:
+                meeting_filter = None
+            
+            # Plain day/week agendas keep going through the agenda cache
+            if meeting_filter is None:
+                response = "Could not understand the date. Please try again."
+                meetings = []
+            
+            elif is_plain_period(meeting_filter):
+                if meeting_filter.period == 'today':
+                    meetings = self.db_tool.get_meetings_today()
+                    response = self._format_today_response(meetings)
+                elif meeting_filter.period == 'tomorrow':
+                    meetings = self.db_tool.get_meetings_tomorrow()
+                    response = self._format_tomorrow_response(meetings)
+                elif meeting_filter.period == 'next_week':
+                    meetings = self.db_tool.get_meetings_next_week()
+                    response = self._format_next_week_response(meetings)
+                else:
+                    meetings = self.db_tool.get_meetings_by_date(meeting_filter.start)
+                    response = self._format_date_response(meetings, meeting_filter.start)
+            
+            elif meeting_filter == MeetingFilter():
+                if re.search(self.patterns['all'], query_lower):
+                    meetings = self.db_tool.get_all_meetings()
+                    response = self._format_all_response(meetings)
                 else:
-                    response = "Could not understand the date. Please try again."
-                    meetings = []
+                    # Default: show today's meetings
+                    meetings = self.db_tool.get_meetings_today()
+                    response = self._format_today_response(meetings)
+            
+            elif meeting_filter == MeetingFilter(keywords=meeting_filter.keywords):
+                meetings = self.db_tool.query_meetings(meeting_filter)
+                response = self._format_search_response(meetings, " ".join(meeting_filter.keywords))
+            
             else:
-                # Default: show today's meetings
-                meetings = self.db_tool.get_meetings_today()
-                response = self._format_today_response(meetings)
+                # Compound questions run as one filtered query
+                meetings = self.db_tool.query_meetings(meeting_filter)
+                response = self._format_filter_response(meetings, meeting_filter)
             
             # Determine confidence
             confidence = 0.9 if meetings else 0.6
             
             return {
                 "success": True,
-                "data": meetings,
+                "data": [meeting.as_dict() for meeting in meetings],
                 "response": response,
                 "agent": self.name,
                 "confidence": confidence,
@@ -97,19 +104,107 @@ class DatabaseAgent(BaseAgent):
                 "agent": self.name
             }
     
+    def process_filter(self, meeting_filter: MeetingFilter) -> Dict[str, Any]:
+        """Answer an already-built filter, e.g. from API query parameters"""
+        meetings = self.db_tool.query_meetings(meeting_filter)
+        return {
+            "success": True,
+            "data": [meeting.as_dict() for meeting in meetings],
+            "response": self._format_filter_response(meetings, meeting_filter),
+            "agent": self.name,
+            "confidence": 0.9 if meetings else 0.6,
+            "count": len(meetings)
+        }
+    
+    def stream_query(self, query: str) -> Optional[Iterator[Dict[str, Any]]]:
+        """Answer a listing question as a stream of events, one per meeting.
+        
+        Emits "start", then "meeting" events as rows are read, then "end" (or
+        "error"). Returns None for questions that are not plain listings
+        (analytics, unparseable dates), which should go through process().
+        """
+        if parse_aggregation(query):
+            return None
+        try:
+            meeting_filter = query_compiler.compile(query)
+        except ValueError:
+            return None
+        
+        if meeting_filter == MeetingFilter():
+            if re.search(self.patterns['all'], query.lower()):
+                return self.stream_filter(meeting_filter, "All meetings")
+            meeting_filter = query_compiler.compile("today")
+        
+        title = f"Meetings {describe_filter(meeting_filter)}".strip()
+        if is_plain_period(meeting_filter):
+            # Cached agendas are already in memory
+            if meeting_filter.period == 'next_week':
+                meetings = self.db_tool.get_meetings_next_week()
+            else:
+                meetings = self.db_tool.get_meetings_by_date(meeting_filter.start)
+            return self._stream_events(iter(meetings), title)
+        return self.stream_filter(meeting_filter, title)
+    
+    def stream_filter(self, meeting_filter: MeetingFilter, title: str) -> Iterator[Dict[str, Any]]:
+        """Stream a filter's meetings straight from a server-side cursor"""
+        return self._stream_events(self.db_tool.iter_filtered_meetings(meeting_filter), title)
+    
+    def _stream_events(self, meetings: Iterator, title: str) -> Iterator[Dict[str, Any]]:
+        yield {"event": "start", "agent": self.name, "title": title}
+        count = 0
+        try:
+            for meeting in meetings:
+                count += 1
+                yield {
+                    "event": "meeting",
+                    "data": meeting.as_dict(),
+                    "text": self._format_meeting_line(count, meeting)
+                }
+        except Exception as e:
+            logger.error(f"Error streaming meetings: {e}")
+            yield {"event": "error", "error": f"Failed to stream meetings: {str(e)}", "count": count}
+            return
+        
+        summary = f"{title}: {count} meeting(s)." if count else f"{title}: none found."
+        yield {"event": "end", "count": count, "response": summary}
+    
+    def _process_stats(self, group_by: Optional[str], rank_by: str, filter_question: str) -> Dict[str, Any]:
+        """Answer analytics questions with a SQL-side aggregation"""
+        try:
+            meeting_filter = query_compiler.compile(filter_question)
+        except ValueError:
+            meeting_filter = MeetingFilter()
+        
+        stats = self.db_tool.get_meeting_stats(meeting_filter, group_by, rank_by)
+        if not stats.get("success"):
+            return {
+                "success": False,
+                "error": f"Failed to compute meeting stats: {stats.get('error')}",
+                "agent": self.name
+            }
+        
+        return {
+            "success": True,
+            "data": stats,
+            "response": self._format_stats_response(stats, meeting_filter),
+            "agent": self.name,
+            "confidence": 0.9 if stats["total_meetings"] else 0.6,
+            "count": stats["total_meetings"]
+        }
+    
     def _format_today_response(self, meetings: list) -> str:
         if not meetings:
             return "No meetings scheduled for today."
         
         response = f"You have {len(meetings)} meeting(s) today:\n\n"
         for i, meeting in enumerate(meetings, 1):
-            time = datetime.fromisoformat(meeting['scheduled_time']).strftime("%I:%M %p")
-            response += f"{i}. **{meeting['title']}**\n"
+            time = meeting.scheduled_time.strftime("%I:%M %p")
+            response += f"{i}. **{meeting.title}**\n"
             response += f"   Time: {time}\n"
-            response += f"   Location: {meeting['location'] or 'Not specified'}\n"
-            response += f"   Duration: {meeting['duration_minutes']} minutes\n"
-            if meeting['description']:
-                response += f"   Description: {meeting['description'][:100]}...\n"
+            response += f"   Location: {meeting.location or 'Not specified'}\n"
+            response += f"   Duration: {meeting.duration_minutes} minutes\n"
+            if meeting.description:
+                response += f"   Description: {meeting.description[:100]}...\n"
             response += "\n"
         
         return response
@@ -120,10 +215,10 @@ class DatabaseAgent(BaseAgent):
         
         response = f"You have {len(meetings)} meeting(s) tomorrow:\n\n"
         for i, meeting in enumerate(meetings, 1):
-            time = datetime.fromisoformat(meeting['scheduled_time']).strftime("%I:%M %p")
-            response += f"{i}. **{meeting['title']}**\n"
+            time = meeting.scheduled_time.strftime("%I:%M %p")
+            response += f"{i}. **{meeting.title}**\n"
             response += f"   Time: {time}\n"
-            response += f"   Location: {meeting['location'] or 'Not specified'}\n"
+            response += f"   Location: {meeting.location or 'Not specified'}\n"
             response += "\n"
         
         return response
@@ -136,7 +231,7 @@ class DatabaseAgent(BaseAgent):
         # Group by day
         meetings_by_day = {}
         for meeting in meetings:
-            meeting_time = datetime.fromisoformat(meeting['scheduled_time'])
+            meeting_time = meeting.scheduled_time
             day = meeting_time.strftime("%A, %B %d")
             if day not in meetings_by_day:
                 meetings_by_day[day] = []
@@ -145,8 +240,8 @@ class DatabaseAgent(BaseAgent):
         for day, day_meetings in meetings_by_day.items():
             response += f"**{day}**:\n"
             for meeting in day_meetings:
-                time = datetime.fromisoformat(meeting['scheduled_time']).strftime("%I:%M %p")
-                response += f"  • {meeting['title']} at {time}\n"
+                time = meeting.scheduled_time.strftime("%I:%M %p")
+                response += f"  • {meeting.title} at {time}\n"
             response += "\n"
         
         return response
@@ -158,10 +253,10 @@ class DatabaseAgent(BaseAgent):
         response = f"Found {len(meetings)} meeting(s) in total:\n\n"
         # Group by status or date
         for i, meeting in enumerate(meetings[:10], 1):  # Limit to first 10
-            time = datetime.fromisoformat(meeting['scheduled_time']).strftime("%Y-%m-%d %I:%M %p")
-            response += f"{i}. **{meeting['title']}**\n"
+            time = meeting.scheduled_time.strftime("%Y-%m-%d %I:%M %p")
+            response += f"{i}. **{meeting.title}**\n"
             response += f"   Scheduled: {time}\n"
-            response += f"   Status: {meeting['status'].title()}\n"
+            response += f"   Status: {meeting.status.title()}\n"
             response += "\n"
         
         if len(meetings) > 10:
@@ -175,10 +270,10 @@ class DatabaseAgent(BaseAgent):
         
         response = f"Found {len(meetings)} meeting(s) matching '{keyword}':\n\n"
         for i, meeting in enumerate(meetings, 1):
-            time = datetime.fromisoformat(meeting['scheduled_time']).strftime("%Y-%m-%d %I:%M %p")
-            response += f"{i}. **{meeting['title']}**\n"
+            time = meeting.scheduled_time.strftime("%Y-%m-%d %I:%M %p")
+            response += f"{i}. **{meeting.title}**\n"
             response += f"   Time: {time}\n"
-            response += f"   Description: {meeting['description'][:150] if meeting['description'] else 'No description'}...\n"
+            response += f"   Description: {meeting.description[:150] if meeting.description else 'No description'}...\n"
             response += "\n"
         
         return response
@@ -191,10 +286,67 @@ class DatabaseAgent(BaseAgent):
         
         response = f"You have {len(meetings)} meeting(s) on {date_str}:\n\n"
         for i, meeting in enumerate(meetings, 1):
-            time = datetime.fromisoformat(meeting['scheduled_time']).strftime("%I:%M %p")
-            response += f"{i}. **{meeting['title']}**\n"
+            time = meeting.scheduled_time.strftime("%I:%M %p")
+            response += f"{i}. **{meeting.title}**\n"
+            response += f"   Time: {time}\n"
+            response += f"   Location: {meeting.location or 'Not specified'}\n"
+            response += "\n"
+        
+        return response
+    
+    def _format_filter_response(self, meetings: list, meeting_filter: MeetingFilter) -> str:
+        status = meeting_filter.status if meeting_filter.status != "scheduled" else None
+        subject = f"{status} meeting(s)" if status else "meeting(s)"
+        description = describe_filter(meeting_filter)
+        if description:
+            subject += f" {description}"
+        
+        if not meetings:
+            return f"No {subject} found."
+        
+        response = f"Found {len(meetings)} {subject}:\n\n"
+        for i, meeting in enumerate(meetings, 1):
+            time = meeting.scheduled_time.strftime("%Y-%m-%d %I:%M %p")
+            response += f"{i}. **{meeting.title}**\n"
             response += f"   Time: {time}\n"
-            response += f"   Location: {meeting['location'] or 'Not specified'}\n"
+            response += f"   Location: {meeting.location or 'Not specified'}\n"
+            if meeting.status != "scheduled":
+                response += f"   Status: {meeting.status.title()}\n"
             response += "\n"
         
-        return response
\ No newline at end of file
+        return response
+    
+    def _format_stats_response(self, stats: Dict[str, Any], meeting_filter: MeetingFilter) -> str:
+        status = meeting_filter.status if meeting_filter.status != "scheduled" else None
+        subject = f"{status} meeting(s)" if status else "meeting(s)"
+        description = describe_filter(meeting_filter)
+        if description:
+            subject += f" {description}"
+        if not stats["total_meetings"]:
+            return f"No {subject} found."
+        
+        response = f"{stats['total_meetings']} {subject}, {stats['total_hours']} hour(s) in total.\n\n"
+        if not stats["group_by"]:
+            return response
+        
+        def label(group):
+            if group["key"] is None:
+                return "Not specified"
+            if stats["group_by"] == "hour":
+                return f"{group['key']:02d}:00"
+            return str(group["key"])
+        
+        unit = "hour(s)" if stats["rank_by"] == "hours" else "meeting(s)"
+        busiest = ", ".join(label(group) for group in stats["busiest"])
+        response += f"**Busiest {stats['group_by']}**: {busiest}\n\n"
+        for group in stats["groups"][:20]:
+            amount = group["hours"] if stats["rank_by"] == "hours" else group["meetings"]
+            response += f"• {label(group)}: {amount} {unit}\n"
+        if len(stats["groups"]) > 20:
+            response += f"... and {len(stats['groups']) - 20} more."
+        
+        return response
+    
+    def _format_meeting_line(self, index: int, meeting) -> str:
+        time = meeting.scheduled_time.strftime("%Y-%m-%d %I:%M %p")
+        return f"{index}. **{meeting.title}** - {time}, {meeting.location or 'Not specified'}\n"
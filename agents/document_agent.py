@@ -1,26 +1,41 @@
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+import asyncio
+from concurrent.futures import Executor
 import os
 import tempfile
 from pathlib import Path
 from agents.base_agent import BaseAgent
 from tools.document_tool import DocumentTool
+from tools.document_registry import DocumentRegistry, DocumentEntry
+from tools.document_store import DocumentStore
+from tools.document_workers import DocumentAnalysis, parallel_pdf_chunks, pdf_page_count
 import logging
 import re
+import hashlib
+import uuid
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 class DocumentAgent(BaseAgent):
     """Agent 2: Document Understanding + Web Intelligence Agent"""
     
-    def __init__(self, openai_api_key: Optional[str] = None, upload_dir: str = "static/uploads"):
+    def __init__(self, openai_api_key: Optional[str] = None, upload_dir: str = "static/uploads",
+                 memory_budget_mb: int = 512, executor: Optional[Executor] = None, pages_per_task: int = 25):
         super().__init__(name="DocumentAgent", description="Handles document Q&A with web search fallback")
-        self.document_tool = DocumentTool(openai_api_key)
         self.upload_dir = upload_dir
-        self.current_document = None
-        self.current_filename = None
-        
         # Create upload directory if it doesn't exist
         os.makedirs(upload_dir, exist_ok=True)
+        self.document_tool = DocumentTool(openai_api_key, embedding_cache_path=os.path.join(upload_dir, "embeddings.sqlite3"))
+        # Documents per user/session, evicted least recently used past the budget
+        self.registry = DocumentRegistry(budget_bytes=memory_budget_mb * 1024 * 1024)
+        # Every indexed document is also persisted, so evicted or pre-restart documents reload from disk
+        self.store = DocumentStore(os.path.join(upload_dir, "indexes"))
+        # Process pool (owned by the app) for extracting and chunking large PDFs in page ranges
+        self.executor = executor
+        self.pages_per_task = pages_per_task
+        # Uploads still being indexed, for status polling while a large file ingests
+        self._ingesting: Dict[str, Dict[str, Any]] = {}
     
     def can_handle(self, query: str) -> bool:
         """Determine if this agent can handle the query"""
@@ -32,7 +47,7 @@ class DocumentAgent(BaseAgent):
         ]
         
         # Also handle if user is asking about uploaded content
-        if self.current_document:
+        if self.store.has_documents() or self.registry.has_documents():
             # If we have a document loaded, we can handle more queries
             general_question_keywords = ['what', 'how', 'when', 'where', 'who', 'why']
             if any(keyword in query_lower for keyword in general_question_keywords):
@@ -41,9 +56,10 @@ class DocumentAgent(BaseAgent):
         return any(keyword in query_lower for keyword in document_keywords)
     
     async def process(self, query: str, **kwargs) -> Dict[str, Any]:
-        """Process document-related queries"""
+        """Process document-related queries for the user_id (or session) in kwargs"""
         try:
             query_lower = query.lower()
+            owner = kwargs.get('user_id') or "default"
             
             # Check if user wants to upload a document
             if 'upload' in query_lower or ('document' in query_lower and 'read' in query_lower):
@@ -51,7 +67,7 @@ class DocumentAgent(BaseAgent):
                 filename = kwargs.get('filename')
                 
                 if file_content and filename:
-                    return await self._handle_document_upload(file_content, filename, query)
+                    return await self._handle_document_upload(file_content, filename, owner)
                 else:
                     return {
                         "success": False,
@@ -60,8 +76,10 @@ class DocumentAgent(BaseAgent):
                         "instructions": "Use the /api/document/upload endpoint to upload a document first"
                     }
             
-            # Check if we have a document loaded
-            if not self.current_document:
+            # Check if this user has a document loaded
+            document_ids = kwargs.get('document_ids')
+            entries, opened = self._collect_documents(owner, document_ids)
+            if not entries:
                 return {
                     "success": False,
                     "error": "No document loaded. Please upload a document first.",
@@ -69,8 +87,11 @@ class DocumentAgent(BaseAgent):
                     "suggestion": "Ask something like: 'Upload and read my resume' or use the upload endpoint"
                 }
             
-            # Process query against document
-            return await self._handle_document_query(query)
+            # Process query against document; opened documents are registered afterwards
+            try:
+                return await self._handle_document_query(query, entries)
+            finally:
+                self._register(opened)
             
         except Exception as e:
             logger.error(f"Error in DocumentAgent: {str(e)}")
@@ -80,55 +101,26 @@ class DocumentAgent(BaseAgent):
                 "agent": self.name
             }
     
-    async def _handle_document_upload(self, file_content: bytes, filename: str, query: str) -> Dict[str, Any]:
+    async def _handle_document_upload(self, file_content: bytes, filename: str, owner: str = "default") -> Dict[str, Any]:
         """Handle document upload and processing"""
+        temp_path = None
         try:
+            # The same file uploaded before: reuse its chunks and index
+            file_hash = hashlib.sha256(file_content).hexdigest()
+            entry = self._reuse_upload(file_hash, owner, filename)
+            if entry:
+                return self._upload_result(entry, reused=True)
+            
             # Save file temporarily
             file_extension = Path(filename).suffix
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_extension)
             temp_file.write(file_content)
             temp_file.close()
+            temp_path = temp_file.name
             
-            # Extract text from file
-            text = self.document_tool.process_uploaded_file(temp_file.name, file_extension)
-            
-            # Create vector store
-            success = self.document_tool.create_vector_store(text, filename)
-            
-            if success:
-                self.current_document = text
-                self.current_filename = filename
-                
-                # Clean up temp file
-                os.unlink(temp_file.name)
-                
-                # Analyze document for common questions
-                summary = self._analyze_document(text)
-                
-                response = (
-                    f"✅ Document '{filename}' uploaded and processed successfully!\n\n"
-                    f"**Document Summary:**\n{summary}\n\n"
-                    f"You can now ask questions about this document. Examples:\n"
-                    f"- What is the main content of this document?\n"
-                    f"- What are the key points?\n"
-                    f"- Specific questions based on the document content"
-                )
-                
-                return {
-                    "success": True,
-                    "response": response,
-                    "agent": self.name,
-                    "document": filename,
-                    "summary": summary,
-                    "characters": len(text),
-                    "pages": len(text.split('\n\n')) // 2  # Rough estimate
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "Failed to process document",
-                    "agent": self.name
-                }
+            # Index it alongside the user's other documents, off the event loop
+            entry = await asyncio.to_thread(self._ingest_file, owner, filename, temp_path, file_extension, file_hash)
+            return self._upload_result(entry)
                 
         except Exception as e:
             logger.error(f"Error handling document upload: {str(e)}")
@@ -137,17 +129,173 @@ class DocumentAgent(BaseAgent):
                 "error": f"Document processing error: {str(e)}",
                 "agent": self.name
             }
+        finally:
+            # Clean up temp file
+            if temp_path and os.path.exists(temp_path):
+                os.unlink(temp_path)
     
-    async def _handle_document_query(self, query: str) -> Dict[str, Any]:
-        """Handle query against the loaded document"""
+    def _reuse_upload(self, file_hash: str, owner: str, filename: str) -> Optional[DocumentEntry]:
+        """Owner's existing document, or a copy of another owner's, for an already indexed file"""
+        cache = self.document_tool.embedding_cache
+        meta = self.store.find(file_hash, owner)
+        if meta is None:
+            if cache:
+                cache.record_document(hit=False)
+            return None
+        
+        if meta["owner"] != owner:
+            meta = self.store.copy(meta, owner, uuid.uuid4().hex[:12], filename)
+        entry = None
+        if meta:
+            entry = self.registry.get(owner, meta["document_id"])
+            if entry is None:
+                entry = self._open_document(owner, meta["document_id"])
+                if entry:
+                    self.registry.add(entry)
+        if cache:
+            cache.record_document(hit=entry is not None)
+        if entry:
+            logger.info(f"Reused indexed upload {entry.document_id} for {filename}")
+        return entry
+    
+    def _upload_result(self, entry: DocumentEntry, reused: bool = False) -> Dict[str, Any]:
+        filename = entry.filename
+        response = (
+            f"✅ Document '{filename}' uploaded and processed successfully!\n\n"
+            f"**Document Summary:**\n{entry.summary}\n\n"
+            f"You can now ask questions about this document. Examples:\n"
+            f"- What is the main content of this document?\n"
+            f"- What are the key points?\n"
+            f"- Specific questions based on the document content"
+        )
+        
+        return {
+            "success": True,
+            "response": response,
+            "agent": self.name,
+            "document": filename,
+            "document_id": entry.document_id,
+            "summary": entry.summary,
+            "characters": entry.characters,
+            "chunks": len(entry.chunks),
+            "reused": reused
+        }
+    
+    def load_document(self, owner: str, filename: str, text: str, file_hash: Optional[str] = None) -> DocumentEntry:
+        """Index text as one of owner's documents and persist it"""
+        analysis = DocumentAnalysis()
+        chunks = self.document_tool.iter_chunks(analysis.observe([text]))
+        return self._add_document(owner, filename, chunks, analysis, file_hash)
+    
+    def _ingest_file(self, owner: str, filename: str, file_path: str, file_extension: str,
+                     file_hash: Optional[str] = None) -> DocumentEntry:
+        """Stream a file into the index; PDFs larger than one page range are split across the process pool"""
+        analysis = DocumentAnalysis()
+        status = {"owner": owner, "filename": filename, "pages": 0, "total_pages": None, "chunks": 0,
+                  "started_at": datetime.now().isoformat()}
+        key = uuid.uuid4().hex
+        self._ingesting[key] = status
+        
+        def progress(chunks: int):
+            status["pages"] = analysis.pages
+            status["chunks"] = chunks
+        
+        try:
+            if file_extension.lower() == '.pdf':
+                status["total_pages"] = pdf_page_count(file_path)
+                if self.executor and status["total_pages"] > self.pages_per_task:
+                    chunks = parallel_pdf_chunks(self.executor, file_path, analysis, self.pages_per_task,
+                                                 status["total_pages"])
+                    return self._add_document(owner, filename, chunks, analysis, file_hash, progress)
+            
+            pages = analysis.observe(self.document_tool.iter_pages(file_path, file_extension))
+            return self._add_document(owner, filename, self.document_tool.iter_chunks(pages), analysis,
+                                      file_hash, progress)
+        finally:
+            del self._ingesting[key]
+    
+    def ingesting(self, owner: str) -> List[Dict[str, Any]]:
+        """Owner's uploads still being indexed: pages read and chunks indexed so far"""
+        return [
+            {name: value for name, value in status.items() if name != "owner"}
+            for status in list(self._ingesting.values()) if status["owner"] == owner
+        ]
+    
+    def _add_document(self, owner: str, filename: str, chunks: Iterable[str], analysis: DocumentAnalysis,
+                      file_hash: Optional[str] = None,
+                      progress: Optional[Callable[[int], None]] = None) -> DocumentEntry:
+        chunk_docs, vector_store = self.document_tool.index_chunks(chunks, filename, progress)
+        # The analysis is complete once every chunk has been consumed
+        entry = DocumentEntry(owner, filename, chunk_docs, vector_store,
+                              summary=analysis.summary(), characters=analysis.characters)
+        self.store.save(entry, file_hash=file_hash)
+        self.registry.add(entry)
+        logger.info(f"Loaded document {filename} ({entry.document_id}) for {owner}, {analysis.pages} pages")
+        return entry
+    
+    def warm_start(self) -> int:
+        """Catalog the documents persisted before a restart; they are opened on first use"""
+        return self.store.scan()
+    
+    def documents(self, owner: str, document_ids: Optional[List[str]] = None) -> List[DocumentEntry]:
+        """Owner's documents, opening persisted ones that are not loaded (memory-mapped)"""
+        entries, opened = self._collect_documents(owner, document_ids)
+        self._register(opened)
+        return entries
+    
+    def _collect_documents(self, owner: str, document_ids: Optional[List[str]] = None
+                           ) -> Tuple[List[DocumentEntry], List[DocumentEntry]]:
+        """Owner's documents, and those of them just opened from the store.
+        
+        Opened documents are not registered here: registering one could evict
+        a document opened earlier in the same call. Callers register them
+        with _register once they are done with the entries.
+        """
+        entries = self.registry.documents(owner, document_ids)
+        loaded = {entry.document_id for entry in entries}
+        wanted = document_ids if document_ids is not None else self.store.document_ids(owner)
+        
+        opened = []
+        for document_id in wanted:
+            if document_id not in loaded:
+                entry = self._open_document(owner, document_id)
+                if entry:
+                    opened.append(entry)
+        if opened:
+            entries = sorted(entries + opened, key=lambda entry: entry.created_at)
+        return entries, opened
+    
+    def _register(self, entries: List[DocumentEntry]):
+        for entry in entries:
+            self.registry.add(entry)
+    
+    def _open_document(self, owner: str, document_id: str) -> Optional[DocumentEntry]:
+        try:
+            opened = self.store.open(owner, document_id)
+            if opened is None:
+                return None
+            meta, chunks, index, lexical = opened
+            entry = DocumentEntry(
+                owner, meta["filename"], chunks, self.document_tool.open_index(chunks, index, lexical),
+                summary=meta["summary"], characters=meta["characters"], document_id=document_id,
+                created_at=datetime.fromisoformat(meta["created_at"])
+            )
+            return entry
+        except Exception as e:
+            logger.error(f"Error opening persisted document {document_id}: {e}")
+            return None
+    
+    async def _handle_document_query(self, query: str, entries: List[DocumentEntry]) -> Dict[str, Any]:
+        """Handle query against the user's loaded documents"""
         try:
-            # First, try to answer from document
-            document_result = self.document_tool.query_document(query)
+            # First, try to answer from the documents
+            document_result = self.document_tool.query_documents(entries, query)
             
             if document_result["success"] and document_result["from_document"]:
-                # Answer found in document
+                # Answer found in the documents
+                names = "', '".join(document_result["documents"])
                 response = (
-                    f"**Based on the document '{self.current_filename}':**\n\n"
+                    f"**Based on the document{'s' if len(document_result['documents']) > 1 else ''} '{names}':**\n\n"
                     f"{document_result['answer']}\n\n"
                     f"*Source: {document_result['source']}*"
                 )
@@ -160,7 +308,8 @@ class DocumentAgent(BaseAgent):
                     "confidence": document_result["confidence"],
                     "data": {
                         "answer": document_result["answer"],
-                        "source": document_result["source"]
+                        "source": document_result["source"],
+                        "documents": document_result["documents"]
                     }
                 }
             else:
@@ -239,41 +388,8 @@ class DocumentAgent(BaseAgent):
                 "web_search_fallback": False
             }
     
-    def _analyze_document(self, text: str) -> str:
-        """Analyze document content and generate summary"""
-        # Simple analysis - can be enhanced
-        lines = text.split('\n')
-        words = text.split()
-        
-        # Count sections (based on common patterns)
-        sections = []
-        common_section_keywords = ['education', 'experience', 'skills', 'summary', 'objective', 
-                                  'policy', 'procedure', 'guideline', 'introduction', 'conclusion']
-        
-        for line in lines:
-            line_lower = line.lower().strip()
-            if any(keyword in line_lower for keyword in common_section_keywords) and len(line) < 100:
-                sections.append(line.strip())
-        
-        # Generate summary
-        summary = f"Document contains approximately {len(words)} words.\n"
-        
-        if sections:
-            summary += f"Detected sections: {', '.join(sections[:5])}"
-            if len(sections) > 5:
-                summary += f" and {len(sections) - 5} more."
-        
-        # Extract first few lines as preview
-        preview_lines = [line.strip() for line in lines[:10] if line.strip()]
-        if preview_lines:
-            summary += f"\n\n**Preview:**\n" + "\n".join(preview_lines[:5]) + "..."
-        
-        return summary
-    
-    def clear_document(self):
-        """Clear currently loaded document"""
-        self.current_document = None
-        self.current_filename = None
-        self.document_tool.vector_store = None
-        self.document_tool.documents = []
-        logger.info("Cleared current document")
\ No newline at end of file
+    def clear_document(self, owner: str = "default", document_id: Optional[str] = None) -> int:
+        """Clear one of owner's documents, or all of them; returns how many were removed"""
+        removed = max(self.registry.remove(owner, document_id), self.store.delete(owner, document_id))
+        logger.info(f"Cleared {removed} document(s) for {owner}")
+        return removed
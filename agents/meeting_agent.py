@@ -1,13 +1,24 @@
-from typing import Dict, Any
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, time, timedelta
 from agents.base_agent import BaseAgent
 from agents.weather_agent import WeatherAgent
-from tools.database_tool import DatabaseTool
+from app.config import settings
+from tools.database_tool import DatabaseTool, AGENT_ORGANIZER
+from tools.availability import find_free_slots, DEFAULT_DAY_START, DEFAULT_DAY_END, WORKDAYS, ALL_DAYS
+from utils.validator import parse_datetime
+from tools.weather_scoring import score_forecast_slots, rank_candidates, GOOD_WEATHER_SCORE, FORECAST_SLOT
 import logging
 import re
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# How far ahead to look for a common free slot
+FREE_SLOT_SEARCH_DAYS = 14
+# Free slots scored against the forecast; enough for every slot in the 5-day window
+WEATHER_CANDIDATE_LIMIT = 500
+
 class MeetingAgent(BaseAgent):
     """Agent 3: Meeting Scheduling + Weather Reasoning Agent"""
     
@@ -25,7 +36,8 @@ class MeetingAgent(BaseAgent):
             'schedule', 'plan', 'arrange', 'organize', 'book',
             'set up', 'create', 'add meeting', 'new meeting',
             'verify weather', 'check weather', 'weather good',
-            'team meeting', 'meeting if weather'
+            'team meeting', 'meeting if weather', 'free slot', 'free time',
+            'availability', 'find a time', 'find time'
         ]
         
         return any(keyword in query_lower for keyword in schedule_keywords)
@@ -38,6 +50,9 @@ class MeetingAgent(BaseAgent):
             # Extract meeting details
             meeting_details = self._extract_meeting_details(query)
             
+            if re.search(r'\b(free|availab\w*|find (?:a )?time|open slots?)\b', query_lower):
+                return self._find_slots_response(meeting_details)
+            
             # Check if weather verification is needed
             if 'weather' in query_lower or 'verify' in query_lower:
                 return await self._schedule_with_weather_check(meeting_details)
@@ -52,67 +67,181 @@ class MeetingAgent(BaseAgent):
                 "agent": self.name
             }
     
+    async def schedule_meeting(self, title: str, scheduled_time: datetime,
+                               duration_minutes: Optional[int] = None, description: Optional[str] = None,
+                               location: Optional[str] = None, participants: Optional[List[str]] = None,
+                               check_weather: bool = False, city: Optional[str] = None) -> Dict[str, Any]:
+        """Schedule from structured fields at exactly scheduled_time, without parsing any text.
+        
+        With check_weather the forecast for city decides, and free slots with
+        better weather are proposed when the requested time is not good.
+        """
+        if scheduled_time.tzinfo is not None:
+            # Stored meeting times are naive local time
+            scheduled_time = scheduled_time.astimezone().replace(tzinfo=None)
+        
+        details = {
+            "title": title,
+            "scheduled_time": scheduled_time,
+            "duration": duration_minutes or self.default_meeting_duration,
+            "location": location or self.default_location,
+            "participants": participants or [],
+            "city": city or settings.DEFAULT_WEATHER_CITY
+        }
+        if description:
+            details["description"] = description
+        
+        try:
+            if check_weather:
+                return await self._schedule_with_weather_check(details)
+            return await self._simple_schedule(details)
+        except Exception as e:
+            logger.error(f"Error in MeetingAgent: {str(e)}")
+            return {
+                "success": False,
+                "error": f"Failed to schedule meeting: {str(e)}",
+                "agent": self.name
+            }
+    
+    async def schedule_meetings(self, meetings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Schedule many structured meetings at once and report an outcome per item.
+        
+        Each item has the schedule_meeting fields. Weather is fetched once per
+        city (the 5-day forecast covers every day in it), and all meetings that
+        pass are conflict-checked and inserted in one transaction.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(meetings)
+        forecasts: Dict[str, Any] = {}
+        pending = []  # (index, meeting_data)
+        
+        for index, item in enumerate(meetings):
+            # One bad item (a missing field, say) must not fail the whole batch
+            try:
+                result, meeting_data = self._prepare_batch_item(index, item, forecasts)
+            except Exception as e:
+                logger.error(f"Error preparing batch meeting {index}: {e}")
+                result, meeting_data = {"index": index, "status": "error", "error": str(e)}, None
+            if result:
+                results[index] = result
+            else:
+                pending.append((index, meeting_data))
+        
+        outcomes = self.db_tool.create_meetings_if_free([meeting_data for _, meeting_data in pending])
+        for (index, _), outcome in zip(pending, outcomes):
+            if outcome["success"]:
+                results[index] = {"index": index, "status": "scheduled", "meeting": outcome["meeting"]}
+            elif outcome.get("conflicts"):
+                results[index] = {"index": index, "status": "conflict", "error": outcome["error"],
+                                  "conflicts": outcome["conflicts"]}
+            else:
+                results[index] = {"index": index, "status": "error", "error": outcome["error"]}
+        
+        scheduled = sum(1 for result in results if result["status"] == "scheduled")
+        return {
+            "success": True,
+            "agent": self.name,
+            "scheduled": scheduled,
+            "rejected": len(results) - scheduled,
+            "results": results
+        }
+    
+    def _prepare_batch_item(self, index: int, item: Dict[str, Any], forecasts: Dict[str, Any]
+                            ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(result, None) for an item settled before the database, else (None, meeting_data)"""
+        try:
+            scheduled_time = parse_datetime(item.get("scheduled_time"))
+        except ValueError as e:
+            return {"index": index, "status": "invalid", "error": f"Invalid scheduled_time: {e}"}, None
+        if scheduled_time.tzinfo is not None:
+            scheduled_time = scheduled_time.astimezone().replace(tzinfo=None)
+        duration = item.get("duration_minutes") or self.default_meeting_duration
+        
+        meeting_data = {
+            "title": item["title"],
+            "description": item.get("description") or 'Scheduled by AI Agent',
+            "scheduled_time": scheduled_time,
+            "duration_minutes": duration,
+            "location": item.get("location") or self.default_location,
+            "organizer": AGENT_ORGANIZER
+        }
+        if item.get("participants"):
+            meeting_data["participants"] = item["participants"]
+        
+        if item.get("check_weather"):
+            city = item.get("city") or settings.DEFAULT_WEATHER_CITY
+            if city.lower() not in forecasts:
+                forecast = self._get_forecast(city)
+                if "error" not in forecast:
+                    forecast["scores"] = score_forecast_slots(forecast["slots"])
+                forecasts[city.lower()] = forecast
+            forecast = forecasts[city.lower()]
+            if "error" in forecast:
+                return {"index": index, "status": "error", "error": forecast["error"]}, None
+            
+            requested = rank_candidates(
+                [(scheduled_time, scheduled_time + timedelta(minutes=duration))],
+                forecast["slots"], forecast["scores"], limit=1
+            )
+            if not requested or requested[0]["score"] < GOOD_WEATHER_SCORE:
+                return {
+                    "index": index,
+                    "status": "bad_weather",
+                    "error": "Weather is not good for meeting" if requested else "Beyond the 5-day forecast",
+                    "weather_condition": requested[0]["weather"] if requested else None
+                }, None
+            meeting_data["weather_checked"] = True
+            meeting_data["weather_condition"] = requested[0]["weather"]
+        
+        return None, meeting_data
+    
     async def _schedule_with_weather_check(self, details: Dict[str, Any]) -> Dict[str, Any]:
-        """Schedule meeting with weather verification"""
+        """Book the requested time if it is free with good weather, otherwise propose better slots.
+        
+        The 5-day forecast is fetched once and scored in one pass; the same
+        scores rank the requested time and every free alternative.
+        """
         try:
             # Extract city for weather check
             city = details.get('city', 'London')  # Default city
+            forecast = self._get_forecast(city)
             
-            # Get weather for the scheduled time
-            if details.get('time') == 'tomorrow':
-                weather_query = f"What is the weather in {city} tomorrow?"
-            else:
-                weather_query = f"What is the weather in {city} today?"
-            
-            # Get weather information
-            weather_result = await self.weather_agent.process(weather_query)
-            
-            if not weather_result["success"]:
+            if "error" in forecast:
                 return {
                     "success": False,
-                    "error": "Could not verify weather conditions",
+                    "error": forecast["error"],
                     "agent": self.name
                 }
             
-            # Check if weather is good
-            is_good_weather = self.weather_agent.is_good_weather(weather_result.get("data", {}))
-            weather_condition = weather_result.get("data", {}).get("weather", "Unknown")
-            
-            # Check for existing meetings
+            slots = forecast["slots"]
+            scores = score_forecast_slots(slots)
+            participants = details.get('participants') or None
+            duration = details.get('duration', self.default_meeting_duration)
             meeting_time = self._parse_meeting_time(details)
-            meeting_exists = self.db_tool.check_meeting_exists(meeting_time, details.get('title'))
+            meeting_end = meeting_time + timedelta(minutes=duration)
             
-            if meeting_exists:
-                response = (
-                    f"A meeting already exists around {meeting_time.strftime('%I:%M %p')}.\n"
-                    f"Weather condition: {weather_condition}\n"
-                    f"Weather is {'GOOD' if is_good_weather else 'NOT GOOD'} for outdoor activities."
-                )
-                
-                return {
-                    "success": False,
-                    "response": response,
-                    "agent": self.name,
-                    "weather_checked": True,
-                    "is_good_weather": is_good_weather,
-                    "existing_meeting": True
-                }
+            # The requested time must be inside the forecast with good weather
+            requested = rank_candidates([(meeting_time, meeting_end)], slots, scores, limit=1)
+            weather_condition = requested[0]["weather"] if requested else "Unknown"
+            is_good_weather = bool(requested) and requested[0]["score"] >= GOOD_WEATHER_SCORE
+            is_free = True
             
-            # Schedule meeting if weather is good
             if is_good_weather:
                 # Create meeting
                 meeting_data = {
                     "title": details.get('title', 'Team Meeting'),
                     "description": details.get('description', 'Scheduled by AI Agent'),
                     "scheduled_time": meeting_time.isoformat(),
-                    "duration_minutes": details.get('duration', self.default_meeting_duration),
+                    "duration_minutes": duration,
                     "location": details.get('location', self.default_location),
-                    "organizer": "AI Assistant",
+                    "organizer": AGENT_ORGANIZER,
                     "weather_checked": True,
                     "weather_condition": weather_condition
                 }
                 
-                result = self.db_tool.create_meeting(meeting_data)
+                if participants:
+                    meeting_data["participants"] = participants
+                
+                result = self.db_tool.create_meeting_if_free(meeting_data)
                 
                 if result["success"]:
                     response = (
@@ -132,28 +261,41 @@ class MeetingAgent(BaseAgent):
                         "weather_checked": True,
                         "is_good_weather": True
                     }
-                else:
+                elif not result.get("conflicts"):
                     return {
                         "success": False,
                         "error": "Failed to create meeting in database",
                         "agent": self.name
                     }
+                is_free = False
+            
+            # Requested time is taken or the weather is poor: propose the best free slots instead
+            proposals = self._rank_weather_slots(slots, scores, participants, duration)
+            if not is_free:
+                reason = f"The calendar is busy around {meeting_time.strftime('%I:%M %p')}."
+            elif requested:
+                reason = f"Weather at {meeting_time.strftime('%A %I:%M %p')} in {forecast['city']}: {weather_condition} (not good for meeting)."
             else:
-                # Weather is bad, don't schedule
-                response = (
-                    f"❌ Cannot schedule meeting due to bad weather.\n"
-                    f"Weather condition: {weather_condition}\n"
-                    f"Recommendation: Schedule for another day or move indoors."
+                reason = f"{meeting_time.strftime('%A, %B %d')} is beyond the 5-day forecast for {forecast['city']}."
+            
+            if proposals:
+                response = reason + "\nBest weather among the free slots:\n" + "\n".join(
+                    f"• {slot['start'].strftime('%A, %B %d at %I:%M %p')}: {slot['weather']}, "
+                    f"{slot['temperature']:.0f}°C, {slot['probability_of_precipitation']:.0f}% rain"
+                    for slot in proposals
                 )
-                
-                return {
-                    "success": False,
-                    "response": response,
-                    "agent": self.name,
-                    "weather_checked": True,
-                    "is_good_weather": False,
-                    "recommendation": "Reschedule or move indoors"
-                }
+            else:
+                response = reason + "\nNo free slots with a forecast in the next 5 days."
+            
+            return {
+                "success": True,
+                "response": response,
+                "agent": self.name,
+                "weather_checked": True,
+                "is_good_weather": is_good_weather,
+                "existing_meeting": not is_free,
+                "proposed_slots": proposals
+            }
                 
         except Exception as e:
             logger.error(f"Error in weather-based scheduling: {str(e)}")
@@ -168,28 +310,53 @@ class MeetingAgent(BaseAgent):
         try:
             meeting_time = self._parse_meeting_time(details)
             
-            # Check for existing meetings
-            meeting_exists = self.db_tool.check_meeting_exists(meeting_time, details.get('title'))
-            
-            if meeting_exists:
-                return {
-                    "success": False,
-                    "response": f"A meeting already exists around {meeting_time.strftime('%I:%M %p')}.",
-                    "agent": self.name,
-                    "existing_meeting": True
-                }
+            if details.get('participants') and not details.get('scheduled_time'):
+                # A vague time ("tomorrow"): take the earliest time everyone is free from there
+                slots = self.find_free_slots(
+                    details['participants'], details['duration'], meeting_time,
+                    meeting_time + timedelta(days=FREE_SLOT_SEARCH_DAYS), limit=1
+                )
+                if not slots:
+                    return {
+                        "success": False,
+                        "response": (f"No common free slot for {len(details['participants'])} participant(s) "
+                                     f"in the next {FREE_SLOT_SEARCH_DAYS} days."),
+                        "agent": self.name
+                    }
+                meeting_time = slots[0][0]
             
-            # Create meeting
+            # Create meeting; the conflict check runs in the same transaction
             meeting_data = {
                 "title": details.get('title', 'Team Meeting'),
                 "description": details.get('description', 'Scheduled by AI Agent'),
                 "scheduled_time": meeting_time.isoformat(),
                 "duration_minutes": details.get('duration', self.default_meeting_duration),
                 "location": details.get('location', self.default_location),
-                "organizer": "AI Assistant"
+                "organizer": AGENT_ORGANIZER
             }
             
-            result = self.db_tool.create_meeting(meeting_data)
+            if details.get('participants'):
+                meeting_data["participants"] = details['participants']
+            
+            result = self.db_tool.create_meeting_if_free(meeting_data)
+            
+            if result.get("conflicts"):
+                suggestions = self.find_free_slots(
+                    details.get('participants') or None, details['duration'], meeting_time,
+                    meeting_time + timedelta(days=FREE_SLOT_SEARCH_DAYS), limit=3
+                )
+                response = f"A meeting already exists around {meeting_time.strftime('%I:%M %p')}."
+                if suggestions:
+                    response += "\nFree alternatives:\n" + "\n".join(
+                        f"• {start.strftime('%A, %B %d at %I:%M %p')}" for start, _ in suggestions
+                    )
+                return {
+                    "success": False,
+                    "response": response,
+                    "agent": self.name,
+                    "existing_meeting": True,
+                    "suggested_slots": [{"start": start, "end": end} for start, end in suggestions]
+                }
             
             if result["success"]:
                 response = (
@@ -221,6 +388,89 @@ class MeetingAgent(BaseAgent):
                 "agent": self.name
             }
     
+    def find_free_slots(self, participants: Optional[List[str]], duration_minutes: int,
+                        start: datetime, end: datetime, day_start: time = DEFAULT_DAY_START,
+                        day_end: time = DEFAULT_DAY_END, include_weekends: bool = False,
+                        step_minutes: int = 15, limit: int = 5) -> List[Tuple[datetime, datetime]]:
+        """Earliest slots in which all participants are free.
+        
+        Busy intervals for every participant come from one query; None means
+        the whole calendar.
+        """
+        busy = self.db_tool.get_busy_intervals(participants, start, end)
+        return find_free_slots(
+            busy, start, end, duration_minutes, day_start=day_start, day_end=day_end,
+            weekdays=ALL_DAYS if include_weekends else WORKDAYS,
+            step_minutes=step_minutes, limit=limit
+        )
+    
+    def find_weather_slots(self, city: str, participants: Optional[List[str]], duration_minutes: int,
+                           limit: int = 3, **kwargs) -> Dict[str, Any]:
+        """Free slots in the 5-day forecast window, best weather first, from one forecast call.
+        
+        start and end, if given, narrow the search; they are clipped to the forecast window.
+        """
+        forecast = self._get_forecast(city)
+        if "error" in forecast:
+            return {"success": False, "error": forecast["error"]}
+        
+        slots = forecast["slots"]
+        ranked = self._rank_weather_slots(slots, score_forecast_slots(slots), participants,
+                                          duration_minutes, limit=limit, **kwargs)
+        return {"success": True, "city": forecast["city"], "slots": ranked}
+    
+    def _get_forecast(self, city: str) -> Dict[str, Any]:
+        """Forecast slots for a city, or an error when the API key or forecast is missing"""
+        if not self.weather_agent.has_api_key:
+            return {"error": "Weather API key not configured"}
+        
+        forecast = self.weather_agent.get_forecast(city)
+        if forecast is None:
+            return {"error": "Could not verify weather conditions"}
+        return forecast
+    
+    def _rank_weather_slots(self, slots: List[Dict[str, Any]], scores: np.ndarray, participants: Optional[List[str]],
+                            duration_minutes: int, limit: int = 3, start: Optional[datetime] = None,
+                            end: Optional[datetime] = None, **kwargs) -> List[Dict[str, Any]]:
+        """Intersect free slots with the forecast and keep the best-scoring ones"""
+        now = datetime.now()
+        forecast_end = slots[-1]["time"] + FORECAST_SLOT
+        start = max(start, now) if start else now
+        end = min(end, forecast_end) if end else forecast_end
+        if end <= start:
+            return []
+        candidates = self.find_free_slots(participants, duration_minutes, start, end,
+                                          limit=WEATHER_CANDIDATE_LIMIT, **kwargs)
+        return rank_candidates(candidates, slots, scores, limit=limit)
+    
+    def _find_slots_response(self, details: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer "when are X and Y free" questions without booking anything"""
+        if details["time"] == "today":
+            start = datetime.now()
+        else:
+            start = self._parse_meeting_time(details).replace(hour=0, minute=0)
+        participants = details.get('participants') or None
+        slots = self.find_free_slots(
+            participants, details['duration'], start, start + timedelta(days=FREE_SLOT_SEARCH_DAYS)
+        )
+        
+        who = f"{len(participants)} participant(s)" if participants else "your calendar"
+        if not slots:
+            response = f"No free {details['duration']}-minute slots for {who} in the next {FREE_SLOT_SEARCH_DAYS} days."
+        else:
+            response = f"Earliest free {details['duration']}-minute slots for {who}:\n"
+            response += "\n".join(
+                f"• {slot_start.strftime('%A, %B %d')}: {slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}"
+                for slot_start, slot_end in slots
+            )
+        return {
+            "success": True,
+            "response": response,
+            "agent": self.name,
+            "slots": [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots],
+            "participants": participants or []
+        }
+    
     def _extract_meeting_details(self, query: str) -> Dict[str, Any]:
         """Extract meeting details from natural language query"""
         details = {
@@ -264,6 +514,9 @@ class MeetingAgent(BaseAgent):
                 duration *= 60  # Convert hours to minutes
             details["duration"] = min(duration, 240)  # Max 4 hours
         
+        # Extract participants
+        details["participants"] = re.findall(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+', query_lower)
+        
         # Extract location
         location_match = re.search(r'at\s+(.+?)(?:\s+tomorrow|\s+today|$)', query_lower)
         if location_match:
@@ -278,6 +531,9 @@ class MeetingAgent(BaseAgent):
     
     def _parse_meeting_time(self, details: Dict[str, Any]) -> datetime:
         """Parse meeting time from details"""
+        if details.get("scheduled_time"):
+            return details["scheduled_time"]
+        
         now = datetime.now()
         
         if details["time"] == "tomorrow":
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 from agents.base_agent import BaseAgent
 import logging
 
@@ -28,17 +28,43 @@ class AgentOrchestrator:
                 return agent
         return None
     
-    async def route_query(self, query: str, user_id: str = None) -> Dict[str, Any]:
-        """Route query to the most appropriate agent"""
-        logger.info(f"Routing query: {query}")
-        
-        # Find agents that can handle the query
+    def _capable_agents(self, query: str) -> List[Tuple[int, BaseAgent]]:
+        """Agents that can handle the query, highest priority first"""
         capable_agents = []
         for agent in self.agents:
             if agent.can_handle(query):
                 priority = self.agent_priorities.get(agent.name, 99)
                 capable_agents.append((priority, agent))
         
+        # Sort by priority (lower number = higher priority)
+        capable_agents.sort(key=lambda x: x[0])
+        return capable_agents
+    
+    async def stream_query(self, query: str, user_id: str = None) -> Iterator[Dict[str, Any]]:
+        """Route a query and return its answer as a stream of events.
+        
+        If the agent route_query would try first can stream this query, its
+        events are returned as they are produced; otherwise the full result
+        is wrapped in a single "result" event.
+        """
+        capable_agents = self._capable_agents(query)
+        if capable_agents:
+            agent = capable_agents[0][1]
+            stream = getattr(agent, "stream_query", None)
+            events = stream(query) if stream else None
+            if events is not None:
+                logger.info(f"Streaming query through agent: {agent.name}")
+                return events
+        
+        result = await self.route_query(query, user_id)
+        return iter([{"event": "result", "data": result}])
+    
+    async def route_query(self, query: str, user_id: str = None) -> Dict[str, Any]:
+        """Route query to the most appropriate agent"""
+        logger.info(f"Routing query: {query}")
+        
+        capable_agents = self._capable_agents(query)
+        
         if not capable_agents:
             return {
                 "success": False,
@@ -46,9 +72,6 @@ class AgentOrchestrator:
                 "suggestion": "Try asking about weather, meetings, or documents"
             }
         
-        # Sort by priority (lower number = higher priority)
-        capable_agents.sort(key=lambda x: x[0])
-        
         # Try agents in order of priority
         tried_errors = {}
         for priority, agent in capable_agents:
@@ -1,19 +1,47 @@
 from typing import Dict, Any, Optional
+from collections import namedtuple
+from bisect import bisect_right
 from datetime import datetime, timedelta
 import dateparser
 import re
 from agents.base_agent import BaseAgent
-from tools.weather_tool import WeatherTool
+from tools.weather_tool import WeatherTool, CACHE_TTL_SECONDS
+from tools.weather_scoring import score_forecast_slots, GOOD_WEATHER_SCORE, FORECAST_SLOT
+from utils.validator import to_local_naive
 import logging
 
 logger = logging.getLogger(__name__)
 
+KNOWN_CITIES = [
+    'chennai', 'bengaluru', 'bangalore', 'mumbai', 'delhi',
+    'london', 'new york', 'paris', 'tokyo', 'sydney',
+    'dubai', 'singapore', 'hong kong', 'berlin', 'toronto'
+]
+
+# Times closer to now than this use current conditions rather than the forecast
+CURRENT_WEATHER_WINDOW = timedelta(hours=1)
+
+class WeatherResult(namedtuple("WeatherResult", [
+    "city", "country", "time", "source", "weather", "temperature", "feels_like",
+    "humidity", "wind_speed", "probability_of_precipitation", "score"
+])):
+    """Weather for one place and time; source is current, forecast or historical.
+    
+    score is the 0-1 meeting-weather score from tools.weather_scoring.
+    probability_of_precipitation is None outside the forecast.
+    """
+    __slots__ = ()
+    
+    @property
+    def is_good(self) -> bool:
+        return self.score >= GOOD_WEATHER_SCORE
+
 class WeatherAgent(BaseAgent):
     """Agent 1: Weather Intelligence Agent"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_ttl_seconds: float = CACHE_TTL_SECONDS):
         super().__init__(name="WeatherAgent", description="Handles weather queries")
-        self.weather_tool = WeatherTool(api_key)
+        self.weather_tool = WeatherTool(api_key, cache_ttl_seconds=cache_ttl_seconds)
         self.city_patterns = [
             r'in\s+([A-Za-z\s]+?)(?:\s+today|\s+tomorrow|\s+yesterday|$)',
             r'weather\s+in\s+([A-Za-z\s]+)',
@@ -48,7 +76,7 @@ class WeatherAgent(BaseAgent):
             logger.info(f"Weather query: {query} -> City: {city}, Time: {time_info}")
             
             # Validate API key before making external calls
-            if not self.weather_tool.api_key or self.weather_tool.api_key.strip() == "your_openweather_api_key_here":
+            if not self.has_api_key:
                 return {
                     "success": False,
                     "error": "OpenWeatherMap API key is missing or placeholder. Please set a valid key in .env.",
@@ -92,6 +120,76 @@ class WeatherAgent(BaseAgent):
                 "agent": self.name
             }
     
+    @property
+    def has_api_key(self) -> bool:
+        """False when the OpenWeatherMap key is missing or still the .env placeholder"""
+        api_key = self.weather_tool.api_key
+        return bool(api_key) and api_key.strip() != "your_openweather_api_key_here"
+    
+    def get_forecast(self, location: str) -> Optional[Dict[str, Any]]:
+        """5-day forecast for location as {"city", "country", "slots"} for internal callers.
+        
+        slots are the 3-hour forecast slots in time order. Returns None when
+        the API key is missing or no forecast is available.
+        """
+        if not self.has_api_key:
+            logger.warning("OpenWeatherMap API key is missing or placeholder")
+            return None
+        
+        forecast = self.weather_tool.get_forecast_slots(location)
+        if "error" in forecast or not forecast.get("slots"):
+            logger.warning(f"No forecast for {location}: {forecast.get('error', 'no slots')}")
+            return None
+        return forecast
+    
+    def get_weather(self, location: str, when: Optional[datetime] = None) -> Optional[WeatherResult]:
+        """Weather in location at when (default now) for internal callers.
+        
+        Skips query parsing and response formatting, and reads through the
+        same WeatherTool caches as process(). Returns None when the API key is
+        missing, the city is unknown or when is beyond the 5-day forecast.
+        """
+        if not self.has_api_key:
+            logger.warning("OpenWeatherMap API key is missing or placeholder")
+            return None
+        
+        now = datetime.now()
+        when = to_local_naive(when) if when else now
+        if abs(when - now) <= CURRENT_WEATHER_WINDOW:
+            data = self.weather_tool.get_current_weather(location)
+            source, at = "current", now
+        elif when > now:
+            forecast = self.get_forecast(location)
+            if forecast is None:
+                return None
+            slots = forecast["slots"]
+            index = bisect_right([slot["time"] for slot in slots], when) - 1
+            if index < 0 or when >= slots[index]["time"] + FORECAST_SLOT:
+                return None
+            data = dict(slots[index], city=forecast["city"], country=forecast["country"])
+            source, at = "forecast", slots[index]["time"]
+        else:
+            data = self.weather_tool.get_historical_weather(location, when)
+            source, at = "historical", when
+        
+        if "error" in data:
+            logger.warning(f"No {source} weather for {location}: {data['error']}")
+            return None
+        
+        return WeatherResult(
+            city=data["city"],
+            country=data.get("country", ""),
+            time=at,
+            source=source,
+            weather=data["weather"],
+            temperature=data["temperature"],
+            feels_like=data.get("feels_like", data["temperature"]),
+            humidity=data.get("humidity"),
+            wind_speed=data.get("wind_speed", 0),
+            probability_of_precipitation=data.get("probability_of_precipitation"),
+            score=round(float(score_forecast_slots([data])[0]), 3)
+        )
+    
     def _extract_city(self, query: str) -> Optional[str]:
         """Extract city name from query"""
         query_lower = query.lower()
@@ -105,13 +203,7 @@ class WeatherAgent(BaseAgent):
                     return city.title()
         
         # Fallback: look for known city names
-        known_cities = [
-            'chennai', 'bengaluru', 'bangalore', 'mumbai', 'delhi',
-            'london', 'new york', 'paris', 'tokyo', 'sydney',
-            'dubai', 'singapore', 'hong kong', 'berlin', 'toronto'
-        ]
-        
-        for city in known_cities:
+        for city in KNOWN_CITIES:
             if city in query_lower:
                 return city.title()
         
@@ -1,18 +1,33 @@
-from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi import APIRouter, Header, HTTPException, Request, UploadFile, File
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
+from datetime import datetime, time, timedelta
 import json
 # Add to imports
 from fastapi import UploadFile, File, Form
 import shutil
 from pathlib import Path
+from tools.meeting_io import (
+    MeetingImporter, export_meetings, encode_events, IMPORT_FORMATS, STREAM_FORMATS, STREAM_MEDIA_TYPES
+)
+from utils.validator import parse_datetime, to_local_naive
+from database.instrumentation import sql_metrics
+from tools.agenda_cache import agenda_cache
+from tools.idempotency import idempotency_store, IdempotencyConflict, IdempotencyInProgress
+from tools.meeting_query import MeetingFilter, STATS_GROUPS, describe_filter
 
 router = APIRouter()
 
+SCHEDULE_BATCH_LIMIT = 500
+
 class QueryRequest(BaseModel):
     query: str
     user_id: str = "default"
     session_id: str = "default"
+    document_id: Optional[str] = None  # limit document queries to one document
+    stream: Optional[str] = None  # ndjson or sse
 
 class MeetingRequest(BaseModel):
     title: str
@@ -22,15 +37,75 @@ class MeetingRequest(BaseModel):
     location: Optional[str] = "Conference Room"
     check_weather: Optional[bool] = False
     city: Optional[str] = "London"
+    participants: Optional[List[str]] = None
+
+class BatchMeetingRequest(BaseModel):
+    meetings: List[MeetingRequest]
+
+class RecurringMeetingRequest(BaseModel):
+    title: str
+    description: Optional[str] = None
+    scheduled_time: str  # ISO format, first occurrence
+    recurrence_rule: str  # RRULE, e.g. FREQ=WEEKLY;BYDAY=MO;COUNT=10
+    duration_minutes: Optional[int] = 60
+    location: Optional[str] = "Conference Room"
+    organizer: Optional[str] = "System"
+    participants: Optional[List[str]] = None
+
+class OccurrenceChangeRequest(BaseModel):
+    occurrence_start: str  # ISO format, as generated by the rule
+    action: str = "cancel"  # cancel, modify
+    scheduled_time: Optional[str] = None
+    title: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    location: Optional[str] = None
+
+class FreeSlotRequest(BaseModel):
+    participants: List[str]
+    duration_minutes: int = 60
+    start: Optional[str] = None  # ISO format, defaults to now
+    end: Optional[str] = None  # ISO format, defaults to start + 7 days
+    day_start: str = "09:00"  # working hours, HH:MM
+    day_end: str = "17:00"
+    include_weekends: bool = False
+    step_minutes: int = 15
+    limit: int = 5
+    city: Optional[str] = None  # rank free slots by forecast weather in this city
+
+def _stream_format(request: Request, requested: Optional[str]) -> Optional[str]:
+    """Streaming format from an explicit parameter or the Accept header"""
+    if requested:
+        if requested not in STREAM_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported stream format. Allowed: {', '.join(STREAM_FORMATS)}")
+        return requested
+    accept = request.headers.get("accept", "")
+    for fmt, media_type in STREAM_MEDIA_TYPES.items():
+        if media_type in accept:
+            return fmt
+    return None
+
+def _streaming_response(events, fmt: str) -> StreamingResponse:
+    # Sync iterators run in the threadpool, so cursor reads do not block the loop
+    return StreamingResponse(
+        encode_events(events, fmt),
+        media_type=STREAM_MEDIA_TYPES[fmt],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/query")
 async def process_query(request: Request, query_request: QueryRequest):
     """Process user query through agent orchestrator"""
+    stream_format = _stream_format(request, query_request.stream)
     try:
         orchestrator = request.app.state.orchestrator
+        if stream_format:
+            events = await orchestrator.stream_query(query_request.query, query_request.user_id)
+            return _streaming_response(events, stream_format)
+        
         result = await orchestrator.route_query(query_request.query, query_request.user_id)
         
-        return result
+        # Agent results may carry datetimes; orjson encodes them natively
+        return ORJSONResponse(result)
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -44,6 +119,13 @@ async def list_agents(request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting agent status: {str(e)}")
 
+@router.get("/metrics/sql")
+async def sql_metrics_endpoint(top: int = 50):
+    """Statement latency histograms, slow queries, N+1 warnings and pool waits"""
+    metrics = sql_metrics.snapshot(top=top)
+    metrics["agenda_cache"] = agenda_cache.get_stats()
+    return metrics
+
 @router.post("/weather")
 async def weather_endpoint(request: Request, query_request: QueryRequest):
     """Direct weather query endpoint"""
@@ -60,12 +142,37 @@ async def weather_endpoint(request: Request, query_request: QueryRequest):
 async def get_meetings(
     request: Request,
     date: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    stream: Optional[str] = None
 ):
-    """Get meetings with optional filtering"""
+    """Get meetings with optional filtering.
+    
+    start/end select a date range directly; stream=ndjson|sse (or a matching
+    Accept header) sends rows as they are read instead of one JSON body.
+    """
+    stream_format = _stream_format(request, stream)
     try:
         db_agent = request.app.state.db_agent
         
+        if start or end:
+            try:
+                # Stored meeting times are naive local time
+                meeting_filter = MeetingFilter(
+                    start=to_local_naive(parse_datetime(start)) if start else None,
+                    end=to_local_naive(parse_datetime(end)) if end else None,
+                    keywords=tuple(search.split()) if search else (),
+                    status="scheduled"
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid date range: {str(e)}")
+            title = f"Meetings {describe_filter(meeting_filter)}"
+            if stream_format:
+                return _streaming_response(db_agent.stream_filter(meeting_filter, title), stream_format)
+            
+            return ORJSONResponse(db_agent.process_filter(meeting_filter))
+        
         if search:
             query = f"search meetings about {search}"
         elif date:
@@ -73,38 +180,278 @@ async def get_meetings(
         else:
             query = "meetings today"
         
+        if stream_format:
+            events = db_agent.stream_query(query)
+            if events is not None:
+                return _streaming_response(events, stream_format)
+        
         result = await db_agent.process(query)
-        return result
+        return ORJSONResponse(result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@router.get("/meetings/stats")
+async def get_meeting_stats(
+    request: Request,
+    group_by: Optional[str] = "day",
+    rank_by: str = "meetings",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[str] = None,
+    organizer: Optional[str] = None,
+    location: Optional[str] = None,
+    participant: Optional[str] = None,
+    search: Optional[str] = None,
+    top: Optional[int] = None
+):
+    """Meeting counts and hours per group, aggregated in the database"""
+    if group_by == "none":
+        group_by = None
+    if group_by is not None and group_by not in STATS_GROUPS:
+        raise HTTPException(status_code=400, detail=f"Unsupported group_by. Allowed: {', '.join(STATS_GROUPS)}, none")
+    if rank_by not in ("meetings", "hours"):
+        raise HTTPException(status_code=400, detail="rank_by must be 'meetings' or 'hours'")
+    
+    try:
+        meeting_filter = MeetingFilter(
+            start=to_local_naive(parse_datetime(start)) if start else None,
+            end=to_local_naive(parse_datetime(end)) if end else None,
+            keywords=tuple(search.split()) if search else (),
+            status=status,
+            location=location,
+            organizer=organizer,
+            participant=participant.strip().lower() if participant else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date range: {str(e)}")
+    
+    db_tool = request.app.state.db_agent.db_tool
+    result = db_tool.get_meeting_stats(meeting_filter, group_by, rank_by, top)
+    if not result.get("success"):
+        raise HTTPException(status_code=500, detail=f"Database error: {result.get('error')}")
+    return ORJSONResponse(result)
+
+@router.post("/meetings/free-slots")
+async def find_free_slots(request: Request, slot_request: FreeSlotRequest):
+    """Earliest slots in which every participant is free within working hours"""
+    if not slot_request.participants:
+        raise HTTPException(status_code=400, detail="At least one participant is required")
+    if not 0 < slot_request.duration_minutes <= 24 * 60:
+        raise HTTPException(status_code=400, detail="duration_minutes must be between 1 and 1440")
+    if not 0 < slot_request.step_minutes <= 24 * 60 or not 0 < slot_request.limit <= 100:
+        raise HTTPException(status_code=400, detail="step_minutes must be 1-1440 and limit 1-100")
+    
+    try:
+        # Stored meeting times are naive local time
+        start = to_local_naive(parse_datetime(slot_request.start)) if slot_request.start else datetime.now()
+        end = to_local_naive(parse_datetime(slot_request.end)) if slot_request.end else start + timedelta(days=7)
+        day_start = time.fromisoformat(slot_request.day_start)
+        day_end = time.fromisoformat(slot_request.day_end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid time: {str(e)}")
+    if end <= start or day_end <= day_start:
+        raise HTTPException(status_code=400, detail="end must be after start, day_end after day_start")
+    
+    meeting_agent = request.app.state.meeting_agent
+    if slot_request.city:
+        # Weather ranking only covers the 5-day forecast window; start/end are clipped to it
+        try:
+            result = meeting_agent.find_weather_slots(
+                slot_request.city, slot_request.participants, slot_request.duration_minutes,
+                limit=slot_request.limit, start=start, end=end, day_start=day_start, day_end=day_end,
+                include_weekends=slot_request.include_weekends, step_minutes=slot_request.step_minutes
+            )
+        except Exception as e:
+            # An empty busy list would report every slot as free
+            raise HTTPException(status_code=500, detail=f"Could not load calendars: {str(e)}")
+        if not result["success"]:
+            raise HTTPException(status_code=502, detail=result["error"])
+        return ORJSONResponse({
+            "success": True,
+            "participants": len(slot_request.participants),
+            "duration_minutes": slot_request.duration_minutes,
+            "city": result["city"],
+            "slots": result["slots"],
+            "count": len(result["slots"])
+        })
+    
+    try:
+        slots = meeting_agent.find_free_slots(
+            slot_request.participants, slot_request.duration_minutes, start, end,
+            day_start=day_start, day_end=day_end, include_weekends=slot_request.include_weekends,
+            step_minutes=slot_request.step_minutes, limit=slot_request.limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not load calendars: {str(e)}")
+    return ORJSONResponse({
+        "success": True,
+        "participants": len(slot_request.participants),
+        "duration_minutes": slot_request.duration_minutes,
+        "slots": [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots],
+        "count": len(slots)
+    })
+
+@router.post("/meetings/import")
+async def import_meetings(request: Request, format: Optional[str] = None):
+    """Bulk import meetings from an NDJSON or CSV request body"""
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Allowed: {', '.join(IMPORT_FORMATS)}")
+    
+    try:
+        db_tool = request.app.state.db_agent.db_tool
+        importer = MeetingImporter(db_tool)
+        return await importer.run(request.stream(), fmt)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be UTF-8 encoded")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Meeting import error: {str(e)}")
+
+@router.get("/meetings/export")
+async def export_meetings_endpoint(
+    request: Request,
+    format: str = "ndjson",
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """Stream all meetings (optionally within [start, end)) as NDJSON or CSV"""
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Allowed: {', '.join(IMPORT_FORMATS)}")
+    
+    try:
+        start_time = to_local_naive(parse_datetime(start)) if start else None
+        end_time = to_local_naive(parse_datetime(end)) if end else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date range: {str(e)}")
+    
+    db_tool = request.app.state.db_agent.db_tool
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        export_meetings(db_tool, format, start_time, end_time),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=meetings.{format}"}
+    )
+
+@router.post("/meetings/recurring")
+async def create_recurring_meeting(request: Request, meeting_request: RecurringMeetingRequest):
+    """Create a recurring meeting stored once as an RRULE series"""
+    try:
+        db_tool = request.app.state.db_agent.db_tool
+        meeting_data = meeting_request.model_dump()
+        meeting_data["scheduled_time"] = to_local_naive(parse_datetime(meeting_data["scheduled_time"]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scheduled_time: {str(e)}")
+    
+    try:
+        result = db_tool.create_meeting(meeting_data)
+        if not result["success"] and "recurrence rule" in result.get("error", ""):
+            raise HTTPException(status_code=400, detail=result["error"])
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Recurring meeting error: {str(e)}")
+
+@router.post("/meetings/{meeting_id}/occurrences")
+async def change_occurrence(request: Request, meeting_id: int, change: OccurrenceChangeRequest):
+    """Cancel or modify a single occurrence of a recurring meeting"""
+    try:
+        occurrence_start = to_local_naive(parse_datetime(change.occurrence_start))
+        changes = change.model_dump(
+            exclude={"occurrence_start", "action"}, exclude_none=True
+        )
+        if "scheduled_time" in changes:
+            changes["scheduled_time"] = to_local_naive(parse_datetime(changes["scheduled_time"]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid datetime: {str(e)}")
+    
+    db_tool = request.app.state.db_agent.db_tool
+    if change.action == "cancel":
+        return db_tool.cancel_occurrence(meeting_id, occurrence_start)
+    if change.action == "modify":
+        if not changes:
+            raise HTTPException(status_code=400, detail="Nothing to modify")
+        return db_tool.modify_occurrence(meeting_id, occurrence_start, changes)
+    raise HTTPException(status_code=400, detail="action must be 'cancel' or 'modify'")
+
+@router.post("/meetings/weather/annotate")
+async def annotate_meeting_weather(request: Request):
+    """Run the batch weather annotation job for upcoming meetings now"""
+    try:
+        job = request.app.state.weather_annotation_job
+        return await run_in_threadpool(job.run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Weather annotation error: {str(e)}")
+
+@router.get("/meetings/weather/annotate")
+async def weather_annotation_status(request: Request):
+    """Throughput and counts from the last weather annotation run"""
+    job = request.app.state.weather_annotation_job
+    return {"last_run": job.last_run}
+
 @router.post("/meetings/schedule")
-async def schedule_meeting(request: Request, meeting_request: MeetingRequest):
-    """Schedule a new meeting"""
+async def schedule_meeting(
+    request: Request,
+    meeting_request: MeetingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Schedule a new meeting; retries with the same Idempotency-Key replay the first result"""
+    if idempotency_key is None:
+        return await _schedule_meeting(request, meeting_request)
+    if not 0 < len(idempotency_key) <= 200:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-200 characters")
+    
+    try:
+        result, replayed = await idempotency_store.run(
+            f"schedule:{idempotency_key}",
+            idempotency_store.fingerprint(meeting_request.model_dump_json()),
+            lambda: _schedule_meeting(request, meeting_request),
+            # Bookings, conflicts and proposals are final; errors may be transient
+            cacheable=lambda result: "error" not in result
+        )
+    except IdempotencyConflict:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    except IdempotencyInProgress:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress",
+                            headers={"Retry-After": "1"})
+    return ORJSONResponse(result, headers={"Idempotent-Replayed": "true" if replayed else "false"})
+
+@router.post("/meetings/schedule/batch")
+async def schedule_meetings(request: Request, batch_request: BatchMeetingRequest):
+    """Schedule many meetings in one transaction, reporting an outcome per meeting"""
+    if not 0 < len(batch_request.meetings) <= SCHEDULE_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {SCHEDULE_BATCH_LIMIT} meetings")
+    
     try:
         meeting_agent = request.app.state.meeting_agent
-        
-        # Create query for the agent
-        query_parts = [f"Schedule a meeting titled '{meeting_request.title}'"]
-        
-        if meeting_request.description:
-            query_parts.append(f"about {meeting_request.description}")
-        
-        query_parts.append(f"at {meeting_request.scheduled_time}")
-        query_parts.append(f"for {meeting_request.duration_minutes} minutes")
-        
-        if meeting_request.location:
-            query_parts.append(f"at {meeting_request.location}")
-        
-        if meeting_request.check_weather:
-            query_parts.append(f"and verify weather in {meeting_request.city}")
-        
-        query = " ".join(query_parts)
-        
-        result = await meeting_agent.process(query)
-        return result
-        
+        result = await meeting_agent.schedule_meetings(
+            [meeting.model_dump() for meeting in batch_request.meetings]
+        )
+        return ORJSONResponse(result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch scheduling error: {str(e)}")
+
+async def _schedule_meeting(request: Request, meeting_request: MeetingRequest) -> Dict[str, Any]:
+    try:
+        scheduled_time = parse_datetime(meeting_request.scheduled_time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scheduled_time: {str(e)}")
+    
+    try:
+        meeting_agent = request.app.state.meeting_agent
+        return await meeting_agent.schedule_meeting(
+            meeting_request.title,
+            scheduled_time,
+            duration_minutes=meeting_request.duration_minutes,
+            description=meeting_request.description,
+            location=meeting_request.location,
+            participants=meeting_request.participants,
+            check_weather=meeting_request.check_weather,
+            city=meeting_request.city
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Meeting scheduling error: {str(e)}")
 
@@ -150,187 +497,188 @@ async def test_endpoints(request: Request):
     }
 
 
-# Add new routes
-    @router.post("/document/upload")
-    async def upload_document(
-        request: Request,
-        file: UploadFile = File(...),
-        description: str = Form(None)
-    ):
-        """Upload and process a document"""
-        try:
-            document_agent = request.app.state.document_agent
-            if not document_agent:
-                 raise HTTPException(status_code=503, detail="Document agent is not available (missing dependencies)")
+@router.post("/document/upload")
+async def upload_document(
+    request: Request,
+    file: UploadFile = File(...),
+    description: str = Form(None),
+    user_id: str = Form("default")
+):
+    """Upload and process a document"""
+    try:
+        document_agent = request.app.state.document_agent
+        if not document_agent:
+             raise HTTPException(status_code=503, detail="Document agent is not available (missing dependencies)")
 
-            # Check file type
-            allowed_extensions = ['.pdf', '.txt', '.docx']
-            file_extension = Path(file.filename).suffix.lower()
-            
-            if file_extension not in allowed_extensions:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
-                )
-            
-            # Read file content
-            content = await file.read()
-            
-            # Process with document agent
-            result = await document_agent.process(
-                query=f"Upload document {file.filename}",
-                file_content=content,
-                filename=file.filename
+        # Check file type
+        allowed_extensions = ['.pdf', '.txt', '.docx']
+        file_extension = Path(file.filename).suffix.lower()
+        
+        if file_extension not in allowed_extensions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
             )
-            
-            return result
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Document upload error: {str(e)}")
-    
-    @router.post("/document/query")
-    async def query_document(
-        request: Request,
-        query_request: QueryRequest
-    ):
-        """Query the uploaded document"""
-        try:
-            document_agent = request.app.state.document_agent
-            if not document_agent:
-                 raise HTTPException(status_code=503, detail="Document agent is not available (missing dependencies)")
-
-            # Check if document is loaded
-            if not document_agent.current_document:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No document loaded. Please upload a document first."
-                )
-            
-            result = await document_agent.process(query_request.query)
-            return result
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Document query error: {str(e)}")
-    
-    @router.get("/document/status")
-    async def document_status(request: Request):
-        """Get status of currently loaded document"""
-        try:
-            document_agent = request.app.state.document_agent
-            if not document_agent:
-                 return {"loaded": False, "status": "unavailable"}
-
-            return {
-                "loaded": document_agent.current_document is not None,
-                "filename": document_agent.current_filename,
-                "characters": len(document_agent.current_document) if document_agent.current_document else 0,
-                "has_vector_store": document_agent.document_tool.vector_store is not None
-            }
-            
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error getting document status: {str(e)}")
-    
-    @router.delete("/document/clear")
-    async def clear_document(request: Request):
-        """Clear the currently loaded document"""
-        try:
-            document_agent = request.app.state.document_agent
-            if not document_agent:
-                 raise HTTPException(status_code=503, detail="Document agent is not available")
+        
+        # Read file content
+        content = await file.read()
+        
+        # Process with document agent
+        result = await document_agent.process(
+            query=f"Upload document {file.filename}",
+            file_content=content,
+            filename=file.filename,
+            user_id=user_id
+        )
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Document upload error: {str(e)}")
 
-            document_agent.clear_document()
-            
-            return {
-                "success": True,
-                "message": "Document cleared successfully"
-            }
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error clearing document: {str(e)}")
-    
-    @router.post("/document/example")
-    async def load_example_document(request: Request):
-        """Load an example resume document"""
-        try:
-            document_agent = request.app.state.document_agent
-            if not document_agent:
-                 raise HTTPException(status_code=503, detail="Document agent is not available")
-            
-            # Example resume text
-            example_resume = """
-            JOHN DOE - SOFTWARE ENGINEER
-            Contact: john.doe@email.com | (123) 456-7890 | LinkedIn: linkedin.com/in/johndoe
-            
-            SUMMARY
-            Senior Software Engineer with 8+ years of experience in building scalable web applications.
-            Specialized in Python, FastAPI, and cloud technologies. Proven track record of leading
-            teams and delivering high-quality software solutions.
-            
-            EXPERIENCE
-            Senior Software Engineer - Tech Solutions Inc. (2020-Present)
-            • Led development of microservices architecture handling 1M+ daily requests
-            • Implemented CI/CD pipeline reducing deployment time by 70%
-            • Mentored 5 junior developers
-            • Technologies: Python, FastAPI, PostgreSQL, Docker, AWS
-            
-            Software Engineer - Innovate Corp (2016-2020)
-            • Developed REST APIs for mobile and web applications
-            • Optimized database queries improving performance by 40%
-            • Collaborated with product team on feature planning
-            • Technologies: Python, Django, MySQL, React
-            
-            EDUCATION
-            Master of Science in Computer Science - Stanford University (2016)
-            Bachelor of Technology in Computer Engineering - MIT (2014)
-            
-            SKILLS
-            • Programming: Python, JavaScript, TypeScript, SQL
-            • Frameworks: FastAPI, Django, React, Node.js
-            • Tools: Docker, Kubernetes, AWS, Git, Jenkins
-            • Databases: PostgreSQL, MySQL, MongoDB, Redis
-            
-            CERTIFICATIONS
-            • AWS Certified Solutions Architect
-            • Google Cloud Professional Developer
-            • Python Institute PCAP
-            
-            PROJECTS
-            • Agentic AI Chatbot: Built a multi-agent AI system with weather, document, and scheduling capabilities
-            • E-commerce Platform: Developed scalable microservices architecture serving 500k users
-            • Real-time Analytics Dashboard: Created dashboard for monitoring system metrics
-            
-            LANGUAGES
-            • English (Native)
-            • Spanish (Fluent)
-            • French (Intermediate)
-            """
-            
-            # Process the example resume
-            success = document_agent.document_tool.create_vector_store(
-                example_resume, 
-                "Example_Resume.txt"
+@router.post("/document/query")
+async def query_document(
+    request: Request,
+    query_request: QueryRequest
+):
+    """Query the uploaded document"""
+    try:
+        document_agent = request.app.state.document_agent
+        if not document_agent:
+             raise HTTPException(status_code=503, detail="Document agent is not available (missing dependencies)")
+
+        # Check if this user has a document loaded
+        document_ids = [query_request.document_id] if query_request.document_id else None
+        if not document_agent.documents(query_request.user_id, document_ids):
+            raise HTTPException(
+                status_code=400,
+                detail="No document loaded. Please upload a document first."
             )
-            
-            if success:
-                document_agent.current_document = example_resume
-                document_agent.current_filename = "Example_Resume.txt"
-                
-                return {
-                    "success": True,
-                    "message": "Example resume loaded successfully",
-                    "filename": "Example_Resume.txt",
-                    "summary": document_agent._analyze_document(example_resume)
-                }
-            else:
-                raise HTTPException(status_code=500, detail="Failed to load example document")
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error loading example: {str(e)}")
\ No newline at end of file
+        
+        result = await document_agent.process(
+            query_request.query,
+            user_id=query_request.user_id,
+            document_ids=document_ids
+        )
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Document query error: {str(e)}")
+
+@router.get("/document/status")
+async def document_status(request: Request, user_id: str = "default"):
+    """Get status of the user's loaded documents"""
+    try:
+        document_agent = request.app.state.document_agent
+        if not document_agent:
+             return {"loaded": False, "status": "unavailable"}
+
+        documents = document_agent.documents(user_id)
+        return {
+            "loaded": bool(documents),
+            "documents": [entry.to_dict() for entry in documents],
+            "ingesting": document_agent.ingesting(user_id),
+            "registry": document_agent.registry.stats(),
+            "embedding_cache": document_agent.document_tool.embedding_cache.stats()
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting document status: {str(e)}")
+
+@router.delete("/document/clear")
+async def clear_document(request: Request, user_id: str = "default", document_id: Optional[str] = None):
+    """Clear one of the user's documents, or all of them"""
+    try:
+        document_agent = request.app.state.document_agent
+        if not document_agent:
+             raise HTTPException(status_code=503, detail="Document agent is not available")
+
+        removed = document_agent.clear_document(user_id, document_id)
+        
+        return {
+            "success": True,
+            "message": "Document cleared successfully",
+            "removed": removed
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing document: {str(e)}")
+
+@router.post("/document/example")
+async def load_example_document(request: Request, user_id: str = "default"):
+    """Load an example resume document"""
+    try:
+        document_agent = request.app.state.document_agent
+        if not document_agent:
+             raise HTTPException(status_code=503, detail="Document agent is not available")
+        
+        # Example resume text
+        example_resume = """
+        JOHN DOE - SOFTWARE ENGINEER
+        Contact: john.doe@email.com | (123) 456-7890 | LinkedIn: linkedin.com/in/johndoe
+        
+        SUMMARY
+        Senior Software Engineer with 8+ years of experience in building scalable web applications.
+        Specialized in Python, FastAPI, and cloud technologies. Proven track record of leading
+        teams and delivering high-quality software solutions.
+        
+        EXPERIENCE
+        Senior Software Engineer - Tech Solutions Inc. (2020-Present)
+        • Led development of microservices architecture handling 1M+ daily requests
+        • Implemented CI/CD pipeline reducing deployment time by 70%
+        • Mentored 5 junior developers
+        • Technologies: Python, FastAPI, PostgreSQL, Docker, AWS
+        
+        Software Engineer - Innovate Corp (2016-2020)
+        • Developed REST APIs for mobile and web applications
+        • Optimized database queries improving performance by 40%
+        • Collaborated with product team on feature planning
+        • Technologies: Python, Django, MySQL, React
+        
+        EDUCATION
+        Master of Science in Computer Science - Stanford University (2016)
+        Bachelor of Technology in Computer Engineering - MIT (2014)
+        
+        SKILLS
+        • Programming: Python, JavaScript, TypeScript, SQL
+        • Frameworks: FastAPI, Django, React, Node.js
+        • Tools: Docker, Kubernetes, AWS, Git, Jenkins
+        • Databases: PostgreSQL, MySQL, MongoDB, Redis
+        
+        CERTIFICATIONS
+        • AWS Certified Solutions Architect
+        • Google Cloud Professional Developer
+        • Python Institute PCAP
+        
+        PROJECTS
+        • Agentic AI Chatbot: Built a multi-agent AI system with weather, document, and scheduling capabilities
+        • E-commerce Platform: Developed scalable microservices architecture serving 500k users
+        • Real-time Analytics Dashboard: Created dashboard for monitoring system metrics
+        
+        LANGUAGES
+        • English (Native)
+        • Spanish (Fluent)
+        • French (Intermediate)
+        """
+        
+        # Process the example resume
+        entry = document_agent.load_document(user_id, "Example_Resume.txt", example_resume)
+        
+        return {
+            "success": True,
+            "message": "Example resume loaded successfully",
+            "filename": "Example_Resume.txt",
+            "document_id": entry.document_id,
+            "summary": entry.summary
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading example: {str(e)}")
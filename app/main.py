@@ -1,7 +1,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 # Add to imports
@@ -10,8 +14,11 @@ from agents.db_agent import DatabaseAgent
 from agents.meeting_agent import MeetingAgent
 from agents.orchestrator import AgentOrchestrator
 from database.connection import db_manager
+from database.instrumentation import sql_metrics
+from jobs.weather_annotation import WeatherAnnotationJob
 try:
     from agents.document_agent import DocumentAgent
+    from tools.document_workers import worker_context
     document_agent_available = True
 except ImportError:
     DocumentAgent = None
@@ -24,6 +31,17 @@ from app.config import settings
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+async def run_weather_annotation_loop(job: WeatherAnnotationJob, interval_minutes: int):
+    """Periodically annotate upcoming meetings with forecast weather"""
+    while True:
+        try:
+            await asyncio.to_thread(job.run)
+        except Exception as e:
+            logger.error(f"Weather annotation job failed: {e}")
+        await asyncio.sleep(interval_minutes * 60)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events"""
@@ -37,18 +55,29 @@ async def lifespan(app: FastAPI):
     
     # Initialize agents
     weather_agent = WeatherAgent(
-        api_key=os.getenv("OPENWEATHER_API_KEY", "")
+        api_key=os.getenv("OPENWEATHER_API_KEY", ""),
+        cache_ttl_seconds=settings.WEATHER_CACHE_TTL_SECONDS
     )
     db_agent = DatabaseAgent()
     meeting_agent = MeetingAgent(weather_agent)
     
     document_agent = None
+    document_executor = None
     if document_agent_available:
         try:
+            if settings.DOCUMENT_WORKERS >= 0:
+                # Workers start on first use; CPU-bound PDF work runs outside the GIL
+                document_executor = ProcessPoolExecutor(max_workers=settings.DOCUMENT_WORKERS or None,
+                                                        mp_context=worker_context())
             document_agent = DocumentAgent(
                 openai_api_key=os.getenv("OPENAI_API_KEY"),
-                upload_dir="static/uploads"
+                upload_dir="static/uploads",
+                memory_budget_mb=settings.DOCUMENT_MEMORY_BUDGET_MB,
+                executor=document_executor,
+                pages_per_task=settings.DOCUMENT_PAGES_PER_TASK
             )
+            # Warm start: catalog documents persisted before the restart
+            document_agent.warm_start()
         except Exception as e:
             print(f"Failed to initialize DocumentAgent: {e}")
             document_agent_available = False
@@ -61,18 +90,33 @@ async def lifespan(app: FastAPI):
     if document_agent_available and document_agent:
         orchestrator.register_agent(document_agent)
     
+    weather_annotation_job = WeatherAnnotationJob(
+        weather_agent.weather_tool,
+        default_city=settings.DEFAULT_WEATHER_CITY
+    )
+    annotation_task = None
+    if settings.WEATHER_ANNOTATION_INTERVAL_MINUTES > 0:
+        annotation_task = asyncio.create_task(run_weather_annotation_loop(
+            weather_annotation_job, settings.WEATHER_ANNOTATION_INTERVAL_MINUTES
+        ))
+    
     # Store in app state
     app.state.orchestrator = orchestrator
     app.state.weather_agent = weather_agent
     app.state.db_agent = db_agent
     app.state.meeting_agent = meeting_agent
     app.state.document_agent = document_agent
+    app.state.weather_annotation_job = weather_annotation_job
     
     print("All 4 agents initialized successfully!")
     yield
     
     # Shutdown
     print("Shutting down...")
+    if annotation_task:
+        annotation_task.cancel()
+    if document_executor:
+        document_executor.shutdown(wait=False, cancel_futures=True)
     # Close database connections if needed
 
 # Create FastAPI app
@@ -80,7 +124,8 @@ app = FastAPI(
     title="Agentic AI Chatbot",
     description="Multi-agent AI chatbot with weather, document, and scheduling capabilities",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -92,6 +137,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def sql_request_scope(request, call_next):
+    """Attribute SQL statements to the request for N+1 detection"""
+    with sql_metrics.request_scope(f"{request.method} {request.url.path}"):
+        return await call_next(request)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
@@ -0,0 +1,105 @@
+"""PDF ingestion: text extraction and chunking, inline vs. the process pool.
+
+Generates synthetic text PDFs, then times extracting and chunking them in
+the calling process (what uploads did before) against page ranges fanned
+out over a ProcessPoolExecutor. The pool is started before timing, as the
+app's lifespan-owned pool would be.
+
+Run from the repository root:
+    python -m benchmarks.bench_document_ingest [pages ...]
+"""
+import os
+import random
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.common import timer, print_table
+
+from tools.document_tool import DocumentTool
+from tools.document_workers import DocumentAnalysis, parallel_pdf_chunks, worker_context
+
+LINES_PER_PAGE = 45
+WORDS_PER_LINE = 12
+PAGES_PER_TASK = 25
+WORDS = ("policy", "procedure", "employee", "benefit", "claim", "coverage", "medical", "leave",
+         "approval", "manager", "request", "travel", "expense", "report", "summary", "review")
+
+
+def synthetic_pdf(path: str, pages: int, seed: int = 0):
+    """Write a plain-text PDF with Helvetica text lines on every page"""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for number in range(pages):
+        lines = [f"Section {number + 1}"] + [
+            " ".join(rng.choice(WORDS) for _ in range(WORDS_PER_LINE)) for _ in range(LINES_PER_PAGE - 1)
+        ]
+        text = " ".join(f"({line}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 50 780 Td {text} ET".encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), pages)
+    
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        f.writelines(b"%010d 00000 n \n" % offset for offset in offsets)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def inline(tool: DocumentTool, path: str):
+    analysis = DocumentAnalysis()
+    chunks = list(tool.iter_chunks(analysis.observe(tool.iter_pages(path, ".pdf"))))
+    return chunks, analysis
+
+
+def pooled(executor: ProcessPoolExecutor, path: str):
+    analysis = DocumentAnalysis()
+    return list(parallel_pdf_chunks(executor, path, analysis, PAGES_PER_TASK)), analysis
+
+
+def main(sizes):
+    workers = os.cpu_count() or 1
+    tool = DocumentTool()
+    directory = tempfile.mkdtemp(prefix="medify-bench-")
+    
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=worker_context()) as executor:
+        # Start the workers and import the document stack in each before timing
+        path = os.path.join(directory, "warmup.pdf")
+        synthetic_pdf(path, PAGES_PER_TASK * workers)
+        pooled(executor, path)
+        
+        for pages in sizes:
+            path = os.path.join(directory, f"synthetic-{pages}.pdf")
+            synthetic_pdf(path, pages, seed=pages)
+            results = {}
+            with timer(results, "inline"):
+                inline_chunks, inline_analysis = inline(tool, path)
+            with timer(results, "pool"):
+                pool_chunks, pool_analysis = pooled(executor, path)
+            
+            assert pool_analysis.words == inline_analysis.words, (pool_analysis.words, inline_analysis.words)
+            rows.append((pages, len(inline_chunks), len(pool_chunks),
+                         f"{results['inline'] * 1000:.0f}", f"{results['pool'] * 1000:.0f}",
+                         f"{results['inline'] / results['pool']:.1f}x"))
+    
+    print_table(f"PDF extraction + chunking, {workers} workers, {PAGES_PER_TASK} pages per task",
+                ("pages", "inline chunks", "pool chunks", "inline ms", "pool ms", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 500, 1000])
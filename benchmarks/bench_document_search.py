@@ -0,0 +1,102 @@
+"""Keyword search over a document's chunks without embeddings.
+
+Compares the inverted index (score only the postings of the question's
+terms) with a BM25 mat-vec over every nonzero of the chunk x term matrix
+and the per-chunk word overlap scan both replace, on synthetic chunks with a Zipf vocabulary.
+Rare-term questions touch few postings; common-term ones touch many.
+
+Run from the repository root:
+    python -m benchmarks.bench_document_search [chunks ...]
+"""
+import sys
+
+import numpy as np
+
+from benchmarks.common import timer, print_table
+
+from tools.lexical_index import BM25Index
+
+VOCABULARY = 50000
+WORDS_PER_CHUNK = 150
+QUERIES = 50
+TOP_K = 3
+
+# Zipf ranks: low ranks are common words, high ranks rare ones
+QUESTIONS = {
+    "rare terms": "t4000 t9000 t20000",
+    "mixed terms": "t3 t300 t3000",
+    "common terms": "t1 t2 t3 t5",
+}
+
+
+def corpus(chunks: int):
+    rng = np.random.default_rng(chunks)
+    ranks = np.minimum(rng.zipf(1.1, size=(chunks, WORDS_PER_CHUNK)), VOCABULARY)
+    return [" ".join(f"t{rank}" for rank in row) for row in ranks]
+
+
+def overlap_scan(texts, question: str):
+    """The old shape: build every chunk's word set and score it on each question"""
+    question_words = set(question.lower().split())
+    scores = []
+    for position, text in enumerate(texts):
+        content_words = set(text.lower().split())
+        union = len(question_words | content_words)
+        scores.append((len(question_words & content_words) / union if union else 0, position))
+    scores.sort(reverse=True, key=lambda x: x[0])
+    return scores[:TOP_K]
+
+
+def csr(index: BM25Index):
+    """Chunk-major copy of the index: one entry per nonzero with its term"""
+    terms = np.repeat(np.arange(len(index.vocabulary), dtype=np.int32), np.diff(index.indptr))
+    return np.asarray(index.chunks), terms, np.asarray(index.weights)
+
+
+def full_matvec(index: BM25Index, matrix, question: str):
+    """Score every chunk with one mat-vec over all nonzeros, then take the top k"""
+    rows, terms, weights = matrix
+    query = np.zeros(len(index.vocabulary), dtype=np.float32)
+    for token in question.split():
+        if token in index.vocabulary:
+            query[index.vocabulary[token]] += 1
+    scores = np.bincount(rows, weights=weights * query[terms], minlength=len(index))
+    best = np.argpartition(-scores, TOP_K - 1)[:TOP_K]
+    return best[np.argsort(-scores[best])]
+
+
+def repeat(fn, *args):
+    for _ in range(QUERIES):
+        fn(*args)
+
+
+def main(sizes):
+    rows = []
+    for chunks in sizes:
+        texts = corpus(chunks)
+        results = {}
+        with timer(results, "build"):
+            index = BM25Index.build(texts)
+        matrix = csr(index)
+        
+        for label, question in QUESTIONS.items():
+            postings = sum(int(index.indptr[index.vocabulary[token] + 1] - index.indptr[index.vocabulary[token]])
+                           for token in question.split() if token in index.vocabulary)
+            with timer(results, "postings"):
+                repeat(index.top_k, question, TOP_K)
+            with timer(results, "matvec"):
+                repeat(full_matvec, index, matrix, question)
+            with timer(results, "overlap"):
+                overlap_scan(texts, question)
+            
+            rows.append((chunks, label, postings, f"{results['build']:.2f}",
+                         f"{results['postings'] / QUERIES * 1000:.3f}",
+                         f"{results['matvec'] / QUERIES * 1000:.3f}",
+                         f"{results['overlap'] * 1000:.1f}"))
+    
+    print_table(f"Top-{TOP_K} keyword search, ms per question ({WORDS_PER_CHUNK} words per chunk)",
+                ("chunks", "question", "postings", "build s", "postings ms", "mat-vec ms", "overlap ms"), rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,109 @@
+"""Free-slot search across many participants' calendars.
+
+Compares the free/busy engine (one busy-interval query for everyone, then a
+merge sweep) with the per-participant approach it replaces (one busy-time
+query per participant, then a 15-minute grid scan).
+
+Run from the repository root:
+    python -m benchmarks.bench_free_slots [participants ...]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_database, timer, print_table
+
+from database.connection import db_manager
+from models.database import Meeting, MeetingParticipant
+from tools.availability import find_free_slots, working_windows
+from tools.database_tool import DatabaseTool
+
+MEETINGS_PER_DAY = 4
+DAYS = 14
+DURATION = 60
+
+
+def seed(participants: int, start: datetime):
+    session = db_manager.get_session()
+    try:
+        session.query(MeetingParticipant).delete()
+        session.query(Meeting).delete()
+        session.commit()
+    finally:
+        session.close()
+    
+    rng = random.Random(participants)
+    emails = [f"person{i}@example.com" for i in range(participants)]
+    rows = []
+    for day in range(DAYS):
+        # Two hours a day stay clear for everyone, so big groups still have slots
+        hours = [hour for hour in range(7, 19) if hour not in (9 + day % 8, 8 + day % 8)]
+        for email in emails:
+            for _ in range(MEETINGS_PER_DAY):
+                # Pair up with a colleague now and then, like real calendars
+                attendees = [email] + ([rng.choice(emails)] if rng.random() < 0.3 else [])
+                rows.append({
+                    "title": "Busy",
+                    "scheduled_time": start + timedelta(days=day, hours=rng.choice(hours),
+                                                        minutes=rng.choice((0, 15, 30, 45))),
+                    "duration_minutes": rng.choice((15, 30, 45, 60)),
+                    "status": "scheduled",
+                    "participants": ",".join(attendees),
+                })
+    
+    tool = DatabaseTool()
+    for index in range(0, len(rows), 5000):
+        tool.bulk_insert_meetings(rows[index:index + 5000])
+    return emails, len(rows)
+
+
+def per_participant_scan(tool: DatabaseTool, emails, start, end):
+    """The old shape: one query per participant, then probe every grid step"""
+    busy = []
+    for email in emails:
+        busy += [(item["start"], item["end"]) for item in tool.get_busy_times(email, start, end)]
+    
+    slots = []
+    step = timedelta(minutes=15)
+    duration = timedelta(minutes=DURATION)
+    for window_start, window_end in working_windows(start, end):
+        cursor = window_start
+        while cursor + duration <= window_end and len(slots) < 5:
+            if not any(b_start < cursor + duration and cursor < b_end for b_start, b_end in busy):
+                slots.append((cursor, cursor + duration))
+                cursor += duration
+            else:
+                cursor += step
+    return slots
+
+
+def main(sizes):
+    url = use_database()
+    print(f"Database: {url}")
+    
+    rows = []
+    for participants in sizes:
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        end = start + timedelta(days=DAYS)
+        emails, meetings = seed(participants, start)
+        tool = DatabaseTool()
+        results = {}
+        
+        with timer(results, "engine"):
+            busy = tool.get_busy_intervals(emails, start, end)
+            engine_slots = find_free_slots(busy, start, end, DURATION)
+        with timer(results, "per_participant"):
+            old_slots = per_participant_scan(tool, emails, start, end)
+        
+        assert engine_slots == old_slots, (engine_slots, old_slots)
+        rows.append((participants, meetings, len(busy), len(engine_slots),
+                     f"{results['engine'] * 1000:.1f}", f"{results['per_participant'] * 1000:.1f}",
+                     f"{results['per_participant'] / results['engine']:.1f}x"))
+    
+    print_table(f"Free-slot search over {DAYS} days ({DURATION}-minute slots)",
+                ("participants", "meetings", "busy intervals", "slots",
+                 "engine ms", "per-participant ms", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 250])
@@ -0,0 +1,112 @@
+"""Before/after benchmark for the meeting read + serialization path.
+
+before: ORM objects -> Meeting.to_dict() (isoformat) -> datetime.fromisoformat
+        in the formatter -> stdlib json encoding of the response
+after:  column projection -> MeetingRow tuples -> formatter on native
+        datetimes -> orjson encoding
+
+Run from the repository root:
+    python -m benchmarks.bench_meeting_serialization [rows ...]
+"""
+import json
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_database, timer, print_table
+
+import orjson
+from database.connection import db_manager
+from models.database import Meeting, MeetingRow, MEETING_ROW_COLUMNS
+
+
+def seed(count: int):
+    session = db_manager.get_session()
+    try:
+        session.query(Meeting).delete()
+        start = datetime(2025, 1, 6, 9, 0)
+        rows = [
+            {
+                "title": f"Meeting {i}",
+                "description": "Weekly sync about roadmap, hiring and incidents",
+                "scheduled_time": start + timedelta(minutes=30 * i),
+                "duration_minutes": 30,
+                "location": "Conference Room A",
+                "organizer": "Jane Smith",
+                "participants": "jane@email.com,john@email.com",
+                "status": "scheduled",
+                "weather_checked": False,
+                "created_at": start,
+            }
+            for i in range(count)
+        ]
+        session.bulk_insert_mappings(Meeting, rows)
+        session.commit()
+    finally:
+        session.close()
+
+
+def format_rows_before(meetings):
+    lines = []
+    for i, meeting in enumerate(meetings, 1):
+        time = datetime.fromisoformat(meeting['scheduled_time']).strftime("%Y-%m-%d %I:%M %p")
+        lines.append(f"{i}. **{meeting['title']}** {time} {meeting['location']}")
+    return "\n".join(lines)
+
+
+def format_rows_after(meetings):
+    lines = []
+    for i, meeting in enumerate(meetings, 1):
+        time = meeting.scheduled_time.strftime("%Y-%m-%d %I:%M %p")
+        lines.append(f"{i}. **{meeting.title}** {time} {meeting.location}")
+    return "\n".join(lines)
+
+
+def run_before(results):
+    session = db_manager.get_session()
+    try:
+        with timer(results, "fetch"):
+            meetings = [m.to_dict() for m in session.query(Meeting).all()]
+        with timer(results, "format"):
+            text = format_rows_before(meetings)
+        with timer(results, "encode"):
+            json.dumps({"data": meetings, "response": text})
+    finally:
+        session.close()
+
+
+def run_after(results):
+    session = db_manager.get_session()
+    try:
+        with timer(results, "fetch"):
+            meetings = [MeetingRow(*r) for r in session.query(*MEETING_ROW_COLUMNS).all()]
+        with timer(results, "format"):
+            text = format_rows_after(meetings)
+        with timer(results, "encode"):
+            orjson.dumps({"data": [m.as_dict() for m in meetings], "response": text})
+    finally:
+        session.close()
+
+
+def main(sizes):
+    url = use_database()
+    print(f"Database: {url}")
+    
+    rows = []
+    for count in sizes:
+        seed(count)
+        before, after = {}, {}
+        run_before(before)
+        run_after(after)
+        total_before = sum(before.values())
+        total_after = sum(after.values())
+        for stage in ("fetch", "format", "encode"):
+            rows.append((count, stage, f"{before[stage]:.3f}", f"{after[stage]:.3f}",
+                         f"{before[stage] / after[stage]:.1f}x"))
+        rows.append((count, "total", f"{total_before:.3f}", f"{total_after:.3f}",
+                     f"{total_before / total_after:.1f}x"))
+    
+    print_table("Meeting read path (seconds)", ("rows", "stage", "before", "after", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
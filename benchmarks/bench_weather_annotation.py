@@ -0,0 +1,78 @@
+"""Throughput of the batch weather annotation job on a large calendar.
+
+The forecast API is replaced by a canned 5-day forecast so the numbers
+measure grouping, slot lookup and the bulk UPDATE rather than network time.
+
+Run from the repository root:
+    python -m benchmarks.bench_weather_annotation [meetings ...]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_database, print_table
+
+from database.connection import db_manager
+from jobs.weather_annotation import WeatherAnnotationJob
+from models.database import Meeting
+from tools.weather_tool import WeatherTool
+
+LOCATIONS = ["Conference Room A", "London Office", "Paris Office", "Tokyo Hub", "Virtual"]
+
+
+class CannedForecastTool(WeatherTool):
+    """WeatherTool whose forecast comes from memory; counts upstream calls"""
+    
+    def __init__(self, now: datetime):
+        super().__init__(api_key="benchmark")
+        self.calls = 0
+        first = now.replace(minute=0, second=0, microsecond=0)
+        self.slots = [
+            {"time": first + timedelta(hours=3 * i), "weather": "Scattered Clouds",
+             "temperature": 20, "wind_speed": 3, "probability_of_precipitation": 10}
+            for i in range(40)
+        ]
+    
+    def get_forecast_slots(self, city):
+        self.calls += 1
+        return {"city": city, "country": "", "slots": self.slots}
+
+
+def seed(count: int, now: datetime):
+    session = db_manager.get_session()
+    try:
+        session.query(Meeting).delete()
+        session.bulk_insert_mappings(Meeting, [
+            {
+                "title": f"Meeting {i}",
+                "scheduled_time": now + timedelta(minutes=(i * 7) % (5 * 24 * 60)),
+                "duration_minutes": 30,
+                "location": LOCATIONS[i % len(LOCATIONS)],
+                "status": "scheduled",
+                "weather_checked": False,
+            }
+            for i in range(count)
+        ])
+        session.commit()
+    finally:
+        session.close()
+
+
+def main(sizes):
+    url = use_database()
+    print(f"Database: {url}")
+    
+    rows = []
+    for count in sizes:
+        now = datetime.now()
+        seed(count, now)
+        tool = CannedForecastTool(now)
+        stats = WeatherAnnotationJob(tool).run(now=now)
+        rows.append((count, stats["groups"], tool.calls, stats["annotated"],
+                     stats["elapsed_seconds"], stats["meetings_per_second"]))
+    
+    print_table("Weather annotation job",
+                ("meetings", "groups", "forecast calls", "annotated", "seconds", "meetings/s"), rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,46 @@
+"""Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database by default so they need no
+outside services. Set BENCH_DATABASE_URL to point them at Postgres instead.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Settings requires these before app.config is imported
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+os.environ.setdefault("DEBUG", "false")
+
+from database.connection import db_manager
+
+
+def use_database(url: str = None):
+    """Point the global db_manager at a fresh benchmark database"""
+    if url is None:
+        url = os.getenv("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="medify-bench-"), "bench.db")
+        url = f"sqlite:///{path}"
+    
+    db_manager.database_url = url
+    db_manager.connect()
+    db_manager.create_tables()
+    return url
+
+
+@contextmanager
+def timer(results: dict, name: str):
+    """Record the wall-clock seconds spent in the block under results[name]"""
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def print_table(title: str, headers, rows):
+    """Print a fixed-width results table"""
+    print(f"\n{title}")
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(v).rjust(w) for v, w in zip(row, widths)))
@@ -0,0 +1,109 @@
+"""Concurrent scheduling stress test: many requests racing for one slot.
+
+Fires the requests from a thread pool, each with its own session, and counts
+how many meetings end up booked in the slot. The old check-then-create path
+can double-book; create_meeting_if_free must book exactly one.
+
+Run from the repository root:
+    python -m benchmarks.stress_concurrent_schedule [requests ...]
+"""
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_database, timer, print_table
+
+from database.connection import db_manager
+from models.database import Meeting, MeetingParticipant
+from tools.database_tool import DatabaseTool
+
+WORKERS = 32
+
+
+def reset():
+    session = db_manager.get_session()
+    try:
+        session.query(MeetingParticipant).delete()
+        session.query(Meeting).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+def meeting_data(index: int, slot: datetime):
+    return {
+        "title": f"Race {index}",
+        "scheduled_time": slot,
+        "duration_minutes": 60,
+        "location": "Conference Room",
+        "organizer": "AI Assistant",
+        "participants": ["alice@example.com", f"guest{index}@example.com"],
+    }
+
+
+def line_up(barrier: threading.Barrier):
+    """Wait for a full round of workers; the last partial round times out and runs"""
+    try:
+        barrier.wait(timeout=1)
+    except threading.BrokenBarrierError:
+        pass
+
+
+def check_then_create(index: int, slot: datetime, barrier: threading.Barrier):
+    """The old shape: check for a meeting, then insert in a separate step"""
+    tool = DatabaseTool()
+    try:
+        exists = tool.check_meeting_exists(slot)
+        # Line the requests up between the check and the insert, as under load
+        line_up(barrier)
+        if exists:
+            return False
+        return tool.create_meeting(meeting_data(index, slot))["success"]
+    finally:
+        tool.session.close()
+
+
+def atomic_create(index: int, slot: datetime, barrier: threading.Barrier):
+    line_up(barrier)
+    return DatabaseTool().create_meeting_if_free(meeting_data(index, slot))["success"]
+
+
+def booked(slot: datetime) -> int:
+    session = db_manager.get_session()
+    try:
+        return session.query(Meeting).filter(Meeting.scheduled_time == slot).count()
+    finally:
+        session.close()
+
+
+def run(fn, requests: int, slot: datetime):
+    barrier = threading.Barrier(WORKERS)
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(lambda index: fn(index, slot, barrier), range(requests)))
+    return sum(results), booked(slot)
+
+
+def main(sizes):
+    url = use_database()
+    print(f"Database: {url}")
+    
+    rows = []
+    slot = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    for requests in sizes:
+        for name, fn in (("check-then-create", check_then_create), ("atomic", atomic_create)):
+            reset()
+            results = {}
+            with timer(results, name):
+                succeeded, meetings = run(fn, requests, slot)
+            rows.append((name, requests, succeeded, meetings,
+                         f"{results[name] * 1000:.0f}", "ok" if meetings == 1 else "DOUBLE-BOOKED"))
+            if fn is atomic_create:
+                assert meetings == 1, f"{meetings} meetings booked in one slot"
+    
+    print_table(f"{WORKERS} threads racing for {slot:%Y-%m-%d %H:%M}",
+                ("path", "requests", "succeeded", "booked", "ms", "result"), rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 500])
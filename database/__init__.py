@@ -1,5 +1,5 @@
 from database.connection import db_manager
-from models.database import Meeting
+from models.database import Meeting, MeetingParticipant, split_participants
 from datetime import datetime, timedelta
 import pytz
 
@@ -48,6 +48,7 @@ def init_database():
             session.commit()
             print(f"Added {len(sample_meetings)} sample meetings")
         
+        migrate_participants(session)
         print("Database initialized successfully")
     except Exception as e:
         session.rollback()
@@ -55,5 +56,28 @@ def init_database():
     finally:
         session.close()
 
+def migrate_participants(session, batch_size: int = 1000):
+    """Backfill meeting_participants from the comma-separated participants column"""
+    # Only meetings that have participants text but no join rows yet
+    pending = session.query(Meeting.id, Meeting.participants).outerjoin(
+        MeetingParticipant, MeetingParticipant.meeting_id == Meeting.id
+    ).filter(
+        Meeting.participants.isnot(None),
+        Meeting.participants != "",
+        MeetingParticipant.id.is_(None)
+    ).all()
+    
+    rows = []
+    for meeting_id, participants in pending:
+        for email in split_participants(participants):
+            rows.append({"meeting_id": meeting_id, "email": email})
+    
+    for i in range(0, len(rows), batch_size):
+        session.bulk_insert_mappings(MeetingParticipant, rows[i:i + batch_size])
+    session.commit()
+    
+    if rows:
+        print(f"Migrated {len(rows)} participant entries from {len(pending)} meetings")
+
 if __name__ == "__main__":
     init_database()
\ No newline at end of file
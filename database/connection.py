@@ -1,10 +1,41 @@
-from sqlalchemy import create_engine
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, func, inspect, select
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.config import settings
+from database.instrumentation import sql_metrics, InstrumentedQueuePool
+from typing import Iterable
+import hashlib
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Alembic scripts for schema changes to existing tables (see alembic.ini)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# External-content FTS5 index over meetings, kept in sync by triggers
+SQLITE_FTS_STATEMENTS = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(
+        title, description, content='meetings', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS meetings_fts_insert AFTER INSERT ON meetings BEGIN
+        INSERT INTO meetings_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS meetings_fts_delete AFTER DELETE ON meetings BEGIN
+        INSERT INTO meetings_fts(meetings_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS meetings_fts_update AFTER UPDATE OF title, description ON meetings BEGIN
+        INSERT INTO meetings_fts(meetings_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO meetings_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+)
+
 class DatabaseManager:
     """Manages database connections and sessions"""
     
@@ -12,15 +43,32 @@ class DatabaseManager:
         self.database_url = database_url or settings.DATABASE_URL
         self.engine = None
         self.SessionLocal = None
+        self.fts5_enabled = False
+    
+    @property
+    def is_sqlite(self) -> bool:
+        return self.database_url.startswith("sqlite")
+    
+    @property
+    def is_sqlite_memory(self) -> bool:
+        return self.is_sqlite and (":memory:" in self.database_url or self.database_url.rstrip("/") == "sqlite:")
     
     def connect(self):
         """Create database engine and session factory"""
         try:
-            self.engine = create_engine(
-                self.database_url,
-                pool_pre_ping=True,
-                echo=settings.DEBUG
-            )
+            engine_options = {
+                "pool_pre_ping": True,
+                "echo": settings.SQL_ECHO
+            }
+            if self.is_sqlite:
+                engine_options.update(self._sqlite_engine_options())
+            else:
+                engine_options["poolclass"] = InstrumentedQueuePool
+            
+            self.engine = create_engine(self.database_url, **engine_options)
+            if self.is_sqlite:
+                self._configure_sqlite(self.engine)
+            sql_metrics.install(self.engine)
             self.SessionLocal = sessionmaker(
                 autocommit=False,
                 autoflush=False,
@@ -32,17 +80,110 @@ class DatabaseManager:
             logger.error(f"Database connection failed: {e}")
             return False
     
+    def _sqlite_engine_options(self):
+        """Pooling for SQLite shared across threads and the event loop"""
+        connect_args = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+        }
+        if self.is_sqlite_memory:
+            # Every connection to :memory: is a new database, so share one
+            return {"poolclass": StaticPool, "connect_args": connect_args}
+        return {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.SQLITE_POOL_SIZE,
+            "max_overflow": settings.SQLITE_POOL_SIZE * 2,
+            "connect_args": connect_args
+        }
+    
+    def _configure_sqlite(self, engine):
+        """Apply pragmas to every new SQLite connection"""
+        is_memory = self.is_sqlite_memory
+        
+        # pysqlite keeps its default of opening a transaction only before the
+        # first write, so idle sessions never pin a WAL read snapshot that
+        # would make their next write fail instead of waiting on busy_timeout
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if not is_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+            cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.close()
+    
     def get_session(self):
         """Get a database session"""
         if not self.SessionLocal:
             self.connect()
         return self.SessionLocal()
     
+    def lock_for_write(self, session, keys: Iterable[str]):
+        """Start a write transaction on session that serializes writers sharing any of keys.
+        
+        SQLite has one writer at a time, so BEGIN IMMEDIATE takes the write
+        lock up front (waiting up to busy_timeout) and keys are not needed.
+        PostgreSQL takes a transaction-scoped advisory lock per key, in sorted
+        order so two writers cannot deadlock. Locks end with the transaction.
+        """
+        connection = session.connection()
+        if self.is_sqlite:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        elif connection.dialect.name == "postgresql":
+            for key in sorted(set(keys)):
+                connection.execute(select(func.pg_advisory_xact_lock(self._lock_id(key))))
+    
+    @staticmethod
+    def _lock_id(key: str) -> int:
+        """Stable signed 64-bit advisory lock id for a key (hash() varies per process)"""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+    
     def create_tables(self):
-        """Create all tables"""
+        """Create missing tables, then apply pending migrations to existing ones"""
         from models.database import Base
+        fresh = not inspect(self.engine).has_table("meetings")
         Base.metadata.create_all(bind=self.engine)
+        self._migrate(fresh)
+        if self.is_sqlite:
+            self._create_sqlite_fts()
         logger.info("Database tables created")
+    
+    def _create_sqlite_fts(self):
+        """Create the FTS5 index for meeting search if this SQLite build has FTS5"""
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'meetings_fts'"
+                ).first()
+                for statement in SQLITE_FTS_STATEMENTS:
+                    conn.exec_driver_sql(statement)
+                if not exists:
+                    conn.exec_driver_sql("INSERT INTO meetings_fts(meetings_fts) VALUES ('rebuild')")
+            self.fts5_enabled = True
+            logger.info("SQLite FTS5 meeting search enabled")
+        except Exception as e:
+            self.fts5_enabled = False
+            logger.warning(f"SQLite FTS5 unavailable, falling back to LIKE search: {e}")
+    
+    def _migrate(self, fresh: bool):
+        """Bring the schema to the latest alembic revision.
+        
+        A database create_all has just built is already current and is only
+        stamped; an existing one (with or without alembic history) is upgraded.
+        """
+        config = Config()
+        config.set_main_option("script_location", MIGRATIONS_DIR)
+        with self.engine.begin() as connection:
+            config.attributes["connection"] = connection
+            if fresh:
+                command.stamp(config, "head")
+            else:
+                command.upgrade(config, "head")
 
 # Global database instance
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = DatabaseManager()
@@ -0,0 +1,217 @@
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Optional
+import logging
+import random
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is +inf
+DURATION_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Statements tracked individually; anything beyond is folded into one entry
+MAX_TRACKED_STATEMENTS = 200
+OTHER_STATEMENTS = "<other statements>"
+
+_request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("sql_request_scope", default=None)
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace bound values with their type names so logs never carry user data"""
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def _normalize(statement: str) -> str:
+    return " ".join(statement.split())
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+    
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+    
+    def __init__(self):
+        self.counts = [0] * (len(DURATION_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, duration_ms: float):
+        index = len(DURATION_BUCKETS_MS)
+        for i, bound in enumerate(DURATION_BUCKETS_MS):
+            if duration_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in DURATION_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class SQLMetrics:
+    """Statement timings, slow-query log, N+1 detection and pool wait times"""
+    
+    def __init__(self, slow_query_ms: float = 200, slow_query_sample_rate: float = 1.0,
+                 n_plus_one_threshold: int = 10, log_size: int = 100):
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_sample_rate = slow_query_sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._statements: Dict[str, Histogram] = {}
+        self._all = Histogram()
+        self._pool_wait = Histogram()
+        self._slow_queries = deque(maxlen=log_size)
+        self._n_plus_one = deque(maxlen=log_size)
+        self._slow_total = 0
+        self._engine = None
+    
+    def install(self, engine):
+        """Attach timing hooks to an engine"""
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_metrics_start", []).append(time.perf_counter())
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("sql_metrics_start")
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        self.observe_statement(statement, parameters, duration_ms)
+    
+    def _handle_error(self, exception_context):
+        starts = exception_context.connection.info.get("sql_metrics_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+    
+    def observe_statement(self, statement: str, parameters: Any, duration_ms: float):
+        key = _normalize(statement)
+        
+        with self._lock:
+            histogram = self._statements.get(key)
+            if histogram is None:
+                if len(self._statements) >= MAX_TRACKED_STATEMENTS:
+                    key = OTHER_STATEMENTS
+                histogram = self._statements.setdefault(key, Histogram())
+            histogram.observe(duration_ms)
+            self._all.observe(duration_ms)
+        
+        scope = _request_scope.get()
+        if scope is not None:
+            scope["statements"][key] += 1
+            scope["count"] += 1
+        
+        if duration_ms >= self.slow_query_ms:
+            with self._lock:
+                self._slow_total += 1
+            if random.random() < self.slow_query_sample_rate:
+                entry = {
+                    "statement": key,
+                    "parameters": redact_parameters(parameters),
+                    "duration_ms": round(duration_ms, 3),
+                    "request": scope["name"] if scope else None,
+                    "at": datetime.now().isoformat()
+                }
+                self._slow_queries.append(entry)
+                logger.warning(f"Slow query ({duration_ms:.1f} ms): {key[:300]} params={entry['parameters']}")
+    
+    def observe_pool_wait(self, seconds: float):
+        with self._lock:
+            self._pool_wait.observe(seconds * 1000)
+    
+    @contextmanager
+    def request_scope(self, name: str):
+        """Count statements per request and flag ones repeated N+1 style"""
+        scope = {"name": name, "statements": Counter(), "count": 0}
+        token = _request_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _request_scope.reset(token)
+            for statement, count in scope["statements"].items():
+                if count >= self.n_plus_one_threshold:
+                    self._n_plus_one.append({
+                        "request": name,
+                        "statement": statement,
+                        "executions": count,
+                        "at": datetime.now().isoformat()
+                    })
+                    logger.warning(f"Possible N+1: {count}x in {name}: {statement[:300]}")
+    
+    def snapshot(self, top: int = 50) -> Dict[str, Any]:
+        with self._lock:
+            statements = sorted(self._statements.items(), key=lambda item: item[1].total_ms, reverse=True)
+            pool = {"checkout_wait": self._pool_wait.to_dict()}
+            if self._engine is not None and isinstance(self._engine.pool, QueuePool):
+                pool.update({
+                    "size": self._engine.pool.size(),
+                    "checked_out": self._engine.pool.checkedout(),
+                    "overflow": self._engine.pool.overflow()
+                })
+            return {
+                "statements_total": self._all.to_dict(),
+                "statements": [
+                    dict(histogram.to_dict(), statement=statement)
+                    for statement, histogram in statements[:top]
+                ],
+                "slow_queries": {
+                    "threshold_ms": self.slow_query_ms,
+                    "sample_rate": self.slow_query_sample_rate,
+                    "total": self._slow_total,
+                    "recent": list(self._slow_queries)
+                },
+                "n_plus_one": {
+                    "threshold": self.n_plus_one_threshold,
+                    "recent": list(self._n_plus_one)
+                },
+                "pool": pool
+            }
+    
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._all = Histogram()
+            self._pool_wait = Histogram()
+            self._slow_queries.clear()
+            self._n_plus_one.clear()
+            self._slow_total = 0
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            sql_metrics.observe_pool_wait(time.perf_counter() - start)
+
+# Global metrics instance, installed by DatabaseManager.connect
+sql_metrics = SQLMetrics(
+    slow_query_ms=settings.SQL_SLOW_QUERY_MS,
+    slow_query_sample_rate=settings.SQL_SLOW_QUERY_SAMPLE_RATE,
+    n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD
+)
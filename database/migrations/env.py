@@ -0,0 +1,46 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from models.database import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+# The app passes its own connection; the alembic CLI reads alembic.ini
+if config.attributes.get("connection") is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+def run_migrations_offline():
+    """Emit the migration SQL without a database connection"""
+    from app.config import settings
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations(connection):
+    # Batch mode lets SQLite alter tables by copying them
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    
+    from database.connection import db_manager
+    db_manager.connect()
+    with db_manager.engine.connect() as connection:
+        run_migrations(connection)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,33 @@
+"""Add recurrence columns to meetings
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases that ran the earlier startup ALTER TABLE already have these
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("meetings")}
+    if "recurrence_rule" not in existing:
+        op.add_column("meetings", sa.Column("recurrence_rule", sa.Text(), nullable=True))
+    if "recurrence_end" not in existing:
+        op.add_column("meetings", sa.Column("recurrence_end", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("meetings") as batch_op:
+        batch_op.drop_column("recurrence_end")
+        batch_op.drop_column("recurrence_rule")
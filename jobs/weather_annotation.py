@@ -0,0 +1,111 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import time
+
+from agents.weather_agent import KNOWN_CITIES
+from models.database import MeetingRow
+from tools.database_tool import DatabaseTool
+from tools.weather_tool import WeatherTool
+
+logger = logging.getLogger(__name__)
+
+# The free forecast API covers 5 days in 3-hour slots
+FORECAST_HORIZON = timedelta(days=5)
+SLOT_LENGTH = timedelta(hours=3)
+
+def resolve_city(location: Optional[str], default_city: str) -> str:
+    """Best-effort city for a meeting location ("Paris Office" -> "Paris")"""
+    location_lower = (location or "").lower()
+    for city in KNOWN_CITIES:
+        if city in location_lower:
+            return city.title()
+    return default_city
+
+class WeatherAnnotationJob:
+    """Annotates upcoming meetings with forecast weather in bulk.
+    
+    Meetings are grouped by (city, day). Each city's 5-day forecast is
+    fetched once per run and serves all of its day groups, and every
+    annotation is written in one bulk UPDATE. Each run uses its own
+    database session, so runs from the scheduler and the API can overlap.
+    """
+    
+    def __init__(self, weather_tool: WeatherTool, default_city: str = "London"):
+        self.weather_tool = weather_tool
+        self.default_city = default_city
+        self.last_run: Optional[Dict[str, Any]] = None
+    
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Annotate every unannotated meeting inside the forecast horizon"""
+        started = time.perf_counter()
+        now = now or datetime.now()
+        
+        # Released before the forecast requests; the bulk update opens its own session
+        db_tool = DatabaseTool()
+        try:
+            meetings = db_tool.get_unannotated_meetings(now, now + FORECAST_HORIZON)
+        finally:
+            db_tool.session.close()
+        
+        groups: Dict[Tuple[str, Any], List[MeetingRow]] = defaultdict(list)
+        for meeting in meetings:
+            city = resolve_city(meeting.location, self.default_city)
+            groups[(city, meeting.scheduled_time.date())].append(meeting)
+        
+        # city -> (slots, their start times), or None without a forecast
+        forecasts: Dict[str, Optional[Tuple[List[Dict[str, Any]], List[datetime]]]] = {}
+        annotations = []
+        skipped = 0
+        for (city, _day), group in groups.items():
+            if city not in forecasts:
+                slots = self._fetch_slots(city)
+                forecasts[city] = (slots, [slot["time"] for slot in slots]) if slots else None
+            forecast = forecasts[city]
+            
+            for meeting in group:
+                slot = self._slot_for(*forecast, meeting.scheduled_time) if forecast else None
+                if slot is None:
+                    skipped += 1
+                    continue
+                annotations.append({
+                    "id": meeting.id,
+                    "weather_condition": slot["weather"],
+                    "scheduled_time": meeting.scheduled_time
+                })
+        
+        updated = db_tool.bulk_update_weather(annotations)
+        elapsed = time.perf_counter() - started
+        
+        stats = {
+            "meetings_scanned": len(meetings),
+            "groups": len(groups),
+            "forecast_calls": len(forecasts),
+            "annotated": updated,
+            "skipped": skipped,
+            "elapsed_seconds": round(elapsed, 3),
+            "meetings_per_second": round(len(meetings) / elapsed, 1) if elapsed > 0 else None,
+            "finished_at": datetime.now().isoformat()
+        }
+        self.last_run = stats
+        logger.info(f"Weather annotation run: {stats}")
+        return stats
+    
+    def _fetch_slots(self, city: str) -> Optional[List[Dict[str, Any]]]:
+        result = self.weather_tool.get_forecast_slots(city)
+        if "error" in result:
+            logger.warning(f"No forecast for {city}: {result['error']}")
+            return None
+        return result["slots"]
+    
+    @staticmethod
+    def _slot_for(slots: List[Dict[str, Any]], times: List[datetime], when: datetime) -> Optional[Dict[str, Any]]:
+        """The forecast slot nearest to when, or None if when is outside the forecast"""
+        index = bisect_left(times, when)
+        nearest = min(
+            (slots[i] for i in (index - 1, index) if 0 <= i < len(slots)),
+            key=lambda slot: abs(slot["time"] - when)
+        )
+        return nearest if abs(nearest["time"] - when) <= SLOT_LENGTH else None
@@ -1,10 +1,35 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from datetime import datetime
+from sqlalchemy.orm import relationship
+from collections import namedtuple
+from datetime import datetime, timedelta
+from dateutil.rrule import rrulestr
+from typing import List, Optional, Union
 import pytz
 
 Base = declarative_base()
 
+def parse_recurrence(rule: str, dtstart: datetime):
+    """Parse an RRULE anchored at dtstart, raising ValueError if it is invalid"""
+    try:
+        return rrulestr(rule, dtstart=dtstart)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid recurrence rule: {e}")
+
+def split_participants(participants: Optional[Union[str, List[str]]]) -> List[str]:
+    """Normalize a comma-separated string or list of emails into unique lowercase emails"""
+    if not participants:
+        return []
+    if isinstance(participants, str):
+        participants = participants.split(",")
+    
+    emails = []
+    for email in participants:
+        email = email.strip().lower()
+        if email and email not in emails:
+            emails.append(email)
+    return emails
+
 class Meeting(Base):
     """Meeting model for the database"""
     __tablename__ = "meetings"
@@ -22,6 +47,43 @@ class Meeting(Base):
     weather_condition = Column(String(50), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(pytz.UTC))
     updated_at = Column(DateTime, default=lambda: datetime.now(pytz.UTC), onupdate=lambda: datetime.now(pytz.UTC))
+    # Recurring series are stored once; scheduled_time is the first occurrence (DTSTART)
+    recurrence_rule = Column(Text, nullable=True)  # RFC 5545 RRULE, e.g. FREQ=WEEKLY;BYDAY=MO
+    recurrence_end = Column(DateTime, nullable=True)  # end of the last occurrence, NULL if unbounded
+    
+    participant_links = relationship(
+        "MeetingParticipant",
+        back_populates="meeting",
+        cascade="all, delete-orphan"
+    )
+    
+    def set_participants(self, participants: Optional[Union[str, List[str]]]):
+        """Set participants, keeping the text column and the join table in sync"""
+        emails = split_participants(participants)
+        self.participants = ",".join(emails) if emails else None
+        self.participant_links = [MeetingParticipant(email=email) for email in emails]
+    
+    def set_recurrence(self, rule: Optional[str]):
+        """Validate and set the RRULE; requires scheduled_time to be set first"""
+        if not rule:
+            self.recurrence_rule = None
+            self.recurrence_end = None
+            return
+        
+        rule = rule.strip()
+        if rule.upper().startswith("RRULE:"):
+            rule = rule[len("RRULE:"):]
+        recurrence = parse_recurrence(rule, self.scheduled_time)
+        
+        self.recurrence_rule = rule
+        self.recurrence_end = None
+        if "COUNT=" in rule.upper() or "UNTIL=" in rule.upper():
+            last = None
+            for last in recurrence:
+                pass
+            if last is None:
+                raise ValueError("recurrence rule produces no occurrences")
+            self.recurrence_end = last + timedelta(minutes=self.duration_minutes or 0)
     
     def to_dict(self):
         return {
@@ -36,5 +98,79 @@ class Meeting(Base):
             "status": self.status,
             "weather_checked": self.weather_checked,
             "weather_condition": self.weather_condition,
-            "created_at": self.created_at.isoformat()
-        }
\ No newline at end of file
+            "created_at": self.created_at.isoformat(),
+            "recurrence_rule": self.recurrence_rule
+        }
+
+class MeetingParticipant(Base):
+    """One row per (meeting, participant email) for indexed per-person lookups"""
+    __tablename__ = "meeting_participants"
+    __table_args__ = (
+        Index("ix_meeting_participants_email_meeting", "email", "meeting_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False, index=True)
+    email = Column(String(255), nullable=False)
+    
+    meeting = relationship("Meeting", back_populates="participant_links")
+
+class MeetingOccurrenceException(Base):
+    """Cancellation or one-off change to a single occurrence of a recurring meeting"""
+    __tablename__ = "meeting_occurrence_exceptions"
+    __table_args__ = (
+        Index("ix_occurrence_exceptions_meeting_start", "meeting_id", "original_start", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False)
+    original_start = Column(DateTime, nullable=False)  # occurrence start generated by the RRULE
+    status = Column(String(20), nullable=False, default="cancelled")  # cancelled, modified
+    # Overrides for modified occurrences; NULL keeps the series value
+    scheduled_time = Column(DateTime, nullable=True)
+    title = Column(String(255), nullable=True)
+    duration_minutes = Column(Integer, nullable=True)
+    location = Column(String(100), nullable=True)
+
+class IdempotencyRecord(Base):
+    """Stored outcome of a request sent with an Idempotency-Key header"""
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(255), primary_key=True)  # scope:client key
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body
+    status = Column(String(20), nullable=False, default="in_progress")  # in_progress, completed
+    response = Column(Text, nullable=True)  # JSON, set when completed
+    created_at = Column(DateTime, default=lambda: datetime.now(pytz.UTC))
+    expires_at = Column(DateTime, nullable=False, index=True)  # local time, like scheduled_time
+
+# Columns selected by read paths that don't need full ORM objects
+MEETING_ROW_COLUMNS = (
+    Meeting.id,
+    Meeting.title,
+    Meeting.description,
+    Meeting.scheduled_time,
+    Meeting.duration_minutes,
+    Meeting.location,
+    Meeting.organizer,
+    Meeting.participants,
+    Meeting.status,
+    Meeting.weather_checked,
+    Meeting.weather_condition,
+    Meeting.created_at,
+    Meeting.recurrence_rule,
+)
+
+class MeetingRow(namedtuple(
+    "MeetingRow",
+    [column.key for column in MEETING_ROW_COLUMNS] + ["recurrence_id"],
+    defaults=(None,)
+)):
+    """Tuple-backed read-only meeting record; datetimes stay datetimes.
+    
+    Rows expanded from a recurring series carry the occurrence's original
+    start in recurrence_id and the (possibly modified) start in scheduled_time.
+    """
+    __slots__ = ()
+    
+    def as_dict(self):
+        return self._asdict()
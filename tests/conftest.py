@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+# Settings requires these before app.config is imported
+os.environ.setdefault("OPENWEATHER_API_KEY", "test")
+os.environ.setdefault("DEBUG", "false")
+
+from database.connection import db_manager
+from models.database import IdempotencyRecord, Meeting, MeetingOccurrenceException, MeetingParticipant
+from tools.agenda_cache import agenda_cache
+
+
+@pytest.fixture(scope="session")
+def database(tmp_path_factory):
+    """Point the global db_manager at a throwaway SQLite file for the test run"""
+    path = tmp_path_factory.mktemp("db") / "test.db"
+    db_manager.database_url = f"sqlite:///{path}"
+    db_manager.connect()
+    db_manager.create_tables()
+    return db_manager
+
+
+@pytest.fixture
+def db(database):
+    """A clean database for one test"""
+    session = database.get_session()
+    try:
+        for model in (MeetingOccurrenceException, MeetingParticipant, Meeting, IdempotencyRecord):
+            session.query(model).delete()
+        session.commit()
+    finally:
+        session.close()
+    agenda_cache.clear()
+    return database
+
+
+@pytest.fixture
+def client(db):
+    """A TestClient over the API routes, backed by the clean database"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from agents.db_agent import DatabaseAgent
+    from agents.meeting_agent import MeetingAgent
+    from agents.orchestrator import AgentOrchestrator
+    from agents.weather_agent import WeatherAgent
+    from api.routes import router
+    
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.weather_agent = WeatherAgent("test")
+    app.state.db_agent = DatabaseAgent()
+    app.state.meeting_agent = MeetingAgent(app.state.weather_agent)
+    app.state.orchestrator = AgentOrchestrator()
+    for agent in (app.state.weather_agent, app.state.db_agent, app.state.meeting_agent):
+        app.state.orchestrator.register_agent(agent)
+    return TestClient(app)
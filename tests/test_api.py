@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import orjson
+
+from tools.database_tool import DatabaseTool
+
+START = datetime(2030, 1, 7, 10, 0)
+
+
+def add_series(title="Standup", rule="FREQ=DAILY"):
+    result = DatabaseTool().create_meeting({"title": title, "scheduled_time": START, "duration_minutes": 15,
+                                            "location": "Room A", "recurrence_rule": rule})
+    assert result["success"], result
+
+
+def utc(when, suffix="Z"):
+    """when (naive local) as a UTC ISO string"""
+    return when.astimezone(timezone.utc).replace(tzinfo=None).isoformat() + suffix
+
+
+def test_range_with_aware_bounds_expands_series(client, db):
+    add_series()
+    start, end = START - timedelta(hours=1), START + timedelta(days=3)
+    
+    naive = client.get("/api/meetings", params={"start": start.isoformat(), "end": end.isoformat()}).json()
+    for suffix in ("Z", "+00:00"):
+        response = client.get("/api/meetings", params={"start": utc(start, suffix), "end": utc(end, suffix)})
+        
+        assert response.status_code == 200
+        assert response.json()["count"] == naive["count"] == 3
+
+
+def test_meetings_stream_ndjson(client, db):
+    add_series()
+    start, end = START - timedelta(hours=1), START + timedelta(days=3)
+    
+    response = client.get("/api/meetings", params={"start": utc(start), "end": utc(end), "stream": "ndjson"})
+    
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["start", "meeting", "meeting", "meeting", "end"]
+    assert [event["data"]["scheduled_time"] for event in events[1:-1]] == [
+        (START + timedelta(days=day)).isoformat() for day in range(3)]
+    assert events[-1]["count"] == 3
+
+
+def test_query_stream_sse(client, db):
+    tool = DatabaseTool()
+    for hour in (9, 11):
+        assert tool.create_meeting({"title": f"Review {hour}", "scheduled_time": START.replace(hour=hour)})["success"]
+    
+    response = client.post("/api/query", json={"query": "show all meetings", "stream": "sse"})
+    
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = [message.split("\n") for message in response.text.strip().split("\n\n")]
+    names = [lines[0].removeprefix("event: ") for lines in messages]
+    assert names == ["start", "meeting", "meeting", "end"]
+    assert orjson.loads(messages[-1][1].removeprefix("data: "))["count"] == 2
+
+
+def test_meeting_stats_groups_and_ranks(client, db):
+    add_series(rule="FREQ=DAILY;COUNT=4")
+    tool = DatabaseTool()
+    assert tool.create_meeting({"title": "Offsite", "scheduled_time": START + timedelta(days=1, hours=2),
+                                "duration_minutes": 240, "location": "Room B"})["success"]
+    params = {"start": utc(START - timedelta(hours=1)), "end": utc(START + timedelta(days=7))}
+    
+    by_location = client.get("/api/meetings/stats", params=dict(params, group_by="location")).json()
+    by_hours = client.get("/api/meetings/stats", params=dict(params, group_by="location", rank_by="hours")).json()
+    by_day = client.get("/api/meetings/stats", params=dict(params, group_by="day")).json()
+    
+    assert (by_location["total_meetings"], by_location["total_hours"]) == (5, 5.0)
+    assert [(group["key"], group["rank"]) for group in by_location["groups"]] == [("Room A", 1), ("Room B", 2)]
+    assert [group["key"] for group in by_hours["busiest"]] == ["Room B"]
+    assert [(group["key"], group["meetings"]) for group in by_day["groups"]] == [
+        ((START + timedelta(days=day)).date().isoformat(), 2 if day == 1 else 1) for day in range(4)]
+
+
+def test_meeting_stats_rejects_unknown_grouping(client, db):
+    assert client.get("/api/meetings/stats", params={"group_by": "colour"}).status_code == 400
+    assert client.get("/api/meetings/stats", params={"rank_by": "length"}).status_code == 400
+
+
+def test_search_ignores_filler_words(client, db):
+    assert DatabaseTool().create_meeting({"title": "Budget review", "scheduled_time": START})["success"]
+    
+    result = client.get("/api/meetings", params={"search": "budget"}).json()
+    
+    assert [meeting["title"] for meeting in result["data"]] == ["Budget review"]
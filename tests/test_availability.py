@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from tools.availability import merge_intervals, find_free_slots, IntervalIndex
+from tools.database_tool import DatabaseTool
+from tools.weather_tool import WeatherTool
+
+MONDAY = datetime(2030, 1, 7)
+
+
+def at(hour, minute=0, day=MONDAY):
+    return day.replace(hour=hour, minute=minute)
+
+
+def test_merge_intervals_unions_overlapping_and_touching():
+    merged = merge_intervals([
+        (at(13), at(14)),
+        (at(9), at(10)),
+        (at(9, 30), at(10, 30)),
+        (at(10, 30), at(11)),
+        (at(12), at(12)),  # empty
+    ])
+    
+    assert merged == [(at(9), at(11)), (at(13), at(14))]
+
+
+def test_find_free_slots_skips_busy_time_and_aligns_to_step():
+    busy = [(at(9), at(10, 10)), (at(11), at(12))]
+    
+    slots = find_free_slots(busy, at(0), at(23), 30, step_minutes=15, limit=3)
+    
+    assert slots == [(at(10, 15), at(10, 45)), (at(12), at(12, 30)), (at(12, 30), at(13))]
+
+
+def test_find_free_slots_stays_in_working_days():
+    friday = MONDAY - timedelta(days=3)
+    busy = [(at(9, day=friday), at(17, day=friday))]
+    
+    slots = find_free_slots(busy, friday, MONDAY + timedelta(days=1), 60, limit=1)
+    
+    assert slots == [(at(9), at(10))]
+
+
+def test_interval_index_overlapping():
+    index = IntervalIndex()
+    index.add(at(8), at(18), "all day")
+    index.add(at(9), at(10), "standup")
+    index.add(at(10), at(11), "review")
+    index.add(at(14), at(15), "planning")
+    
+    assert sorted(index.overlapping(at(10), at(11))) == ["all day", "review"]
+    assert sorted(index.overlapping(at(9, 30), at(10, 30))) == ["all day", "review", "standup"]
+    assert index.overlapping(at(19), at(20)) == []
+    assert IntervalIndex().overlapping(at(9), at(10)) == []
+
+
+def test_free_slots_route_accepts_aware_times(client):
+    start = datetime.now().astimezone() + timedelta(days=1)
+    
+    response = client.post("/api/meetings/free-slots", json={
+        "participants": ["alice@example.com"],
+        "start": start.isoformat(),
+        "end": (start + timedelta(days=7)).isoformat(),
+        "limit": 1,
+    })
+    
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+
+def test_free_slots_route_fails_when_calendars_cannot_load(client, monkeypatch):
+    def broken(self, emails, start, end):
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(DatabaseTool, "get_busy_intervals", broken)
+    
+    response = client.post("/api/meetings/free-slots", json={"participants": ["alice@example.com"]})
+    
+    assert response.status_code == 500
+
+
+def forecast(city):
+    first = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return {"city": city, "country": "GB", "slots": [
+        {"time": first + timedelta(hours=3 * step), "weather": "Clear Sky", "temperature": 21,
+         "wind_speed": 2, "probability_of_precipitation": 0}
+        for step in range(40)
+    ]}
+
+
+def test_weather_slots_respect_start_and_end(client, monkeypatch):
+    monkeypatch.setattr(WeatherTool, "get_forecast_slots", lambda self, city: forecast(city))
+    start = (datetime.now() + timedelta(days=2)).replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=1)
+    
+    response = client.post("/api/meetings/free-slots", json={
+        "participants": ["alice@example.com"], "city": "London", "include_weekends": True,
+        "start": start.isoformat(), "end": end.isoformat(),
+    })
+    
+    slots = response.json()["slots"]
+    assert response.status_code == 200 and slots
+    assert all(start <= datetime.fromisoformat(slot["start"]) < end for slot in slots)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_community")
+pytest.importorskip("faiss")
+
+from agents.document_agent import DocumentAgent
+
+TRAVEL = "Travel policy: flights over 500 euros need manager approval before booking."
+LEAVE = "Leave policy: employees get ten days of paid medical leave every year."
+
+
+@pytest.fixture
+def agent(tmp_path):
+    # No API key: documents are searched with BM25
+    return DocumentAgent(upload_dir=str(tmp_path))
+
+
+def test_documents_are_isolated_per_owner(agent):
+    agent.load_document("alice", "travel.txt", TRAVEL)
+    
+    assert [entry.filename for entry in agent.documents("alice")] == ["travel.txt"]
+    assert agent.documents("bob") == []
+    result = asyncio.run(agent.process("What does the travel policy say?", user_id="bob"))
+    assert not result["success"] and "No document loaded" in result["error"]
+
+
+def test_query_merges_results_across_documents(agent):
+    agent.load_document("alice", "travel.txt", TRAVEL)
+    agent.load_document("alice", "leave.txt", LEAVE)
+    
+    result = agent.document_tool.query_documents(agent.documents("alice"), "policy approval medical leave", top_k=2)
+    
+    assert result["success"] and result["documents"] == ["leave.txt", "travel.txt"]
+    # Only the global best chunk is kept from the merged per-document results
+    best = agent.document_tool.query_documents(agent.documents("alice"), "paid medical leave", top_k=1)
+    assert best["documents"] == ["leave.txt"]
+
+
+def test_warm_start_opens_persisted_documents(agent, tmp_path):
+    agent.load_document("alice", "travel.txt", TRAVEL)
+    
+    restarted = DocumentAgent(upload_dir=str(tmp_path))
+    assert restarted.warm_start() == 1 and not restarted.registry.has_documents()
+    
+    entries = restarted.documents("alice")
+    assert [chunk.page_content for chunk in entries[0].chunks] == [TRAVEL]
+    assert restarted.registry.get("alice", entries[0].document_id) is not None
+
+
+def test_same_file_is_reused_across_owners(agent):
+    original = agent.load_document("alice", "travel.txt", TRAVEL, file_hash="hash")
+    
+    copy = agent._reuse_upload("hash", "bob", "bobs-travel.txt")
+    
+    assert copy.owner == "bob" and copy.document_id != original.document_id
+    assert copy.filename == "bobs-travel.txt" and len(copy.chunks) == len(original.chunks)
+    assert agent._reuse_upload("other", "bob", "new.txt") is None
+    assert agent.document_tool.embedding_cache.stats()["document_hits"] == 1
+    assert agent.document_tool.embedding_cache.stats()["document_misses"] == 1
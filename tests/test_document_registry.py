@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from tools.document_registry import DocumentEntry, DocumentRegistry
+
+T0 = datetime(2030, 1, 7, 9, 0)
+
+
+def entry(owner, name, size, minutes=0):
+    """A document whose chunk text totals size bytes"""
+    return DocumentEntry(owner, name, ["x" * size], None, document_id=name,
+                         created_at=T0 + timedelta(minutes=minutes))
+
+
+def names(entries):
+    return [entry.document_id for entry in entries]
+
+
+def test_documents_are_per_owner():
+    registry = DocumentRegistry(budget_bytes=1000)
+    registry.add(entry("alice", "a2", 10, minutes=2))
+    registry.add(entry("alice", "a1", 10, minutes=1))
+    registry.add(entry("bob", "b1", 10))
+    
+    assert names(registry.documents("alice")) == ["a1", "a2"]  # oldest upload first
+    assert names(registry.documents("alice", ["a2", "b1"])) == ["a2"]
+    assert registry.get("alice", "b1") is None
+    assert registry.remove("alice") == 2
+    assert not registry.has_documents("alice") and registry.has_documents("bob")
+    assert registry.stats()["memory_bytes"] == 10
+
+
+def test_evicts_least_recently_used_across_owners():
+    registry = DocumentRegistry(budget_bytes=300)
+    for name, owner in (("a1", "alice"), ("b1", "bob"), ("a2", "alice")):
+        assert registry.add(entry(owner, name, 100)) == []
+    registry.get("alice", "a1")  # a1 is now the most recently used
+    
+    assert names(registry.add(entry("bob", "b2", 100))) == ["b1"]
+    registry.documents("alice")  # touches a2, then a1
+    assert names(registry.add(entry("bob", "b3", 150))) == ["b2", "a2"]
+    assert registry.stats() == {"documents": 2, "owners": 2, "memory_bytes": 250,
+                                "budget_bytes": 300, "evictions": 3}
+
+
+def test_newest_entry_is_never_evicted():
+    registry = DocumentRegistry(budget_bytes=100)
+    registry.add(entry("alice", "small", 50))
+    
+    evicted = registry.add(entry("alice", "huge", 500))
+    
+    assert names(evicted) == ["small"]
+    assert names(registry.documents("alice")) == ["huge"]
+    assert registry.total_bytes == 500
+
+
+def test_re_adding_replaces_size():
+    registry = DocumentRegistry(budget_bytes=1000)
+    registry.add(entry("alice", "a1", 100))
+    registry.add(entry("alice", "a1", 40))
+    
+    assert registry.stats()["documents"] == 1 and registry.total_bytes == 40
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_core")
+
+from tools.document_registry import DocumentEntry
+from tools.document_store import DocumentStore
+from tools.lexical_index import BM25Index
+
+TEXTS = ["Travel expenses need manager approval.", "Medical leave is up to ten days."]
+
+
+def save(store, owner, document_id, file_hash=None):
+    entry = DocumentEntry(owner, f"{document_id}.txt", TEXTS, SimpleNamespace(lexical=BM25Index.build(TEXTS)),
+                          summary="Policies", characters=sum(map(len, TEXTS)), document_id=document_id)
+    assert store.save(entry, file_hash=file_hash)
+    return entry
+
+
+def test_scan_after_restart(tmp_path):
+    store = DocumentStore(tmp_path)
+    save(store, "alice", "a1")
+    save(store, "bob", "b1")
+    
+    restarted = DocumentStore(tmp_path)
+    assert not restarted.has_documents()
+    assert restarted.scan() == 2
+    assert restarted.document_ids("alice") == ["a1"]
+    assert restarted.metadata("bob", "b1")["summary"] == "Policies"
+    
+    meta, chunks, index, lexical = restarted.open("alice", "a1")
+    assert [chunk.page_content for chunk in chunks] == TEXTS
+    assert index is None and lexical.top_k("leave", 1)[0][1] == 1
+
+
+def test_find_and_copy_reuse_an_upload(tmp_path):
+    store = DocumentStore(tmp_path)
+    save(store, "alice", "a1", file_hash="same")
+    
+    assert store.find("same", "bob")["owner"] == "alice"
+    copied = store.copy(store.find("same", "bob"), "bob", "b1", "mine.txt")
+    
+    assert (copied["owner"], copied["filename"], copied["file_hash"]) == ("bob", "mine.txt", "same")
+    assert store.find("same", "bob")["document_id"] == "b1"  # owner's own copy first
+    assert [chunk.page_content for chunk in store.open("bob", "b1")[1]] == TEXTS
+    # Deleting the original leaves the copy intact
+    assert store.delete("alice") == 1
+    assert DocumentStore(tmp_path).scan() == 1
+
+
+def test_faiss_index_and_chunks_reopen_memory_mapped(tmp_path):
+    import faiss
+    import numpy as np
+    
+    vectors = np.eye(len(TEXTS), 4, dtype=np.float32)
+    index = faiss.IndexFlatL2(4)
+    index.add(vectors)
+    store = DocumentStore(tmp_path)
+    assert store.save(DocumentEntry("alice", "a1.txt", TEXTS, SimpleNamespace(index=index), document_id="a1"))
+    
+    restarted = DocumentStore(tmp_path)
+    restarted.scan()
+    meta, chunks, reopened, lexical = restarted.open("alice", "a1")
+    
+    assert meta["indexed"] and lexical is None
+    assert isinstance(chunks.data, np.memmap) and len(chunks) == len(TEXTS)
+    assert reopened.ntotal == len(TEXTS)
+    _, positions = reopened.search(vectors[1:], 1)
+    assert chunks.search(positions[0][0]).page_content == TEXTS[1]
+
+
+def test_empty_document_reopens(tmp_path):
+    store = DocumentStore(tmp_path)
+    assert store.save(DocumentEntry("alice", "empty.txt", [], SimpleNamespace(lexical=BM25Index.build([])),
+                                    document_id="e1"))
+    
+    assert list(store.open("alice", "e1")[1]) == []
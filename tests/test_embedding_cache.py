@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.embeddings import Embeddings
+
+from tools.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic vectors; records every text sent to the model"""
+    
+    def __init__(self):
+        self.sent = []
+    
+    def embed_documents(self, texts):
+        self.sent += texts
+        return [[float(len(text)), 1.0] for text in texts]
+    
+    def embed_query(self, text):
+        self.sent.append(text)
+        return [float(len(text)), 0.0]
+
+
+def test_chunks_are_embedded_once(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, cache, model="test")
+    
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", "gamma"])
+    
+    assert model.sent == ["alpha", "beta", "gamma"]
+    assert first == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]] and second == [[4.0, 1.0], [5.0, 1.0]]
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert cache.stats()["chunk_hit_ratio"] == 0.4
+
+
+def test_cache_persists_and_is_keyed_by_model(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    CachedEmbeddings(CountingEmbeddings(), EmbeddingCache(path), model="test").embed_documents(["alpha"])
+    
+    model = CountingEmbeddings()
+    reopened = EmbeddingCache(path)
+    CachedEmbeddings(model, reopened, model="test").embed_documents(["alpha"])
+    CachedEmbeddings(model, reopened, model="other").embed_documents(["alpha"])
+    
+    assert model.sent == ["alpha"]  # only for the other model
+    assert (reopened.hits, reopened.misses) == (1, 1)
+
+
+def test_document_hits(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    
+    assert cache.stats()["document_hit_ratio"] is None
+    for hit in (True, False, True, True):
+        cache.record_document(hit)
+    
+    assert cache.stats()["document_hits"] == 3 and cache.stats()["document_hit_ratio"] == 0.75
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.database import Meeting
+from tools.idempotency import IdempotencyStore
+
+WHEN = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+
+def schedule(client, key, title="Planning"):
+    return client.post("/api/meetings/schedule", headers={"Idempotency-Key": key}, json={
+        "title": title, "scheduled_time": WHEN.isoformat(), "participants": ["a@x.com"]
+    })
+
+
+def meetings(db):
+    session = db.get_session()
+    try:
+        return session.query(Meeting).count()
+    finally:
+        session.close()
+
+
+def test_retry_replays_first_result(client, db):
+    first = schedule(client, "retry-1")
+    second = schedule(client, "retry-1")
+    
+    assert first.status_code == second.status_code == 200
+    assert first.headers["Idempotent-Replayed"] == "false"
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert meetings(db) == 1
+
+
+def test_key_reused_with_different_body_is_rejected(client, db):
+    assert schedule(client, "reuse-1").status_code == 200
+    
+    response = schedule(client, "reuse-1", title="Something else")
+    
+    assert response.status_code == 422
+    assert meetings(db) == 1
+
+
+def test_failed_handler_releases_key(db):
+    store = IdempotencyStore()
+    calls = []
+    
+    async def handler():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return {"success": True}
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.run("release-1", "hash", handler))
+    result, replayed = asyncio.run(store.run("release-1", "hash", handler))
+    
+    assert (result, replayed, len(calls)) == ({"success": True}, False, 2)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from tools.lexical_index import BM25Index, DENSE_POSTINGS_RATIO
+
+# One chunk in every DENSE_POSTINGS_RATIO * 4 mentions "rare"; every chunk mentions "common"
+CHUNKS = 4 * DENSE_POSTINGS_RATIO * 10
+TEXTS = [
+    " ".join(["common"] * (1 + position % 3) + (["rare"] if position % (4 * DENSE_POSTINGS_RATIO) == 0 else [])
+             + [f"filler{position % 7}"] * (position % 5))
+    for position in range(CHUNKS)
+]
+
+
+def expected(index, question, k):
+    """Top k from the full score vector, ties to the earliest chunk"""
+    scores = index.scores(question)
+    order = sorted(np.flatnonzero(scores > 0), key=lambda position: (-scores[position], position))
+    return [(float(scores[position]), int(position)) for position in order[:k]]
+
+
+def assert_top_k(index, question, k=3):
+    result = index.top_k(question, k)
+    assert [position for _, position in result] == [position for _, position in expected(index, question, k)]
+    assert np.allclose([score for score, _ in result], [score for score, _ in expected(index, question, k)])
+
+
+def test_sparse_and_dense_paths_agree_with_full_scores():
+    index = BM25Index.build(TEXTS)
+    
+    assert len(index._postings("rare")[0]) * DENSE_POSTINGS_RATIO < len(index)
+    assert_top_k(index, "rare")
+    assert len(index._postings("common")[0]) * DENSE_POSTINGS_RATIO >= len(index)
+    assert_top_k(index, "common", k=5)
+    assert_top_k(index, "Rare common filler3", k=10)
+
+
+def test_unknown_terms_and_empty_k():
+    index = BM25Index.build(TEXTS)
+    
+    assert index.top_k("nothing matches") == []
+    assert index.top_k("rare", k=0) == []
+    assert len(index.top_k("rare", k=100)) == CHUNKS // (4 * DENSE_POSTINGS_RATIO)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = BM25Index.build(TEXTS)
+    assert not BM25Index.exists(tmp_path)
+    index.save(tmp_path)
+    
+    loaded = BM25Index.load(tmp_path)
+    
+    assert BM25Index.exists(tmp_path)
+    assert len(loaded) == len(index) and loaded.vocabulary == index.vocabulary
+    for question in ("rare", "common filler2"):
+        assert loaded.top_k(question, 5) == index.top_k(question, 5)
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from tools.database_tool import DatabaseTool
+from tools.meeting_query import QueryCompiler, MeetingFilter
+
+NOW = datetime(2030, 1, 9, 14, 30)  # a Wednesday
+TODAY = datetime(2030, 1, 9)
+
+
+def compile(question):
+    return QueryCompiler().compile(question, now=NOW)
+
+
+def test_now_means_today():
+    for question in ("Do I have a meeting now?", "Any meetings right now", "current meetings", "today"):
+        meeting_filter = compile(question)
+        assert (meeting_filter.start, meeting_filter.end, meeting_filter.period) == (
+            TODAY, TODAY + timedelta(days=1), "today"), question
+        assert meeting_filter.keywords == ()
+
+
+def test_current_week_and_from_now_on_keep_their_periods():
+    assert compile("meetings in the current week").period == "this_week"
+    assert compile("meetings this month").period == "this_month"
+    assert compile("meetings from now on").period == "upcoming"
+
+
+def test_week_periods():
+    assert compile("meetings next week")[:2] == (datetime(2030, 1, 14), datetime(2030, 1, 21))
+    assert compile("meetings last week")[:2] == (datetime(2029, 12, 31), datetime(2030, 1, 7))
+
+
+def test_keywords_and_literals():
+    meeting_filter = compile('budget review with bob@example.com "Q3 plan" tomorrow')
+    
+    assert meeting_filter.participant == "bob@example.com"
+    assert meeting_filter.keywords == ("Q3 plan", "budget", "review")
+    assert meeting_filter.period == "tomorrow"
+    assert meeting_filter.status == "scheduled"
+    assert compile("search meetings about budget").keywords == ("budget",)
+    assert compile("meetings regarding the Q3 budget").keywords == ("q3", "budget")
+
+
+def test_next_n_meetings_is_open_ended():
+    meeting_filter = compile("next 3 meetings")
+    
+    assert (meeting_filter.start, meeting_filter.end, meeting_filter.limit) == (NOW, None, 3)
+
+
+def test_questions_of_one_shape_share_a_plan():
+    compiler = QueryCompiler()
+    compiler.compile("meetings with a@example.com on 2030-01-10", now=NOW)
+    meeting_filter = compiler.compile("meetings with b@example.com on 2030-02-11", now=NOW)
+    
+    assert compiler.plan_cache_info()["hits"] == 1
+    assert meeting_filter.participant == "b@example.com"
+    assert meeting_filter.start == datetime(2030, 2, 11)
+
+
+def test_open_ended_filters_expand_series(db):
+    start = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=30)
+    tool = DatabaseTool()
+    tool.create_meeting({"title": "Standup", "scheduled_time": start, "recurrence_rule": "FREQ=DAILY"})
+    tool.create_meeting({"title": "Offsite", "scheduled_time": start + timedelta(days=40, hours=3)})
+    after = start + timedelta(days=39, hours=12)
+    
+    rows = tool.query_meetings(MeetingFilter(start=after, limit=3))
+    
+    assert [(row.title, row.scheduled_time) for row in rows] == [
+        ("Standup", start + timedelta(days=40)),
+        ("Offsite", start + timedelta(days=40, hours=3)),
+        ("Standup", start + timedelta(days=41)),
+    ]
+    assert [row.title for row in tool.iter_filtered_meetings(MeetingFilter(start=after, limit=3))] == [
+        "Standup", "Offsite", "Standup"]
@@ -0,0 +1,111 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import inspect
+
+from database.connection import DatabaseManager
+from models.database import MEETING_ROW_COLUMNS, MeetingOccurrenceException, MeetingRow
+from tools.database_tool import DatabaseTool
+from tools.meeting_query import MeetingFilter
+
+START = datetime(2030, 1, 7, 10, 0)  # a Monday
+
+
+def series(tool, rule="FREQ=WEEKLY;BYDAY=MO", start=START, title="Weekly sync"):
+    result = tool.create_meeting({"title": title, "scheduled_time": start, "duration_minutes": 30,
+                                  "location": "Room A", "recurrence_rule": rule})
+    assert result["success"], result
+    return result["meeting"]["id"]
+
+
+def occurrences(tool, start, end):
+    return [(row.title, row.scheduled_time) for row in tool._get_meetings_between(start, end)]
+
+
+def test_expand_series_in_window(db):
+    tool = DatabaseTool()
+    series(tool)
+    series(tool, rule="FREQ=DAILY;COUNT=3", start=START + timedelta(days=1, hours=4), title="Sprint")
+    
+    assert occurrences(tool, START + timedelta(days=6), START + timedelta(days=15)) == [
+        ("Weekly sync", START + timedelta(days=7)),
+        ("Weekly sync", START + timedelta(days=14)),
+    ]
+    assert [when for _, when in occurrences(tool, START, START + timedelta(days=7))] == [
+        START, START + timedelta(days=1, hours=4), START + timedelta(days=2, hours=4),
+        START + timedelta(days=3, hours=4),
+    ]
+
+
+def test_cancelled_and_modified_occurrences(db):
+    tool = DatabaseTool()
+    meeting_id = series(tool)
+    assert tool.cancel_occurrence(meeting_id, START + timedelta(days=7))["success"]
+    # Moved out of the second week into the third
+    assert tool.modify_occurrence(meeting_id, START + timedelta(days=14), {
+        "scheduled_time": START + timedelta(days=15), "title": "Moved sync"
+    })["success"]
+    assert not tool.modify_occurrence(meeting_id, START + timedelta(hours=1), {"title": "x"})["success"]
+    
+    assert occurrences(tool, START + timedelta(days=1), START + timedelta(days=22)) == [
+        ("Moved sync", START + timedelta(days=15)),
+        ("Weekly sync", START + timedelta(days=21)),
+    ]
+    # Only the moved time is in this window, not the original one
+    assert occurrences(tool, START + timedelta(days=15), START + timedelta(days=16)) == [
+        ("Moved sync", START + timedelta(days=15))]
+    assert occurrences(tool, START + timedelta(days=14), START + timedelta(days=15)) == []
+
+
+def test_aware_bounds_expand_series(db):
+    tool = DatabaseTool()
+    meeting_id = series(tool)
+    start, end = (when.astimezone(timezone.utc) for when in (START - timedelta(hours=1), START + timedelta(days=15)))
+    
+    assert tool.cancel_occurrence(meeting_id, (START + timedelta(days=7)).astimezone(timezone.utc))["success"]
+    meeting_filter = MeetingFilter(start=start, end=end)
+    assert [row.scheduled_time for row in tool.query_meetings(meeting_filter)] == [START, START + timedelta(days=14)]
+    assert len(list(tool.iter_filtered_meetings(meeting_filter))) == 2
+    assert tool.get_meeting_stats(meeting_filter, None)["total_meetings"] == 2
+
+
+def test_apply_exception():
+    row = MeetingRow(*[None] * len(MEETING_ROW_COLUMNS))._replace(
+        id=1, title="Sync", scheduled_time=START, duration_minutes=30, location="Room A",
+        recurrence_rule="FREQ=WEEKLY")
+    original = START + timedelta(days=7)
+    
+    plain = DatabaseTool._apply_exception(row, original, None)
+    assert (plain.scheduled_time, plain.recurrence_id) == (original, original)
+    assert DatabaseTool._apply_exception(row, original, MeetingOccurrenceException(status="cancelled")) is None
+    moved = DatabaseTool._apply_exception(row, original, MeetingOccurrenceException(
+        status="modified", scheduled_time=original + timedelta(hours=2), duration_minutes=45))
+    assert (moved.scheduled_time, moved.duration_minutes, moved.title, moved.location, moved.recurrence_id) == (
+        original + timedelta(hours=2), 45, "Sync", "Room A", original)
+
+
+def test_existing_database_is_migrated(tmp_path):
+    path = tmp_path / "old.db"
+    # The meetings table as first released, before recurrence
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE meetings (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, description TEXT, "
+        "scheduled_time DATETIME NOT NULL, duration_minutes INTEGER, location VARCHAR(100), "
+        "organizer VARCHAR(100), participants TEXT, status VARCHAR(20), weather_checked BOOLEAN, "
+        "weather_condition VARCHAR(50), created_at DATETIME, updated_at DATETIME)"
+    )
+    connection.execute("INSERT INTO meetings (title, scheduled_time) VALUES ('Old', '2030-01-07 10:00:00')")
+    connection.commit()
+    connection.close()
+    
+    manager = DatabaseManager(f"sqlite:///{path}")
+    manager.connect()
+    manager.create_tables()
+    manager.create_tables()  # already at head: nothing to do
+    
+    columns = {column["name"] for column in inspect(manager.engine).get_columns("meetings")}
+    assert {"recurrence_rule", "recurrence_end"} <= columns
+    with manager.engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar() == "0001"
+        assert connection.exec_driver_sql("SELECT title FROM meetings").scalar() == "Old"
+    manager.engine.dispose()
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from agents.meeting_agent import MeetingAgent
+from agents.weather_agent import WeatherAgent
+from app.config import settings
+from models.database import Meeting
+from tools.database_tool import DatabaseTool, AGENT_ORGANIZER
+
+WORKERS = 16
+
+
+def slot():
+    return (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+
+def meeting(index, when, location="Conference Room", participants=None):
+    return {
+        "title": f"Meeting {index}",
+        "scheduled_time": when,
+        "duration_minutes": 60,
+        "location": location,
+        "organizer": AGENT_ORGANIZER,
+        "participants": participants or [f"guest{index}@example.com"],
+    }
+
+
+def booked(db, when):
+    session = db.get_session()
+    try:
+        return session.query(Meeting).filter(Meeting.scheduled_time == when).count()
+    finally:
+        session.close()
+
+
+def test_concurrent_requests_book_one_meeting(db):
+    when = slot()
+    barrier = threading.Barrier(WORKERS)
+    
+    def book(index):
+        barrier.wait(timeout=10)
+        return DatabaseTool().create_meeting_if_free(
+            meeting(index, when, participants=["alice@example.com", f"guest{index}@example.com"])
+        )["success"]
+    
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(book, range(WORKERS)))
+    
+    assert sum(results) == 1
+    assert booked(db, when) == 1
+
+
+def test_agent_organizer_is_not_a_conflict_scope(db):
+    when = slot()
+    outcomes = DatabaseTool().create_meetings_if_free([
+        meeting(1, when, location="Room A", participants=["a@x.com"]),
+        meeting(2, when, location="Room B", participants=["b@x.com"]),
+    ])
+    
+    assert [outcome["success"] for outcome in outcomes] == [True, True]
+    assert booked(db, when) == 2
+
+
+def test_shared_room_conflicts(db):
+    when = slot()
+    outcomes = DatabaseTool().create_meetings_if_free([
+        meeting(1, when, location="Room A", participants=["a@x.com"]),
+        meeting(2, when + timedelta(minutes=30), location="room a", participants=["b@x.com"]),
+    ])
+    
+    assert [outcome["success"] for outcome in outcomes] == [True, False]
+
+
+def test_batch_loads_conflicts_per_window(db, monkeypatch):
+    when = slot()
+    later = when + timedelta(days=90)
+    tool = DatabaseTool()
+    tool.create_meeting(meeting(0, later + timedelta(minutes=30), location="Room A", participants=["z@x.com"]))
+    tool.create_meeting(meeting(0, when + timedelta(days=45), location="Room A", participants=["z@x.com"]))
+    
+    windows = []
+    scoped_meetings = DatabaseTool._scoped_meetings
+    def record(self, session, start, end, keys):
+        windows.append((start, end))
+        return scoped_meetings(self, session, start, end, keys)
+    monkeypatch.setattr(DatabaseTool, "_scoped_meetings", record)
+    
+    outcomes = tool.create_meetings_if_free([
+        meeting(1, when, location="Room A", participants=["a@x.com"]),
+        meeting(2, later, location="Room A", participants=["b@x.com"]),
+        meeting(3, when + timedelta(minutes=30), location="Room B", participants=["c@x.com"]),
+    ])
+    
+    assert [outcome["success"] for outcome in outcomes] == [True, False, True]
+    assert windows == [(when, when + timedelta(minutes=90)), (later, later + timedelta(hours=1))]
+
+
+def test_batch_item_errors_stay_per_item(db):
+    agent = MeetingAgent(WeatherAgent("test"))
+    
+    result = asyncio.run(agent.schedule_meetings([
+        {"title": "Planning", "scheduled_time": slot().isoformat(), "participants": ["a@x.com"]},
+        {"scheduled_time": slot().isoformat()},  # no title
+        {"title": "Bad time", "scheduled_time": "not a time"},
+    ]))
+    
+    assert [item["status"] for item in result["results"]] == ["scheduled", "error", "invalid"]
+    assert result["scheduled"] == 1
+
+
+def test_books_with_retries_disabled(db, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULE_LOCK_RETRIES", 0)
+    
+    outcome = DatabaseTool().create_meeting_if_free(meeting(1, slot()))
+    
+    assert outcome["success"]
+    assert booked(db, slot()) == 1
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+from agents.meeting_agent import MeetingAgent
+from agents.weather_agent import WeatherAgent
+from tools.weather_tool import WeatherTool
+
+NOW = datetime.now().replace(minute=0, second=0, microsecond=0)
+
+
+def forecast(city):
+    return {"city": city, "country": "GB", "slots": [
+        {"time": NOW + timedelta(hours=3 * step), "weather": "clear sky", "temperature": 20,
+         "wind_speed": 2, "probability_of_precipitation": 0.1}
+        for step in range(40)
+    ]}
+
+
+def test_get_weather_accepts_aware_times(monkeypatch):
+    monkeypatch.setattr(WeatherTool, "get_forecast_slots", lambda self, city: forecast(city))
+    when = (NOW + timedelta(hours=7)).astimezone(timezone.utc)
+    
+    result = WeatherAgent("test").get_weather("London", when)
+    
+    assert result.source == "forecast"
+    assert result.time == NOW + timedelta(hours=6)
+
+
+def test_placeholder_key_skips_lookups(monkeypatch):
+    def fail(self, city):
+        raise AssertionError("weather API called without a key")
+    monkeypatch.setattr(WeatherTool, "get_forecast_slots", fail)
+    agent = WeatherAgent("your_openweather_api_key_here")
+    
+    assert not agent.has_api_key
+    assert agent.get_forecast("London") is None
+    assert agent.get_weather("London", NOW + timedelta(hours=7)) is None
+    result = MeetingAgent(agent).find_weather_slots("London", ["a@x.com"], 60)
+    assert result == {"success": False, "error": "Weather API key not configured"}
+
+
+def test_meeting_agent_reads_forecast_through_weather_agent(db, monkeypatch):
+    agent = WeatherAgent("test")
+    calls = []
+    monkeypatch.setattr(WeatherAgent, "get_forecast", lambda self, city: calls.append(city) or forecast(city))
+    
+    result = MeetingAgent(agent).find_weather_slots("London", ["a@x.com"], 60)
+    
+    assert result["success"] and result["city"] == "London"
+    assert calls == ["London"]
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from jobs.weather_annotation import WeatherAnnotationJob
+from models.database import Meeting
+from tools.database_tool import DatabaseTool
+
+NOW = datetime.now().replace(minute=0, second=0, microsecond=0)
+
+
+class ForecastTool:
+    def __init__(self):
+        self.calls = []
+    
+    def get_forecast_slots(self, city):
+        self.calls.append(city)
+        return {"city": city, "slots": [
+            {"time": NOW + timedelta(hours=3 * step), "weather": f"{city} {step}"} for step in range(40)
+        ]}
+
+
+def test_annotates_nearest_slot_once_per_city(db):
+    tool = DatabaseTool()
+    for hours, location in ((1, "Paris Office"), (4, "Paris HQ"), (26, "Board Room"), (200, "Paris")):
+        tool.create_meeting({"title": location, "scheduled_time": NOW + timedelta(hours=hours), "location": location})
+    forecasts = ForecastTool()
+    
+    stats = WeatherAnnotationJob(forecasts, default_city="London").run(now=NOW)
+    
+    assert (stats["meetings_scanned"], stats["annotated"]) == (3, 3)
+    assert sorted(forecasts.calls) == ["London", "Paris"]
+    session = db.get_session()
+    try:
+        conditions = dict(session.query(Meeting.title, Meeting.weather_condition))
+    finally:
+        session.close()
+    assert conditions == {"Paris Office": "Paris 0", "Paris HQ": "Paris 1", "Board Room": "London 9", "Paris": None}
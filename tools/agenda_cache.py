@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Any
+import logging
+import threading
+import time
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AgendaCache:
+    """Read-through cache of agenda query results keyed by date bucket.
+    
+    Buckets are "day:YYYY-MM-DD" and "week:YYYY-MM-DD" (the Monday). Writes
+    invalidate only the buckets their meetings fall in. Entries also expire
+    after ttl_seconds, which bounds staleness when no publisher is set.
+    
+    For several worker processes, set a publisher with set_publisher(); it is
+    called with the invalidated keys (None means everything) so the message
+    can be fanned out (e.g. Postgres NOTIFY, Redis pub/sub). Receivers pass the
+    keys to handle_remote_invalidation().
+    """
+    
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._publisher: Optional[Callable[[Optional[List[str]]], None]] = None
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def day_key(value: date) -> str:
+        if isinstance(value, datetime):
+            value = value.date()
+        return f"day:{value.isoformat()}"
+    
+    @staticmethod
+    def week_key(value: date) -> str:
+        if isinstance(value, datetime):
+            value = value.date()
+        monday = value - timedelta(days=value.weekday())
+        return f"week:{monday.isoformat()}"
+    
+    def keys_for_time(self, value: datetime) -> List[str]:
+        """Buckets a meeting starting at value belongs to"""
+        return [self.day_key(value), self.week_key(value)]
+    
+    def get_or_load(self, key: str, loader: Callable[[], List[Any]]) -> List[Any]:
+        """Return the cached list for key, calling loader on a miss"""
+        if self.ttl_seconds <= 0:
+            return loader()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+            generation = (self._epoch, self._generations.get(key, 0))
+        
+        value = loader()
+        
+        with self._lock:
+            # Skip the store if the bucket was invalidated while loading
+            if generation == (self._epoch, self._generations.get(key, 0)):
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, tuple(value))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return list(value)
+    
+    def invalidate(self, keys: Iterable[str], publish: bool = True):
+        """Drop the given buckets locally and, optionally, in other workers"""
+        keys = sorted(set(keys))
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+        if publish:
+            self._publish(keys)
+    
+    def invalidate_times(self, times: Iterable[Optional[datetime]], publish: bool = True):
+        """Drop the buckets of meetings starting at the given times"""
+        keys = []
+        for value in times:
+            if value is not None:
+                keys.extend(self.keys_for_time(value))
+        self.invalidate(keys, publish)
+    
+    def clear(self, publish: bool = True):
+        """Drop every bucket, e.g. after a recurring series changes"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+        if publish:
+            self._publish(None)
+    
+    def set_publisher(self, publisher: Optional[Callable[[Optional[List[str]]], None]]):
+        """Register the cross-process invalidation hook (None disables it)"""
+        self._publisher = publisher
+    
+    def handle_remote_invalidation(self, keys: Optional[List[str]]):
+        """Apply an invalidation published by another worker"""
+        if keys is None:
+            self.clear(publish=False)
+        else:
+            self.invalidate(keys, publish=False)
+    
+    def _publish(self, keys: Optional[List[str]]):
+        if not self._publisher:
+            return
+        try:
+            self._publisher(keys)
+        except Exception as e:
+            # Local invalidation already happened; other workers fall back to the TTL
+            logger.error(f"Error publishing agenda cache invalidation: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+# Shared by every DatabaseTool in the process
+agenda_cache = AgendaCache(ttl_seconds=settings.AGENDA_CACHE_TTL_SECONDS)
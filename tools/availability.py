@@ -0,0 +1,106 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from typing import Any, FrozenSet, Iterable, Iterator, List, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+DEFAULT_DAY_START = time(9, 0)
+DEFAULT_DAY_END = time(17, 0)
+WORKDAYS = frozenset(range(5))  # Monday to Friday
+ALL_DAYS = frozenset(range(7))
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Union overlapping or touching intervals with one sort and a linear sweep"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def working_windows(start: datetime, end: datetime, day_start: time = DEFAULT_DAY_START,
+                    day_end: time = DEFAULT_DAY_END,
+                    weekdays: FrozenSet[int] = WORKDAYS) -> Iterator[Interval]:
+    """Working-hour windows between start and end, clipped to [start, end)"""
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        if day.weekday() in weekdays:
+            window_start = max(start, datetime.combine(day.date(), day_start))
+            window_end = min(end, datetime.combine(day.date(), day_end))
+            if window_start < window_end:
+                yield window_start, window_end
+        day += timedelta(days=1)
+
+def ceil_to_step(value: datetime, step_minutes: int) -> datetime:
+    """Round up to the next multiple of step_minutes past midnight"""
+    midnight = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    step = timedelta(minutes=step_minutes)
+    steps = -((midnight - value) // step)
+    return midnight + steps * step
+
+def find_free_slots(busy: Iterable[Interval], start: datetime, end: datetime, duration_minutes: int,
+                    day_start: time = DEFAULT_DAY_START, day_end: time = DEFAULT_DAY_END,
+                    weekdays: FrozenSet[int] = WORKDAYS, step_minutes: int = 15,
+                    limit: int = 5) -> List[Interval]:
+    """Earliest non-overlapping free slots of duration_minutes inside working hours.
+    
+    busy is merged first; the windows and merged intervals are both sorted, so
+    a single forward pass over each finds the slots. Slot starts are aligned
+    to step_minutes.
+    """
+    duration = timedelta(minutes=duration_minutes)
+    merged = merge_intervals(busy)
+    slots: List[Interval] = []
+    index = 0
+    
+    for window_start, window_end in working_windows(start, end, day_start, day_end, weekdays):
+        cursor = ceil_to_step(window_start, step_minutes)
+        while cursor + duration <= window_end:
+            # Skip busy intervals that end before the candidate starts
+            while index < len(merged) and merged[index][1] <= cursor:
+                index += 1
+            if index < len(merged) and merged[index][0] < cursor + duration:
+                cursor = ceil_to_step(merged[index][1], step_minutes)
+                continue
+            slots.append((cursor, cursor + duration))
+            if len(slots) >= limit:
+                return slots
+            cursor += duration
+    return slots
+
+class IntervalIndex:
+    """Intervals sorted by start, with payloads, for overlap lookups.
+    
+    Intervals may overlap each other. A lookup bisects to the last interval
+    starting before the query ends and walks back only as far as the
+    longest stored interval could reach.
+    """
+    
+    def __init__(self):
+        self._starts: List[datetime] = []
+        self._entries: List[Tuple[datetime, datetime, Any]] = []
+        self._longest = timedelta(0)
+    
+    def add(self, start: datetime, end: datetime, payload: Any = None):
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._entries.insert(position, (start, end, payload))
+        self._longest = max(self._longest, end - start)
+    
+    def overlapping(self, start: datetime, end: datetime) -> List[Any]:
+        """Payloads of stored intervals overlapping [start, end)"""
+        found = []
+        earliest = start - self._longest
+        position = bisect_left(self._starts, end)
+        while position > 0:
+            position -= 1
+            entry_start, entry_end, payload = self._entries[position]
+            if entry_start <= earliest:
+                break
+            if entry_end > start:
+                found.append(payload)
+        return found
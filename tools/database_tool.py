@@ -1,93 +1,578 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_
-from models.database import Meeting
+from sqlalchemy import Date, Integer, and_, or_, bindparam, cast, extract, func, insert, select, update, table, column
+from sqlalchemy.exc import OperationalError
+from app.config import settings
+from models.database import (
+    Meeting, MeetingParticipant, MeetingOccurrenceException, MeetingRow,
+    MEETING_ROW_COLUMNS, parse_recurrence, split_participants
+)
 from database.connection import db_manager
+from tools.agenda_cache import agenda_cache
+from tools.availability import IntervalIndex
+from tools.meeting_query import MeetingFilter, STATS_GROUPS, TIME_STATS_GROUPS, filter_shape
+from utils.validator import to_local_naive
+from collections import defaultdict
+import heapq
 import logging
 import json
+import random
+import re
+from time import sleep
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
+# Meetings can start before a busy-time window and still overlap it
+BUSY_LOOKBACK = timedelta(hours=24)
+
+# Open-ended queries ("after <date>", "next 3 meetings") expand series this far
+SERIES_HORIZON = timedelta(days=365)
+
+# Organizer the agents book meetings as; not a real person, so not a conflict scope
+AGENT_ORGANIZER = "AI Assistant"
+
+# First backoff before retrying a scheduling transaction on a busy database
+SCHEDULE_RETRY_DELAY = 0.05  # seconds
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# SQLite FTS5 index created by DatabaseManager.create_tables
+meetings_fts = table("meetings_fts", column("rowid"), column("meetings_fts"))
+
 class DatabaseTool:
     """Tool for database operations"""
     
+    # Compiled MeetingFilter statements, shared by all instances
+    _filter_statements: Dict[tuple, Any] = {}
+    
     def __init__(self):
         self.session = db_manager.get_session()
     
-    def get_all_meetings(self) -> List[Dict[str, Any]]:
+    def _select_rows(self):
+        """Query that projects only the columns MeetingRow needs"""
+        return self.session.query(*MEETING_ROW_COLUMNS)
+    
+    @staticmethod
+    def _to_rows(rows) -> List[MeetingRow]:
+        return [MeetingRow(*row) for row in rows]
+    
+    def _get_meetings_between(self, start: datetime, end: datetime) -> List[MeetingRow]:
+        """Scheduled meetings starting in [start, end), recurring occurrences included"""
+        meetings = self._select_rows().filter(
+            and_(
+                Meeting.scheduled_time >= start,
+                Meeting.scheduled_time < end,
+                Meeting.status == "scheduled",
+                Meeting.recurrence_rule.is_(None)
+            )
+        ).all()
+        
+        rows = self._to_rows(meetings) + self._expand_recurring(start, end)
+        rows.sort(key=lambda row: row.scheduled_time)
+        return rows
+    
+    def _expand_recurring(self, start: datetime, end: datetime, series_query=None) -> List[MeetingRow]:
+        """Expand recurring series into occurrences starting in [start, end).
+        
+        Only series whose lifetime overlaps the window are loaded, and only
+        occurrences inside the window are generated. series_query can narrow
+        the series (e.g. to one participant); it must select MEETING_ROW_COLUMNS.
+        """
+        if series_query is None:
+            series_query = self._select_rows()
+        
+        series = self._to_rows(series_query.filter(
+            Meeting.recurrence_rule.isnot(None),
+            Meeting.status == "scheduled",
+            Meeting.scheduled_time < end,
+            or_(Meeting.recurrence_end.is_(None), Meeting.recurrence_end > start)
+        ).all())
+        return self._expand_series(series, start, end)
+    
+    def _expand_series(self, series: List[MeetingRow], start: datetime, end: datetime,
+                       session=None) -> List[MeetingRow]:
+        """Expand already-loaded series rows into occurrences starting in [start, end)"""
+        if not series:
+            return []
+        session = session or self.session
+        
+        # Exceptions either originate in the window or were moved into it
+        exceptions = {}
+        for exception in session.query(MeetingOccurrenceException).filter(
+            MeetingOccurrenceException.meeting_id.in_([row.id for row in series]),
+            or_(
+                and_(MeetingOccurrenceException.original_start >= start,
+                     MeetingOccurrenceException.original_start < end),
+                and_(MeetingOccurrenceException.scheduled_time >= start,
+                     MeetingOccurrenceException.scheduled_time < end)
+            )
+        ):
+            exceptions[(exception.meeting_id, exception.original_start)] = exception
+        
+        occurrences = []
+        for row in series:
+            try:
+                recurrence = parse_recurrence(row.recurrence_rule, row.scheduled_time)
+            except ValueError as e:
+                logger.error(f"Skipping meeting {row.id} with bad recurrence rule: {e}")
+                continue
+            
+            for original_start in recurrence.between(start, end, inc=True):
+                if original_start >= end:
+                    break
+                exception = exceptions.pop((row.id, original_start), None)
+                occurrence = self._apply_exception(row, original_start, exception)
+                if occurrence and start <= occurrence.scheduled_time < end:
+                    occurrences.append(occurrence)
+        
+        # Occurrences moved into the window from outside it
+        rows_by_id = {row.id: row for row in series}
+        for (meeting_id, original_start), exception in exceptions.items():
+            occurrence = self._apply_exception(rows_by_id[meeting_id], original_start, exception)
+            if occurrence and start <= occurrence.scheduled_time < end:
+                occurrences.append(occurrence)
+        
+        return occurrences
+    
+    @staticmethod
+    def _local_filter(meeting_filter: MeetingFilter) -> MeetingFilter:
+        """The filter with aware start/end converted to naive local time, as meetings are stored"""
+        return meeting_filter._replace(
+            start=to_local_naive(meeting_filter.start) if meeting_filter.start else None,
+            end=to_local_naive(meeting_filter.end) if meeting_filter.end else None
+        )
+    
+    @staticmethod
+    def _series_end(meeting_filter: MeetingFilter) -> datetime:
+        """Where series expansion stops for a filter with a start"""
+        if meeting_filter.end is not None:
+            return meeting_filter.end
+        return meeting_filter.start + SERIES_HORIZON
+    
+    @staticmethod
+    def _apply_exception(row: MeetingRow, original_start: datetime,
+                         exception: Optional[MeetingOccurrenceException]) -> Optional[MeetingRow]:
+        """Build one occurrence row, or None if the occurrence is cancelled"""
+        if exception is None:
+            return row._replace(scheduled_time=original_start, recurrence_id=original_start)
+        if exception.status == "cancelled":
+            return None
+        return row._replace(
+            scheduled_time=exception.scheduled_time or original_start,
+            title=exception.title or row.title,
+            duration_minutes=exception.duration_minutes or row.duration_minutes,
+            location=exception.location or row.location,
+            recurrence_id=original_start
+        )
+    
+    @staticmethod
+    def _invalidate_agendas(scheduled_time: datetime, recurrence_rule: Optional[str] = None):
+        """Drop cached agendas a written meeting can appear in"""
+        if recurrence_rule:
+            # A series can land in any bucket
+            agenda_cache.clear()
+        else:
+            agenda_cache.invalidate_times([scheduled_time])
+    
+    def get_all_meetings(self) -> List[MeetingRow]:
         """Get all meetings"""
         try:
-            meetings = self.session.query(Meeting).all()
-            return [meeting.to_dict() for meeting in meetings]
+            meetings = self._select_rows().all()
+            return self._to_rows(meetings)
         except Exception as e:
             logger.error(f"Error getting all meetings: {e}")
             return []
         finally:
             self.session.close()
     
-    def get_meetings_by_date(self, date: datetime) -> List[Dict[str, Any]]:
+    def get_meetings_by_date(self, date: datetime) -> List[MeetingRow]:
         """Get meetings scheduled for a specific date"""
         try:
             start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = start_of_day + timedelta(days=1)
             
-            meetings = self.session.query(Meeting).filter(
-                and_(
-                    Meeting.scheduled_time >= start_of_day,
-                    Meeting.scheduled_time < end_of_day,
-                    Meeting.status == "scheduled"
-                )
-            ).all()
-            
-            return [meeting.to_dict() for meeting in meetings]
+            return agenda_cache.get_or_load(
+                agenda_cache.day_key(start_of_day),
+                lambda: self._get_meetings_between(start_of_day, end_of_day)
+            )
         except Exception as e:
             logger.error(f"Error getting meetings by date: {e}")
             return []
     
-    def get_meetings_today(self) -> List[Dict[str, Any]]:
+    def get_meetings_today(self) -> List[MeetingRow]:
         """Get meetings scheduled for today"""
         return self.get_meetings_by_date(datetime.now())
     
-    def get_meetings_tomorrow(self) -> List[Dict[str, Any]]:
+    def get_meetings_tomorrow(self) -> List[MeetingRow]:
         """Get meetings scheduled for tomorrow"""
         tomorrow = datetime.now() + timedelta(days=1)
         return self.get_meetings_by_date(tomorrow)
     
-    def get_meetings_next_week(self) -> List[Dict[str, Any]]:
+    def get_meetings_next_week(self) -> List[MeetingRow]:
         """Get meetings scheduled for next week"""
         try:
             today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             next_week_start = today + timedelta(days=7 - today.weekday())
             next_week_end = next_week_start + timedelta(days=7)
             
-            meetings = self.session.query(Meeting).filter(
-                and_(
-                    Meeting.scheduled_time >= next_week_start,
-                    Meeting.scheduled_time < next_week_end,
-                    Meeting.status == "scheduled"
-                )
-            ).all()
-            
-            return [meeting.to_dict() for meeting in meetings]
+            return agenda_cache.get_or_load(
+                agenda_cache.week_key(next_week_start),
+                lambda: self._get_meetings_between(next_week_start, next_week_end)
+            )
         except Exception as e:
             logger.error(f"Error getting meetings next week: {e}")
             return []
     
-    def search_meetings(self, keyword: str) -> List[Dict[str, Any]]:
+    def search_meetings(self, keyword: str) -> List[MeetingRow]:
         """Search meetings by keyword in title or description"""
         try:
-            meetings = self.session.query(Meeting).filter(
-                or_(
-                    Meeting.title.ilike(f"%{keyword}%"),
-                    Meeting.description.ilike(f"%{keyword}%")
-                )
-            ).all()
+            meetings = self._select_rows().filter(self._keyword_filter(keyword)).all()
             
-            return [meeting.to_dict() for meeting in meetings]
+            return self._to_rows(meetings)
         except Exception as e:
             logger.error(f"Error searching meetings: {e}")
             return []
     
+    @staticmethod
+    def _fts_match(keyword: str) -> Optional[str]:
+        """FTS5 MATCH string for keyword, or None if FTS search does not apply"""
+        tokens = re.findall(r"\w+", keyword)
+        if not (db_manager.fts5_enabled and tokens):
+            return None
+        # Quoted prefix terms, implicitly ANDed; quoting disables FTS syntax
+        return " ".join(f'"{token}"*' for token in tokens)
+    
+    @staticmethod
+    def _fts_filter(match):
+        return Meeting.id.in_(
+            select(meetings_fts.c.rowid).where(meetings_fts.c.meetings_fts.op("MATCH")(match))
+        )
+    
+    def _keyword_filter(self, keyword: str):
+        """Title/description match, via FTS5 on SQLite when available"""
+        match = self._fts_match(keyword)
+        if match:
+            return self._fts_filter(match)
+        return or_(
+            Meeting.title.ilike(f"%{keyword}%"),
+            Meeting.description.ilike(f"%{keyword}%")
+        )
+    
+    def query_meetings(self, meeting_filter: MeetingFilter) -> List[MeetingRow]:
+        """Run a MeetingFilter as one SQL statement.
+        
+        With both start and end set, recurring series overlapping the range
+        come back from the same statement and are expanded into occurrences;
+        the limit is then applied after expansion. With only a start, one-offs
+        and series are loaded separately (so the SQL limit counts one-offs
+        only) and series are expanded up to SERIES_HORIZON past the start.
+        """
+        try:
+            meeting_filter = self._local_filter(meeting_filter)
+            params = self._filter_params(meeting_filter)
+            if meeting_filter.start is None:
+                return self._to_rows(self.session.execute(self._filter_statement(meeting_filter), params))
+            
+            if meeting_filter.end is None:
+                rows = self._to_rows(self.session.execute(
+                    self._filter_statement(meeting_filter, series="exclude"), params))
+                series = self._to_rows(self.session.execute(
+                    self._filter_statement(meeting_filter, series="only"), params))
+            else:
+                rows = self._to_rows(self.session.execute(self._filter_statement(meeting_filter), params))
+                series = [row for row in rows if row.recurrence_rule]
+                rows = [row for row in rows if not row.recurrence_rule]
+            
+            if series:
+                rows += self._expand_series(series, meeting_filter.start, self._series_end(meeting_filter))
+                rows.sort(key=lambda row: (row.scheduled_time, row.id), reverse=meeting_filter.descending)
+            return rows[:meeting_filter.limit] if meeting_filter.limit else rows
+        except Exception as e:
+            logger.error(f"Error querying meetings: {e}")
+            return []
+    
+    def iter_filtered_meetings(self, meeting_filter: MeetingFilter,
+                               batch_size: int = 500) -> Iterator[MeetingRow]:
+        """Stream a MeetingFilter's rows from a server-side cursor, in order.
+        
+        Recurring series overlapping the range are expanded up front (they
+        are few) and merged into the cursor stream by scheduled_time; without
+        an end they are expanded up to SERIES_HORIZON past the start.
+        Uses its own session so it can be consumed from another thread.
+        """
+        session = db_manager.get_session()
+        try:
+            meeting_filter = self._local_filter(meeting_filter)
+            use_fts = self._fts_match(" ".join(meeting_filter.keywords)) is not None
+            params = self._filter_params(meeting_filter)
+            expand = meeting_filter.start is not None
+            order = Meeting.scheduled_time.desc() if meeting_filter.descending else Meeting.scheduled_time
+            
+            occurrences = []
+            if expand:
+                series = self._to_rows(session.execute(
+                    select(*MEETING_ROW_COLUMNS).where(
+                        *self._filter_conditions(meeting_filter, use_fts, series="only")
+                    ),
+                    params
+                ))
+                occurrences = self._expand_series(series, meeting_filter.start,
+                                                  self._series_end(meeting_filter), session)
+                occurrences.sort(key=lambda row: (row.scheduled_time, row.id), reverse=meeting_filter.descending)
+            
+            statement = select(*MEETING_ROW_COLUMNS).where(
+                *self._filter_conditions(meeting_filter, use_fts, series="exclude" if expand else "include")
+            ).order_by(order, Meeting.id)
+            if meeting_filter.limit is not None:
+                statement = statement.limit(meeting_filter.limit)
+            
+            result = session.execute(statement.execution_options(yield_per=batch_size), params)
+            rows = (MeetingRow(*row) for partition in result.partitions() for row in partition)
+            if occurrences:
+                rows = heapq.merge(rows, occurrences, key=lambda row: (row.scheduled_time, row.id),
+                                   reverse=meeting_filter.descending)
+            if meeting_filter.limit is not None:
+                rows = islice(rows, meeting_filter.limit)
+            yield from rows
+        finally:
+            session.close()
+    
+    def _filter_statement(self, meeting_filter: MeetingFilter, series: str = "include"):
+        """Parameterized SELECT for a filter, cached by the filter's shape"""
+        use_fts = self._fts_match(" ".join(meeting_filter.keywords)) is not None
+        key = (filter_shape(meeting_filter), use_fts, series)
+        statement = self._filter_statements.get(key)
+        if statement is not None:
+            return statement
+        
+        conditions = self._filter_conditions(meeting_filter, use_fts, series)
+        order = Meeting.scheduled_time.desc() if meeting_filter.descending else Meeting.scheduled_time
+        statement = select(*MEETING_ROW_COLUMNS).where(*conditions).order_by(order, Meeting.id)
+        # Series rows are expanded after the query, so the limit only holds in SQL without them
+        if meeting_filter.limit is not None and (meeting_filter.start is None or series == "exclude"):
+            statement = statement.limit(bindparam("limit", type_=Integer))
+        
+        self._filter_statements[key] = statement
+        return statement
+    
+    def _filter_conditions(self, meeting_filter: MeetingFilter, use_fts: bool, series: str = "include"):
+        """WHERE clauses for a filter, with bindparams named after its fields.
+        
+        When start is set, series controls recurring series: "include"
+        one-offs in range plus overlapping series, "exclude" one-offs only,
+        "only" overlapping series only. Without a start series rows are
+        matched as stored.
+        """
+        conditions = []
+        start, end = meeting_filter.start is not None, meeting_filter.end is not None
+        if not start:
+            if end:
+                conditions.append(Meeting.scheduled_time < bindparam("end"))
+        else:
+            one_offs = [Meeting.recurrence_rule.is_(None), Meeting.scheduled_time >= bindparam("start")]
+            overlapping = [Meeting.recurrence_rule.isnot(None),
+                           or_(Meeting.recurrence_end.is_(None), Meeting.recurrence_end > bindparam("start"))]
+            if end:
+                one_offs.append(Meeting.scheduled_time < bindparam("end"))
+                overlapping.append(Meeting.scheduled_time < bindparam("end"))
+            if series == "exclude":
+                conditions += one_offs
+            elif series == "only":
+                conditions += overlapping
+            else:
+                conditions.append(or_(and_(*one_offs), and_(*overlapping)))
+        
+        if meeting_filter.status is not None:
+            conditions.append(Meeting.status == bindparam("status"))
+        if meeting_filter.location is not None:
+            conditions.append(Meeting.location.ilike(bindparam("location")))
+        if meeting_filter.organizer is not None:
+            conditions.append(Meeting.organizer.ilike(bindparam("organizer")))
+        if meeting_filter.participant is not None:
+            conditions.append(Meeting.id.in_(
+                select(MeetingParticipant.meeting_id).where(MeetingParticipant.email == bindparam("participant"))
+            ))
+        if use_fts:
+            conditions.append(self._fts_filter(bindparam("match")))
+        else:
+            for index in range(len(meeting_filter.keywords)):
+                pattern = bindparam(f"keyword_{index}")
+                conditions.append(or_(Meeting.title.ilike(pattern), Meeting.description.ilike(pattern)))
+        
+        return conditions
+    
+    def _filter_params(self, meeting_filter: MeetingFilter) -> Dict[str, Any]:
+        params = {}
+        for name in ("start", "end", "status", "participant", "limit"):
+            value = getattr(meeting_filter, name)
+            if value is not None:
+                params[name] = value
+        for name in ("location", "organizer"):
+            value = getattr(meeting_filter, name)
+            if value is not None:
+                params[name] = f"%{value}%"
+        if meeting_filter.keywords:
+            match = self._fts_match(" ".join(meeting_filter.keywords))
+            if match:
+                params["match"] = match
+            else:
+                for index, keyword in enumerate(meeting_filter.keywords):
+                    params[f"keyword_{index}"] = f"%{keyword}%"
+        return params
+    
+    def get_meeting_stats(self, meeting_filter: MeetingFilter, group_by: Optional[str] = "day",
+                          rank_by: str = "meetings", top: Optional[int] = None) -> Dict[str, Any]:
+        """Count meetings and hours per group with GROUP BY and window functions.
+        
+        group_by is one of STATS_GROUPS, or None for totals only. Groups are
+        ranked by meetings or hours. Recurring series in a range with a start
+        are expanded and folded in, since RRULE occurrences do not exist as rows.
+        """
+        if group_by is not None and group_by not in STATS_GROUPS:
+            return {"success": False, "error": f"Unsupported group_by. Allowed: {', '.join(STATS_GROUPS)}"}
+        
+        try:
+            meeting_filter = self._local_filter(meeting_filter)
+            use_fts = self._fts_match(" ".join(meeting_filter.keywords)) is not None
+            params = self._filter_params(meeting_filter)
+            expand = meeting_filter.start is not None
+            
+            meetings = func.count(Meeting.id)
+            minutes = func.coalesce(func.sum(Meeting.duration_minutes), 0)
+            rank_value = minutes if rank_by == "hours" else meetings
+            columns = [
+                meetings.label("meetings"),
+                minutes.label("minutes"),
+                func.rank().over(order_by=rank_value.desc()).label("rank")
+            ]
+            key = self._group_key(group_by) if group_by else None
+            if key is not None:
+                columns.insert(0, key.label("key"))
+            
+            statement = select(*columns).where(
+                *self._filter_conditions(meeting_filter, use_fts, series="exclude")
+            )
+            if key is not None:
+                statement = statement.group_by(key)
+            groups = {
+                self._normalize_group_key(group_by, row.key) if key is not None else None:
+                    [row.meetings, row.minutes, row.rank]
+                for row in self.session.execute(statement, params)
+                if row.meetings
+            }
+            
+            # Fold in recurring occurrences, then re-rank in Python if any were added
+            if expand:
+                series = self._to_rows(self.session.execute(
+                    select(*MEETING_ROW_COLUMNS).where(
+                        *self._filter_conditions(meeting_filter, use_fts, series="only")
+                    ),
+                    params
+                ))
+                occurrences = self._expand_series(series, meeting_filter.start, self._series_end(meeting_filter))
+                for occurrence in occurrences:
+                    group_key = self._row_group_key(group_by, occurrence) if group_by else None
+                    group = groups.setdefault(group_key, [0, 0, None])
+                    group[0] += 1
+                    group[1] += occurrence.duration_minutes or 0
+                if occurrences:
+                    index = 1 if rank_by == "hours" else 0
+                    ordered = sorted(groups.values(), key=lambda group: -group[index])
+                    for position, group in enumerate(ordered):
+                        tied = position and ordered[position - 1][index] == group[index]
+                        group[2] = ordered[position - 1][2] if tied else position + 1
+            
+            return self._format_stats(groups, group_by, rank_by, top)
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error getting meeting stats: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def _group_key(self, group_by: str):
+        """SQL expression for a stats group, per dialect"""
+        column = Meeting.scheduled_time
+        if group_by in ("organizer", "location", "status"):
+            return getattr(Meeting, group_by)
+        if db_manager.is_sqlite:
+            return {
+                "day": func.date(column),
+                "week": func.date(column, "weekday 0", "-6 days"),
+                "month": func.strftime("%Y-%m", column),
+                "weekday": func.strftime("%w", column),
+                "hour": func.strftime("%H", column),
+            }[group_by]
+        return {
+            "day": cast(column, Date),
+            "week": cast(func.date_trunc("week", column), Date),
+            "month": func.to_char(column, "YYYY-MM"),
+            "weekday": extract("dow", column),
+            "hour": extract("hour", column),
+        }[group_by]
+    
+    @staticmethod
+    def _normalize_group_key(group_by: str, value):
+        """Make SQL group keys look the same on every dialect"""
+        if value is None:
+            return None
+        if group_by == "weekday":
+            # SQL counts from Sunday = 0
+            return WEEKDAYS[(int(value) + 6) % 7]
+        if group_by == "hour":
+            return int(value)
+        return str(value)
+    
+    @staticmethod
+    def _row_group_key(group_by: str, row: MeetingRow):
+        """Python equivalent of _group_key for expanded occurrences"""
+        when = row.scheduled_time
+        if group_by in ("organizer", "location", "status"):
+            return getattr(row, group_by)
+        return {
+            "day": lambda: when.date().isoformat(),
+            "week": lambda: (when.date() - timedelta(days=when.weekday())).isoformat(),
+            "month": lambda: when.strftime("%Y-%m"),
+            "weekday": lambda: WEEKDAYS[when.weekday()],
+            "hour": lambda: when.hour,
+        }[group_by]()
+    
+    @staticmethod
+    def _format_stats(groups: Dict[Any, list], group_by: Optional[str], rank_by: str,
+                      top: Optional[int]) -> Dict[str, Any]:
+        total_meetings = sum(group[0] for group in groups.values())
+        total_minutes = sum(group[1] for group in groups.values())
+        
+        summary = [
+            {
+                "key": key,
+                "meetings": meetings,
+                "hours": round(minutes / 60, 2),
+                "avg_minutes": round(minutes / meetings, 1) if meetings else 0,
+                "rank": rank,
+                "share": round(meetings / total_meetings, 4) if total_meetings else 0
+            }
+            for key, (meetings, minutes, rank) in groups.items()
+        ]
+        if group_by in TIME_STATS_GROUPS and not top:
+            # None keys can't be compared with dates
+            summary.sort(key=lambda group: (group["key"] is None, group["key"] or 0))
+        else:
+            summary.sort(key=lambda group: (group["rank"], str(group["key"])))
+        if top:
+            summary = summary[:top]
+        
+        result = {
+            "success": True,
+            "group_by": group_by,
+            "rank_by": rank_by,
+            "total_meetings": total_meetings,
+            "total_hours": round(total_minutes / 60, 2),
+        }
+        if group_by:
+            result["groups"] = summary
+            result["busiest"] = [group for group in summary if group["rank"] == 1]
+        return result
+    
     def create_meeting(self, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new meeting"""
         try:
@@ -96,10 +581,17 @@ class DatabaseTool:
                 meeting_data['scheduled_time'] = datetime.fromisoformat(
                     meeting_data['scheduled_time'].replace('Z', '+00:00')
                 )
+            if isinstance(meeting_data.get('scheduled_time'), datetime):
+                meeting_data['scheduled_time'] = to_local_naive(meeting_data['scheduled_time'])
             
+            participants = meeting_data.pop('participants', None)
+            recurrence_rule = meeting_data.pop('recurrence_rule', None)
             meeting = Meeting(**meeting_data)
+            meeting.set_participants(participants)
+            meeting.set_recurrence(recurrence_rule)
             self.session.add(meeting)
             self.session.commit()
+            self._invalidate_agendas(meeting.scheduled_time, meeting.recurrence_rule)
             
             logger.info(f"Created new meeting: {meeting.title}")
             return {"success": True, "meeting": meeting.to_dict()}
@@ -108,6 +600,273 @@ class DatabaseTool:
             logger.error(f"Error creating meeting: {e}")
             return {"success": False, "error": str(e)}
     
+    def create_meeting_if_free(self, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a meeting unless it overlaps one in the same room, organizer or participants.
+        
+        The conflict check and insert run in one write transaction locked per
+        room, organizer and participant, so concurrent requests for the same
+        slot book it once. Busy-database errors are retried with backoff.
+        """
+        return self.create_meetings_if_free([meeting_data])[0]
+    
+    def create_meetings_if_free(self, meetings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create every meeting that overlaps nothing in the database or earlier in the batch.
+        
+        One write transaction locked on every room, organizer and participant
+        in the batch. Overlapping batch meetings are grouped into windows and
+        one query per window loads the meetings of that window's scopes, so a
+        batch spread over months does not load everything in between. All
+        conflicts are resolved in memory. Returns one outcome per meeting, in order.
+        """
+        prepared = [self._prepare_scheduled(meeting_data) for meeting_data in meetings]
+        valid = [item for item in prepared if "error" not in item]
+        if not valid:
+            return [{"success": False, "error": item["error"]} for item in prepared]
+        lock_keys = {key for item in valid for key in item["keys"]}
+        
+        # Always make one attempt, whatever the retry setting
+        attempts = max(1, settings.SCHEDULE_LOCK_RETRIES)
+        for attempt in range(attempts):
+            session = db_manager.get_session()
+            try:
+                db_manager.lock_for_write(session, lock_keys)
+                rows = []
+                for window_start, window_end, window_keys in self._batch_windows(valid):
+                    rows += self._scoped_meetings(session, window_start, window_end, window_keys)
+                busy: Dict[str, IntervalIndex] = defaultdict(IntervalIndex)
+                for row in rows:
+                    row_end = row.scheduled_time + timedelta(minutes=row.duration_minutes or 0)
+                    for key in lock_keys.intersection(
+                        self._scope_keys(row.location, row.organizer, row.participants)
+                    ):
+                        busy[key].add(row.scheduled_time, row_end, row)
+                
+                outcomes: List[Dict[str, Any]] = []
+                accepted = []
+                for position, item in enumerate(prepared):
+                    if "error" in item:
+                        outcomes.append({"success": False, "error": item["error"]})
+                        continue
+                    
+                    conflicts = {}
+                    for key in item["keys"]:
+                        for payload in busy[key].overlapping(item["start"], item["end"]):
+                            if isinstance(payload, int):
+                                conflicts[("batch", payload)] = {"batch_index": payload}
+                            else:
+                                conflicts[("meeting", payload.id, payload.scheduled_time)] = payload.as_dict()
+                    if conflicts:
+                        outcomes.append({
+                            "success": False,
+                            "error": "Time slot conflicts with an existing meeting",
+                            "conflicts": list(conflicts.values())
+                        })
+                        continue
+                    
+                    values = dict(item["values"])
+                    participants = values.pop('participants', None)
+                    meeting = Meeting(**values)
+                    meeting.set_participants(participants)
+                    accepted.append((position, meeting))
+                    for key in item["keys"]:
+                        busy[key].add(item["start"], item["end"], position)
+                    outcomes.append(None)
+                
+                session.add_all([meeting for _, meeting in accepted])
+                session.commit()
+                for position, meeting in accepted:
+                    outcomes[position] = {"success": True, "meeting": meeting.to_dict()}
+                agenda_cache.invalidate_times(meeting.scheduled_time for _, meeting in accepted)
+                
+                logger.info(f"Scheduled {len(accepted)} of {len(meetings)} meetings")
+                return outcomes
+            except OperationalError as e:
+                session.rollback()
+                if attempt + 1 >= attempts:
+                    logger.error(f"Error scheduling meetings, database busy: {e}")
+                    return [{"success": False, "error": "Database busy, please retry"} for _ in meetings]
+                sleep(SCHEDULE_RETRY_DELAY * 2 ** attempt * (1 + random.random()))
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error scheduling meetings: {e}")
+                return [{"success": False, "error": str(e)} for _ in meetings]
+            finally:
+                session.close()
+    
+    def _prepare_scheduled(self, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Interval and lock keys for a one-off meeting, or an error"""
+        values = dict(meeting_data)
+        if values.pop('recurrence_rule', None):
+            return {"error": "Recurring meetings cannot be checked for conflicts"}
+        if isinstance(values.get('scheduled_time'), str):
+            try:
+                values['scheduled_time'] = datetime.fromisoformat(values['scheduled_time'].replace('Z', '+00:00'))
+            except ValueError as e:
+                return {"error": f"Invalid scheduled_time: {e}"}
+        if not isinstance(values.get('scheduled_time'), datetime):
+            return {"error": "scheduled_time is required"}
+        
+        start = values['scheduled_time'] = to_local_naive(values['scheduled_time'])
+        end = start + timedelta(minutes=values.get('duration_minutes') or 60)
+        keys = self._scope_keys(values.get('location'), values.get('organizer'), values.get('participants'))
+        return {"values": values, "start": start, "end": end, "keys": keys}
+    
+    @staticmethod
+    def _batch_windows(items: List[Dict[str, Any]]) -> List[List[Any]]:
+        """[start, end, keys] for each run of overlapping batch meetings, in time order"""
+        windows: List[List[Any]] = []
+        for item in sorted(items, key=lambda item: item["start"]):
+            if windows and item["start"] <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], item["end"])
+                windows[-1][2].update(item["keys"])
+            else:
+                windows.append([item["start"], item["end"], set(item["keys"])])
+        return windows
+    
+    @staticmethod
+    def _scope_keys(location: Optional[str], organizer: Optional[str], participants) -> List[str]:
+        """Keys a meeting's conflicts and write locks are scoped to"""
+        keys = []
+        if location and location.strip():
+            keys.append(f"room:{location.strip().lower()}")
+        if organizer and organizer.strip() and organizer.strip().lower() != AGENT_ORGANIZER.lower():
+            keys.append(f"organizer:{organizer.strip().lower()}")
+        keys += [f"participant:{email}" for email in split_participants(participants)]
+        return keys
+    
+    def _scoped_meetings(self, session, start: datetime, end: datetime, keys) -> List[MeetingRow]:
+        """Scheduled meetings overlapping [start, end) in any room, organizer or participant of keys"""
+        scoped: Dict[str, List[str]] = defaultdict(list)
+        for key in keys:
+            kind, _, value = key.partition(":")
+            scoped[kind].append(value)
+        
+        scopes = []
+        if scoped["room"]:
+            scopes.append(func.lower(Meeting.location).in_(scoped["room"]))
+        if scoped["organizer"]:
+            scopes.append(func.lower(Meeting.organizer).in_(scoped["organizer"]))
+        if scoped["participant"]:
+            scopes.append(Meeting.id.in_(
+                select(MeetingParticipant.meeting_id).where(MeetingParticipant.email.in_(scoped["participant"]))
+            ))
+        if not scopes:
+            return []
+        
+        lookback = start - BUSY_LOOKBACK
+        rows = self._to_rows(session.execute(select(*MEETING_ROW_COLUMNS).where(
+            Meeting.status == "scheduled",
+            or_(*scopes),
+            Meeting.scheduled_time < end,
+            or_(
+                and_(Meeting.recurrence_rule.is_(None), Meeting.scheduled_time >= lookback),
+                and_(Meeting.recurrence_rule.isnot(None),
+                     or_(Meeting.recurrence_end.is_(None), Meeting.recurrence_end > lookback))
+            )
+        )))
+        series = [row for row in rows if row.recurrence_rule]
+        rows = [row for row in rows if not row.recurrence_rule]
+        rows += self._expand_series(series, lookback, end, session=session)
+        return [
+            row for row in rows
+            if row.scheduled_time < end
+            and row.scheduled_time + timedelta(minutes=row.duration_minutes or 0) > start
+        ]
+    
+    def _participant_query(self, email: str, query=None):
+        """Restrict a meeting query to one participant via the indexed join table"""
+        if query is None:
+            query = self._select_rows()
+        return query.join(
+            MeetingParticipant, MeetingParticipant.meeting_id == Meeting.id
+        ).filter(MeetingParticipant.email == email.strip().lower())
+    
+    def get_meetings_for_participant(self, email: str, start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None) -> List[MeetingRow]:
+        """Get a participant's scheduled meetings, optionally limited to a time window"""
+        try:
+            query = self._participant_query(email).filter(Meeting.status == "scheduled")
+            
+            if not (start and end):
+                # Without a bounded window recurring series are listed once, unexpanded
+                if start:
+                    query = query.filter(Meeting.scheduled_time >= start)
+                if end:
+                    query = query.filter(Meeting.scheduled_time < end)
+                return self._to_rows(query.order_by(Meeting.scheduled_time).all())
+            
+            meetings = query.filter(
+                Meeting.scheduled_time >= start,
+                Meeting.scheduled_time < end,
+                Meeting.recurrence_rule.is_(None)
+            ).all()
+            rows = self._to_rows(meetings) + self._expand_recurring(
+                start, end, self._participant_query(email)
+            )
+            rows.sort(key=lambda row: row.scheduled_time)
+            return rows
+        except Exception as e:
+            logger.error(f"Error getting meetings for participant: {e}")
+            return []
+    
+    def get_busy_times(self, email: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Get the intervals a participant is busy between start and end"""
+        try:
+            meetings = self.get_meetings_for_participant(email, start - BUSY_LOOKBACK, end)
+            
+            busy = []
+            for meeting in meetings:
+                busy_end = meeting.scheduled_time + timedelta(minutes=meeting.duration_minutes or 0)
+                if busy_end > start:
+                    busy.append({
+                        "meeting_id": meeting.id,
+                        "title": meeting.title,
+                        "start": meeting.scheduled_time,
+                        "end": busy_end
+                    })
+            return busy
+        except Exception as e:
+            logger.error(f"Error getting busy times: {e}")
+            return []
+    
+    def get_busy_intervals(self, emails: Optional[List[str]], start: datetime,
+                           end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Busy (start, end) intervals overlapping [start, end) for any of emails.
+        
+        One query covers every participant (emails=None means every scheduled
+        meeting); recurring series are expanded. Intervals are not merged.
+        Database errors propagate: an empty result would mean everyone is free.
+        """
+        lookback = start - BUSY_LOOKBACK
+        conditions = [
+            Meeting.status == "scheduled",
+            or_(
+                and_(Meeting.recurrence_rule.is_(None),
+                     Meeting.scheduled_time >= lookback,
+                     Meeting.scheduled_time < end),
+                and_(Meeting.recurrence_rule.isnot(None),
+                     Meeting.scheduled_time < end,
+                     or_(Meeting.recurrence_end.is_(None), Meeting.recurrence_end > lookback))
+            )
+        ]
+        if emails is not None:
+            normalized = sorted({email.strip().lower() for email in emails if email.strip()})
+            conditions.append(Meeting.id.in_(
+                select(MeetingParticipant.meeting_id).where(MeetingParticipant.email.in_(normalized))
+            ))
+        
+        rows = self._to_rows(self.session.execute(select(*MEETING_ROW_COLUMNS).where(*conditions)))
+        series = [row for row in rows if row.recurrence_rule]
+        rows = [row for row in rows if not row.recurrence_rule]
+        rows += self._expand_series(series, lookback, end)
+        
+        intervals = []
+        for row in rows:
+            busy_end = row.scheduled_time + timedelta(minutes=row.duration_minutes or 0)
+            if busy_end > start:
+                intervals.append((row.scheduled_time, busy_end))
+        return intervals
+    
     def check_meeting_exists(self, time: datetime, title: str = None) -> bool:
         """Check if a meeting exists at a specific time"""
         try:
@@ -118,18 +877,82 @@ class DatabaseTool:
                 and_(
                     Meeting.scheduled_time >= time_window_start,
                     Meeting.scheduled_time <= time_window_end,
-                    Meeting.status == "scheduled"
+                    Meeting.status == "scheduled",
+                    Meeting.recurrence_rule.is_(None)
                 )
             )
             
             if title:
                 query = query.filter(Meeting.title.ilike(f"%{title}%"))
             
-            return query.count() > 0
+            if query.count() > 0:
+                return True
+            
+            series_query = self._select_rows()
+            if title:
+                series_query = series_query.filter(Meeting.title.ilike(f"%{title}%"))
+            # The SQL window is inclusive at both ends
+            occurrences = self._expand_recurring(
+                time_window_start, time_window_end + timedelta(microseconds=1), series_query
+            )
+            return len(occurrences) > 0
         except Exception as e:
             logger.error(f"Error checking meeting existence: {e}")
             return False
     
+    def cancel_occurrence(self, meeting_id: int, occurrence_start: datetime) -> Dict[str, Any]:
+        """Cancel a single occurrence of a recurring meeting"""
+        return self._save_occurrence_exception(meeting_id, occurrence_start, {"status": "cancelled"})
+    
+    def modify_occurrence(self, meeting_id: int, occurrence_start: datetime,
+                          changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Move or retitle a single occurrence of a recurring meeting"""
+        allowed = {"scheduled_time", "title", "duration_minutes", "location"}
+        unknown = set(changes) - allowed
+        if unknown:
+            return {"success": False, "error": f"Cannot change: {', '.join(sorted(unknown))}"}
+        return self._save_occurrence_exception(
+            meeting_id, occurrence_start, dict(changes, status="modified")
+        )
+    
+    def _save_occurrence_exception(self, meeting_id: int, occurrence_start: datetime,
+                                   values: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            occurrence_start = to_local_naive(occurrence_start)
+            if isinstance(values.get("scheduled_time"), datetime):
+                values = dict(values, scheduled_time=to_local_naive(values["scheduled_time"]))
+            meeting = self.session.query(Meeting).filter(Meeting.id == meeting_id).first()
+            if not meeting or not meeting.recurrence_rule:
+                return {"success": False, "error": f"Recurring meeting {meeting_id} not found"}
+            
+            recurrence = parse_recurrence(meeting.recurrence_rule, meeting.scheduled_time)
+            if occurrence_start not in recurrence:
+                return {"success": False, "error": "No occurrence of this meeting starts at that time"}
+            
+            exception = self.session.query(MeetingOccurrenceException).filter(
+                MeetingOccurrenceException.meeting_id == meeting_id,
+                MeetingOccurrenceException.original_start == occurrence_start
+            ).first()
+            if exception is None:
+                exception = MeetingOccurrenceException(meeting_id=meeting_id, original_start=occurrence_start)
+                self.session.add(exception)
+            previous_time = exception.scheduled_time
+            for key, value in values.items():
+                setattr(exception, key, value)
+            self.session.commit()
+            agenda_cache.invalidate_times([occurrence_start, previous_time, exception.scheduled_time])
+            
+            return {
+                "success": True,
+                "meeting_id": meeting_id,
+                "occurrence_start": occurrence_start.isoformat(),
+                "status": exception.status
+            }
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error saving occurrence exception: {e}")
+            return {"success": False, "error": str(e)}
+    
     def update_meeting_weather(self, meeting_id: int, weather_condition: str) -> bool:
         """Update meeting with weather information"""
         try:
@@ -138,9 +961,105 @@ class DatabaseTool:
                 meeting.weather_checked = True
                 meeting.weather_condition = weather_condition
                 self.session.commit()
+                self._invalidate_agendas(meeting.scheduled_time, meeting.recurrence_rule)
                 return True
             return False
         except Exception as e:
             self.session.rollback()
             logger.error(f"Error updating meeting weather: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def get_unannotated_meetings(self, start: datetime, end: datetime) -> List[MeetingRow]:
+        """Scheduled one-off meetings in [start, end) that have no weather annotation yet"""
+        try:
+            meetings = self._select_rows().filter(
+                Meeting.scheduled_time >= start,
+                Meeting.scheduled_time < end,
+                Meeting.status == "scheduled",
+                Meeting.recurrence_rule.is_(None),
+                or_(Meeting.weather_checked.is_(False), Meeting.weather_checked.is_(None))
+            ).order_by(Meeting.scheduled_time).all()
+            return self._to_rows(meetings)
+        except Exception as e:
+            logger.error(f"Error getting unannotated meetings: {e}")
+            return []
+    
+    def bulk_update_weather(self, annotations: List[Dict[str, Any]]) -> int:
+        """Write many weather annotations in one executemany UPDATE.
+        
+        Each annotation needs id, weather_condition and scheduled_time (used
+        to invalidate cached agendas).
+        """
+        if not annotations:
+            return 0
+        
+        session = db_manager.get_session()
+        try:
+            session.execute(update(Meeting), [
+                {
+                    "id": annotation["id"],
+                    "weather_checked": True,
+                    "weather_condition": annotation["weather_condition"][:50]
+                }
+                for annotation in annotations
+            ])
+            session.commit()
+            agenda_cache.invalidate_times(annotation["scheduled_time"] for annotation in annotations)
+            return len(annotations)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk updating meeting weather: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def bulk_insert_meetings(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Insert validated meeting rows in one transaction using executemany"""
+        if not rows:
+            return {"success": True, "inserted": 0}
+        
+        session = db_manager.get_session()
+        try:
+            ids = session.scalars(
+                insert(Meeting).returning(Meeting.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            
+            participant_rows = [
+                {"meeting_id": meeting_id, "email": email}
+                for meeting_id, row in zip(ids, rows)
+                for email in split_participants(row.get('participants'))
+            ]
+            if participant_rows:
+                session.execute(insert(MeetingParticipant), participant_rows)
+            
+            session.commit()
+            if any(row.get('recurrence_rule') for row in rows):
+                agenda_cache.clear()
+            else:
+                agenda_cache.invalidate_times(row['scheduled_time'] for row in rows)
+            return {"success": True, "inserted": len(ids)}
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk inserting meetings: {e}")
+            return {"success": False, "error": str(e)}
+        finally:
+            session.close()
+    
+    def iter_meetings(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      batch_size: int = 1000) -> Iterator[MeetingRow]:
+        """Stream meetings from a server-side cursor, batch_size rows at a time"""
+        session = db_manager.get_session()
+        try:
+            statement = select(*MEETING_ROW_COLUMNS).order_by(Meeting.id)
+            if start:
+                statement = statement.where(Meeting.scheduled_time >= to_local_naive(start))
+            if end:
+                statement = statement.where(Meeting.scheduled_time < to_local_naive(end))
+            
+            result = session.execute(statement.execution_options(yield_per=batch_size))
+            for partition in result.partitions():
+                for row in partition:
+                    yield MeetingRow(*row)
+        finally:
+            session.close()
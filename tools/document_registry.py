@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class DocumentEntry:
+    """One uploaded document: its chunks, its index and their estimated memory"""
+    
+    __slots__ = ("document_id", "owner", "filename", "chunks", "vector_store", "summary",
+                 "characters", "nbytes", "created_at")
+    
+    def __init__(self, owner: str, filename: str, chunks: List[Any], vector_store: Any,
+                 summary: str = "", characters: int = 0, document_id: Optional[str] = None,
+                 created_at: Optional[datetime] = None):
+        self.document_id = document_id or uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.filename = filename
+        self.chunks = chunks
+        self.vector_store = vector_store
+        self.summary = summary
+        self.characters = characters
+        self.nbytes = estimate_nbytes(chunks, vector_store)
+        self.created_at = created_at or datetime.now()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "document_id": self.document_id,
+            "filename": self.filename,
+            "chunks": len(self.chunks),
+            "characters": self.characters,
+            "memory_bytes": self.nbytes,
+            "created_at": self.created_at.isoformat()
+        }
+
+def estimate_nbytes(chunks: List[Any], vector_store: Any) -> int:
+    """Approximate resident size: chunk text plus float32 vectors in a FAISS index"""
+    if hasattr(chunks, "nbytes"):
+        text_bytes = chunks.nbytes  # memory-mapped chunk store
+    else:
+        text_bytes = sum(len(getattr(chunk, "page_content", chunk)) for chunk in chunks)
+    index = getattr(vector_store, "index", None)
+    vector_bytes = index.ntotal * index.d * 4 if hasattr(index, "ntotal") else 0
+    extra = getattr(vector_store, "nbytes", 0)  # lexical indexes report their own arrays
+    return text_bytes + vector_bytes + extra
+
+class DocumentRegistry:
+    """Documents per owner (a user or session id), several per owner.
+    
+    Entries are kept in least-recently-used order across all owners. When
+    the total estimated size exceeds budget_bytes, the least recently used
+    documents are evicted until it fits again; the document just added is
+    never evicted, so one oversized upload still works.
+    """
+    
+    def __init__(self, budget_bytes: int = 512 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._entries: "OrderedDict[Tuple[str, str], DocumentEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.evictions = 0
+    
+    def add(self, entry: DocumentEntry) -> List[DocumentEntry]:
+        """Register entry and return the documents evicted to make room"""
+        key = (entry.owner, entry.document_id)
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self.total_bytes -= previous.nbytes
+            self._entries[key] = entry
+            self.total_bytes += entry.nbytes
+            
+            while self.total_bytes > self.budget_bytes and len(self._entries) > 1:
+                _, oldest = self._entries.popitem(last=False)
+                self.total_bytes -= oldest.nbytes
+                self.evictions += 1
+                evicted.append(oldest)
+        
+        for oldest in evicted:
+            logger.info(f"Evicted document {oldest.filename} ({oldest.nbytes} bytes) of {oldest.owner}")
+        return evicted
+    
+    def get(self, owner: str, document_id: str) -> Optional[DocumentEntry]:
+        with self._lock:
+            entry = self._entries.get((owner, document_id))
+            if entry:
+                self._entries.move_to_end((owner, document_id))
+            return entry
+    
+    def documents(self, owner: str, document_ids: Optional[List[str]] = None) -> List[DocumentEntry]:
+        """An owner's documents, oldest upload first, marked as recently used"""
+        with self._lock:
+            entries = [
+                entry for (entry_owner, document_id), entry in self._entries.items()
+                if entry_owner == owner and (document_ids is None or document_id in document_ids)
+            ]
+            for entry in entries:
+                self._entries.move_to_end((owner, entry.document_id))
+        return sorted(entries, key=lambda entry: entry.created_at)
+    
+    def has_documents(self, owner: Optional[str] = None) -> bool:
+        with self._lock:
+            return any(owner is None or entry_owner == owner for entry_owner, _ in self._entries)
+    
+    def remove(self, owner: str, document_id: Optional[str] = None) -> int:
+        """Drop one document, or all of an owner's documents; returns how many"""
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if key[0] == owner and (document_id is None or key[1] == document_id)
+            ]
+            for key in keys:
+                self.total_bytes -= self._entries.pop(key).nbytes
+            return len(keys)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._entries),
+                "owners": len({owner for owner, _ in self._entries}),
+                "memory_bytes": self.total_bytes,
+                "budget_bytes": self.budget_bytes,
+                "evictions": self.evictions
+            }
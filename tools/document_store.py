@@ -0,0 +1,204 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import logging
+import shutil
+import threading
+
+import faiss
+import numpy as np
+import orjson
+from langchain_core.documents import Document as LangchainDocument
+
+from tools.lexical_index import BM25Index
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+CHUNKS_FILE = "chunks.bin"
+OFFSETS_FILE = "offsets.npy"
+INDEX_FILE = "index.faiss"
+
+class ChunkStore:
+    """Read-only chunk texts backed by a memory-mapped file.
+    
+    Chunks are stored as one UTF-8 blob plus an offsets array, so opening a
+    document maps the files without reading them; a chunk is decoded only
+    when it is used. search() makes it usable as a FAISS docstore.
+    """
+    
+    def __init__(self, directory: Path, source: str):
+        self.source = source
+        self.offsets = np.load(directory / OFFSETS_FILE, mmap_mode="r")
+        chunks_path = directory / CHUNKS_FILE
+        # np.memmap cannot map an empty file
+        self.data = (np.memmap(chunks_path, dtype=np.uint8, mode="r")
+                     if chunks_path.stat().st_size else np.zeros(0, dtype=np.uint8))
+        self.nbytes = int(self.data.size + self.offsets.size * self.offsets.itemsize)
+    
+    @staticmethod
+    def write(directory: Path, chunks: Sequence[Any]):
+        offsets = [0]
+        with open(directory / CHUNKS_FILE, "wb") as f:
+            for chunk in chunks:
+                data = getattr(chunk, "page_content", chunk).encode("utf-8")
+                f.write(data)
+                offsets.append(offsets[-1] + len(data))
+        np.save(directory / OFFSETS_FILE, np.array(offsets, dtype=np.int64))
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, position: int) -> LangchainDocument:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        text = self.data[self.offsets[position]:self.offsets[position + 1]].tobytes().decode("utf-8")
+        return LangchainDocument(page_content=text, metadata={"source": self.source})
+    
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+    
+    def search(self, search: Any) -> LangchainDocument:
+        """Docstore lookup; FAISS maps index rows to chunk positions"""
+        return self[int(search)]
+
+class DocumentStore:
+    """Documents persisted under root, one directory per document.
+    
+    Each directory holds meta.json, the chunk store and either the FAISS
+    index (when embeddings were used) or the BM25 index. scan() reads only the metadata files, so
+    startup is fast; indexes are memory-mapped when a document is opened.
+    """
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._catalog: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+    
+    def _directory(self, owner: str, document_id: str) -> Path:
+        # Owners are user or session ids; hash them into safe directory names
+        owner_dir = hashlib.sha1(owner.encode("utf-8")).hexdigest()[:16]
+        return self.root / owner_dir / document_id
+    
+    def scan(self) -> int:
+        """Warm start: load the catalog of persisted documents; returns how many"""
+        catalog: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for meta_path in self.root.glob(f"*/*/{META_FILE}"):
+            try:
+                meta = orjson.loads(meta_path.read_bytes())
+                catalog.setdefault(meta["owner"], {})[meta["document_id"]] = meta
+            except Exception as e:
+                logger.error(f"Skipping unreadable document metadata {meta_path}: {e}")
+        with self._lock:
+            self._catalog = catalog
+        count = sum(len(documents) for documents in catalog.values())
+        logger.info(f"Found {count} persisted documents in {self.root}")
+        return count
+    
+    def save(self, entry: Any, file_hash: Optional[str] = None) -> bool:
+        """Write entry's chunks, index and metadata; the metadata goes last, marking it complete"""
+        directory = self._directory(entry.owner, entry.document_id)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            ChunkStore.write(directory, entry.chunks)
+            index = getattr(entry.vector_store, "index", None)
+            if index is not None:
+                faiss.write_index(index, str(directory / INDEX_FILE))
+            lexical = getattr(entry.vector_store, "lexical", None)
+            if lexical is not None:
+                lexical.save(directory)
+            
+            meta = {
+                "document_id": entry.document_id,
+                "owner": entry.owner,
+                "filename": entry.filename,
+                "summary": entry.summary,
+                "characters": entry.characters,
+                "created_at": entry.created_at.isoformat(),
+                "indexed": index is not None,
+                "file_hash": file_hash
+            }
+            (directory / META_FILE).write_bytes(orjson.dumps(meta))
+            with self._lock:
+                self._catalog.setdefault(entry.owner, {})[entry.document_id] = meta
+            return True
+        except Exception as e:
+            logger.error(f"Error persisting document {entry.filename}: {e}")
+            shutil.rmtree(directory, ignore_errors=True)
+            return False
+    
+    def document_ids(self, owner: str) -> List[str]:
+        with self._lock:
+            return list(self._catalog.get(owner, {}))
+    
+    def has_documents(self, owner: Optional[str] = None) -> bool:
+        with self._lock:
+            if owner is None:
+                return any(self._catalog.values())
+            return bool(self._catalog.get(owner))
+    
+    def metadata(self, owner: str, document_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._catalog.get(owner, {}).get(document_id)
+    
+    def find(self, file_hash: str, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Metadata of a persisted document with this file hash, preferring owner's own copy"""
+        with self._lock:
+            matches = [
+                meta for documents in self._catalog.values() for meta in documents.values()
+                if meta.get("file_hash") == file_hash
+            ]
+        matches.sort(key=lambda meta: meta["owner"] != owner)
+        return matches[0] if matches else None
+    
+    def copy(self, meta: Dict[str, Any], owner: str, document_id: str, filename: str) -> Optional[Dict[str, Any]]:
+        """Reuse another upload's chunks and index for owner without re-embedding"""
+        source = self._directory(meta["owner"], meta["document_id"])
+        directory = self._directory(owner, document_id)
+        try:
+            shutil.copytree(source, directory, ignore=shutil.ignore_patterns(META_FILE))
+            copied = dict(meta, owner=owner, document_id=document_id, filename=filename,
+                          created_at=datetime.now().isoformat())
+            (directory / META_FILE).write_bytes(orjson.dumps(copied))
+            with self._lock:
+                self._catalog.setdefault(owner, {})[document_id] = copied
+            return copied
+        except Exception as e:
+            logger.error(f"Error copying document {meta['document_id']}: {e}")
+            shutil.rmtree(directory, ignore_errors=True)
+            return None
+    
+    def open(self, owner: str, document_id: str):
+        """Memory-map a persisted document; returns (meta, chunks, FAISS index, BM25 index), absent indexes as None"""
+        meta = self.metadata(owner, document_id)
+        if meta is None:
+            return None
+        directory = self._directory(owner, document_id)
+        chunks = ChunkStore(directory, meta["filename"])
+        index = None
+        if meta["indexed"]:
+            index_path = str(directory / INDEX_FILE)
+            try:
+                index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Older faiss builds cannot map every index type; read it instead
+                index = faiss.read_index(index_path)
+        lexical = BM25Index.load(directory) if BM25Index.exists(directory) else None
+        return meta, chunks, index, lexical
+    
+    def delete(self, owner: str, document_id: Optional[str] = None) -> int:
+        """Delete one persisted document, or all of owner's; returns how many"""
+        with self._lock:
+            documents = self._catalog.get(owner, {})
+            document_ids = [document_id] if document_id else list(documents)
+            removed = [doc_id for doc_id in document_ids if documents.pop(doc_id, None) is not None]
+            if not documents:
+                self._catalog.pop(owner, None)
+        for doc_id in removed:
+            shutil.rmtree(self._directory(owner, doc_id), ignore_errors=True)
+        return len(removed)
@@ -1,7 +1,9 @@
 import os
 import tempfile
-from typing import Dict, List, Any, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import heapq
 import logging
+from itertools import islice
 from pathlib import Path
 
 # Document processing libraries
@@ -10,11 +12,13 @@ import docx
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain_classic.chains import RetrievalQA
 from langchain_classic.llms import OpenAI
 from langchain_core.documents import Document as LangchainDocument
 import numpy as np
 
+from tools.embedding_cache import EmbeddingCache, CachedEmbeddings
+from tools.lexical_index import BM25Index
+
 # Web search fallback
 from googlesearch import search as google_search
 import requests
@@ -22,94 +26,168 @@ from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+# The prompt RetrievalQA's "stuff" chain uses, applied to chunks merged across documents
+QA_PROMPT = (
+    "Use the following pieces of context to answer the question at the end. "
+    "If you don't know the answer, just say that you don't know, don't try to make up an answer.\n\n"
+    "{context}\n\nQuestion: {question}\nHelpful Answer:"
+)
+
+# Chunking; streamed text is split once this much of it is buffered
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+STREAM_WINDOW_CHARS = 16 * CHUNK_SIZE
+# TXT and DOCX have no pages; stream them in blocks of about this size
+PAGE_BLOCK_CHARS = 4000
+# Chunks embedded and added to the index per API call
+EMBED_BATCH_SIZE = 64
+PROGRESS_LOG_CHUNKS = 1000
+
+def _blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Group lines into blocks of about PAGE_BLOCK_CHARS"""
+    block, size = [], 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= PAGE_BLOCK_CHARS:
+            yield "".join(block)
+            block, size = [], 0
+    if block:
+        yield "".join(block)
+
 class DocumentTool:
     """Tool for document processing and web search"""
     
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(self, openai_api_key: Optional[str] = None, embedding_cache_path: Optional[str] = None):
         self.openai_api_key = openai_api_key
-        self.vector_store = None
-        self.documents = []
+        self.embedding_cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+        self.embeddings = None
+        if openai_api_key:
+            self.embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key)
+            if self.embedding_cache:
+                # Only chunks never embedded before are sent to the API
+                self.embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache)
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
             length_function=len,
         )
         
-    def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file"""
+    def iter_pages(self, file_path: str, file_extension: str) -> Iterator[str]:
+        """Stream a file's text a page at a time; TXT and DOCX come in page-sized blocks"""
+        if file_extension.lower() == '.pdf':
+            return self._pdf_pages(file_path)
+        elif file_extension.lower() == '.txt':
+            return self._txt_pages(file_path)
+        elif file_extension.lower() == '.docx':
+            return self._docx_pages(file_path)
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
+    def _pdf_pages(self, file_path: str) -> Iterator[str]:
         try:
-            text = ""
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
-            return text
+                for page in pdf_reader.pages:
+                    yield page.extract_text() or ""
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             raise
     
-    def extract_text_from_txt(self, file_path: str) -> str:
-        """Extract text from text file"""
+    def _txt_pages(self, file_path: str) -> Iterator[str]:
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+                yield from _blocks(file)
         except Exception as e:
             logger.error(f"Error extracting text from TXT: {e}")
             raise
     
-    def extract_text_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file"""
+    def _docx_pages(self, file_path: str) -> Iterator[str]:
         try:
             doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            yield from _blocks(paragraph.text + "\n" for paragraph in doc.paragraphs)
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {e}")
             raise
     
-    def process_uploaded_file(self, file_path: str, file_extension: str) -> str:
-        """Process uploaded file based on extension"""
-        if file_extension.lower() == '.pdf':
-            return self.extract_text_from_pdf(file_path)
-        elif file_extension.lower() == '.txt':
-            return self.extract_text_from_txt(file_path)
-        elif file_extension.lower() == '.docx':
-            return self.extract_text_from_docx(file_path)
-        else:
-            raise ValueError(f"Unsupported file format: {file_extension}")
+    def iter_chunks(self, pages: Iterable[str]) -> Iterator[str]:
+        """Split streamed pages into chunks, holding at most a window of text.
+        
+        Pages are appended to a buffer; once it passes STREAM_WINDOW_CHARS it
+        is split and every chunk but the last is emitted. The last is carried
+        over so chunks still run across page breaks.
+        """
+        buffer = ""
+        for page in pages:
+            buffer = f"{buffer}\n{page}" if buffer else page
+            if len(buffer) >= STREAM_WINDOW_CHARS:
+                chunks = self.text_splitter.split_text(buffer)
+                yield from chunks[:-1]
+                buffer = chunks[-1] if chunks else ""
+        if buffer:
+            yield from self.text_splitter.split_text(buffer)
     
-    def create_vector_store(self, text: str, document_name: str = "uploaded_document"):
-        """Create vector store from document text"""
-        try:
-            # Split text into chunks
-            texts = self.text_splitter.split_text(text)
-            
-            # Create documents
-            docs = [LangchainDocument(page_content=t, metadata={"source": document_name}) for t in texts]
-            self.documents = docs
-            
-            # Create embeddings and vector store
-            if self.openai_api_key:
-                embeddings = OpenAIEmbeddings(openai_api_key=self.openai_api_key)
-                self.vector_store = FAISS.from_documents(docs, embeddings)
-            else:
-                # Fallback: simple similarity search without embeddings
-                logger.warning("OpenAI API key not provided, using simple text search")
-                self.vector_store = SimpleVectorStore(docs)
+    def index_chunks(self, chunks: Iterable[str], document_name: str = "uploaded_document",
+                     progress: Optional[Callable[[int], None]] = None) -> Tuple[List[LangchainDocument], Any]:
+        """Index a stream of chunks; returns (chunks, vector store).
+        
+        Chunks are embedded and appended to the FAISS index a batch at a
+        time, so no full copy of the document text is ever built. progress
+        is called with the number of chunks indexed after every batch.
+        """
+        docs: List[LangchainDocument] = []
+        vector_store = None
+        next_log = PROGRESS_LOG_CHUNKS
+        
+        chunks = iter(chunks)
+        while True:
+            batch = [LangchainDocument(page_content=t, metadata={"source": document_name})
+                     for t in islice(chunks, EMBED_BATCH_SIZE)]
+            if not batch:
+                break
+            docs.extend(batch)
+            if self.embeddings:
+                if vector_store is None:
+                    vector_store = FAISS.from_documents(batch, self.embeddings)
+                else:
+                    vector_store.add_documents(batch)
             
-            logger.info(f"Created vector store with {len(docs)} chunks")
-            return True
-        except Exception as e:
-            logger.error(f"Error creating vector store: {e}")
-            return False
+            if progress:
+                progress(len(docs))
+            if len(docs) >= next_log:
+                logger.info(f"Indexing {document_name}: {len(docs)} chunks")
+                next_log += PROGRESS_LOG_CHUNKS
+        
+        if vector_store is None:
+            if self.embeddings:
+                raise ValueError(f"No text found in {document_name}")
+            # Fallback: keyword search without embeddings
+            logger.warning("OpenAI API key not provided, using BM25 text search")
+            vector_store = SimpleVectorStore(docs, BM25Index.build(doc.page_content for doc in docs))
+        
+        logger.info(f"Created vector store with {len(docs)} chunks")
+        return docs, vector_store
     
-    def query_document(self, question: str, top_k: int = 3) -> Dict[str, Any]:
-        """Query the document with a question"""
+    def open_index(self, chunks: Any, index: Any = None, lexical: Optional[BM25Index] = None) -> Any:
+        """Vector store over persisted chunks and, if the document was embedded, its FAISS index"""
+        if index is None:
+            return SimpleVectorStore(chunks, lexical or BM25Index.build(chunk.page_content for chunk in chunks))
+        # Index rows are chunk positions, and the chunk store doubles as the docstore
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=chunks,
+            index_to_docstore_id={position: position for position in range(index.ntotal)}
+        )
+    
+    def query_documents(self, entries: List[Any], question: str, top_k: int = 3) -> Dict[str, Any]:
+        """Answer a question from several indexed documents.
+        
+        Each document yields its own best chunks, sorted by score; the lists
+        are heap-merged so only the global top_k chunks are kept.
+        """
         try:
-            if not self.vector_store or not self.documents:
+            if not entries:
                 return {
                     "success": False,
                     "error": "No document loaded",
@@ -117,20 +195,21 @@ class DocumentTool:
                     "source": None
                 }
             
+            # Embed the question once for every document's index
+            query_vector = self.embeddings.embed_query(question) if self.embeddings else None
+            ranked = [self.search(entry.chunks, entry.vector_store, question, top_k, query_vector)
+                      for entry in entries]
+            top_results = list(islice(heapq.merge(*ranked, key=lambda result: -result[0]), top_k))
+            
             if self.openai_api_key:
                 # Use OpenAI for better answers
                 llm = OpenAI(openai_api_key=self.openai_api_key, temperature=0)
-                qa_chain = RetrievalQA.from_chain_type(
-                    llm=llm,
-                    chain_type="stuff",
-                    retriever=self.vector_store.as_retriever(search_kwargs={"k": top_k})
-                )
-                result = qa_chain({"query": question})
-                answer = result["result"]
+                context = "\n\n".join(doc.page_content for _, doc in top_results)
+                answer = llm.invoke(QA_PROMPT.format(context=context, question=question))
                 source = "AI-enhanced document search"
             else:
                 # Simple similarity search
-                answer, source = self._simple_similarity_search(question, top_k)
+                answer, source = self._format_simple_answer(top_results)
             
             # Check if answer is confident
             confidence = self._calculate_confidence(answer, question)
@@ -139,6 +218,7 @@ class DocumentTool:
                 "success": True,
                 "answer": answer,
                 "source": source,
+                "documents": sorted({doc.metadata["source"] for _, doc in top_results}),
                 "confidence": confidence,
                 "from_document": confidence > 0.3  # Threshold for document relevance
             }
@@ -152,13 +232,26 @@ class DocumentTool:
                 "from_document": False
             }
     
-    def _simple_similarity_search(self, question: str, top_k: int = 3) -> tuple:
-        """Simple similarity search without embeddings"""
+    def search(self, chunks: List[LangchainDocument], vector_store: Any, question: str, top_k: int = 3,
+               query_vector: Optional[List[float]] = None) -> List[Tuple[float, LangchainDocument]]:
+        """Best (score, chunk) pairs of one document, highest score first"""
+        if query_vector is not None and hasattr(vector_store, "similarity_search_with_score_by_vector"):
+            results = vector_store.similarity_search_with_score_by_vector(query_vector, k=top_k)
+            # FAISS returns L2 distances; map them to a comparable higher-is-better score
+            return [(1.0 / (1.0 + float(distance)), doc) for doc, distance in results]
+        lexical = getattr(vector_store, "lexical", None)
+        if lexical is not None:
+            return [(score, chunks[position]) for score, position in lexical.top_k(question, top_k)]
+        return self._simple_similarity_search(chunks, question, top_k)
+    
+    def _simple_similarity_search(self, chunks: List[LangchainDocument], question: str,
+                                  top_k: int = 3) -> List[Tuple[float, LangchainDocument]]:
+        """Word-overlap search, for embedded documents queried without an API key"""
         question_lower = question.lower()
         question_words = set(question_lower.split())
         
         scores = []
-        for doc in self.documents:
+        for doc in chunks:
             content_lower = doc.page_content.lower()
             content_words = set(content_lower.split())
             
@@ -167,16 +260,18 @@ class DocumentTool:
             total_unique = len(question_words.union(content_words))
             score = overlap / total_unique if total_unique > 0 else 0
             
-            scores.append((score, doc.page_content, doc.metadata["source"]))
+            scores.append((score, doc))
         
         # Sort by score and get top results
         scores.sort(reverse=True, key=lambda x: x[0])
-        top_results = scores[:top_k]
-        
+        return scores[:top_k]
+    
+    def _format_simple_answer(self, top_results: List[Tuple[float, LangchainDocument]]) -> tuple:
+        """Combine the best chunks into an answer without an LLM"""
         if top_results and top_results[0][0] > 0:
             # Combine top results
-            combined_answer = "\n".join([f"- {content[:200]}..." for score, content, source in top_results if score > 0])
-            source = f"From document: {top_results[0][2]}"
+            combined_answer = "\n".join([f"- {doc.page_content[:200]}..." for score, doc in top_results if score > 0])
+            source = f"From document: {top_results[0][1].metadata['source']}"
             return combined_answer, source
         else:
             return "No relevant information found in the document.", "Document search"
@@ -250,18 +345,11 @@ class DocumentTool:
         ]
 
 class SimpleVectorStore:
-    """Simple in-memory vector store for fallback"""
-    def __init__(self, documents):
+    """Chunks with a BM25 index, for when there are no embeddings"""
+    def __init__(self, documents, lexical: Optional[BM25Index] = None):
         self.documents = documents
+        self.lexical = lexical or BM25Index.build(doc.page_content for doc in documents)
     
-    def as_retriever(self, search_kwargs=None):
-        return self
-    
-    def get_relevant_documents(self, query):
-        # Simple keyword matching
-        query_lower = query.lower()
-        relevant = []
-        for doc in self.documents:
-            if any(word in doc.page_content.lower() for word in query_lower.split()):
-                relevant.append(doc)
-        return relevant[:search_kwargs.get('k', 3)] if search_kwargs else relevant[:3]
\ No newline at end of file
+    @property
+    def nbytes(self) -> int:
+        return self.lexical.nbytes
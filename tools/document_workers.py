@@ -0,0 +1,141 @@
+from concurrent.futures import Executor
+from typing import Iterable, Iterator, List, Optional, Tuple
+import multiprocessing
+import os
+import PyPDF2
+
+SECTION_KEYWORDS = ['education', 'experience', 'skills', 'summary', 'objective',
+                    'policy', 'procedure', 'guideline', 'introduction', 'conclusion']
+PREVIEW_LINES = 10
+
+# One DocumentTool per worker process, for its text splitter
+_tool = None
+
+# The PDF a worker last parsed, as (path, mtime, reader). Opening a PDF and
+# locating a page walks the whole page tree, so later ranges reuse the parse.
+_reader = None
+
+class DocumentAnalysis:
+    """Document summary built up page by page while the document streams past.
+    
+    Analyses of consecutive page ranges (e.g. from worker processes) can be
+    merged in page order.
+    """
+    
+    def __init__(self):
+        self.pages = 0
+        self.words = 0
+        self.characters = 0
+        self.sections = []
+        self.section_count = 0
+        self.preview_lines = []
+        self.lines_seen = 0
+    
+    def add(self, page: str):
+        self.pages += 1
+        self.words += len(page.split())
+        self.characters += len(page)
+        
+        for line in page.split('\n'):
+            # The preview comes from the first lines of the document
+            if self.lines_seen < PREVIEW_LINES and line.strip():
+                self.preview_lines.append(line.strip())
+            self.lines_seen += 1
+            
+            # Count sections (based on common patterns)
+            line_lower = line.lower().strip()
+            if any(keyword in line_lower for keyword in SECTION_KEYWORDS) and len(line) < 100:
+                self.section_count += 1
+                if len(self.sections) < 5:
+                    self.sections.append(line.strip())
+    
+    def observe(self, pages: Iterable[str]) -> Iterator[str]:
+        """Pass pages through unchanged, analyzing each one"""
+        for page in pages:
+            self.add(page)
+            yield page
+    
+    def merge(self, other: "DocumentAnalysis"):
+        """Append the analysis of the pages that follow this one's"""
+        if self.lines_seen < PREVIEW_LINES:
+            self.preview_lines += other.preview_lines
+        self.pages += other.pages
+        self.words += other.words
+        self.characters += other.characters
+        self.sections += other.sections[:5 - len(self.sections)]
+        self.section_count += other.section_count
+        self.lines_seen += other.lines_seen
+    
+    def summary(self) -> str:
+        summary = f"Document contains approximately {self.words} words.\n"
+        
+        if self.sections:
+            summary += f"Detected sections: {', '.join(self.sections)}"
+            if self.section_count > 5:
+                summary += f" and {self.section_count - 5} more."
+        
+        # Extract first few lines as preview
+        if self.preview_lines:
+            summary += f"\n\n**Preview:**\n" + "\n".join(self.preview_lines[:5]) + "..."
+        
+        return summary
+
+def worker_context():
+    """Start method for document workers.
+    
+    Not fork: a forked worker would inherit the server's threads, locks and
+    database connections. forkserver forks from a clean helper process;
+    spawn is the fallback where it is unavailable.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+def page_ranges(pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + pages_per_task, pages)) for start in range(0, pages, pages_per_task)]
+
+def pdf_page_count(file_path: str) -> int:
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+def _pdf_reader(file_path: str) -> PyPDF2.PdfReader:
+    global _reader
+    mtime = os.path.getmtime(file_path)
+    if _reader is None or _reader[:2] != (file_path, mtime):
+        _reader = (file_path, mtime, PyPDF2.PdfReader(file_path))
+    return _reader[2]
+
+def extract_and_chunk(file_path: str, start: int, stop: int) -> Tuple[List[str], DocumentAnalysis]:
+    """Worker task: extract PDF pages [start, stop), analyze and chunk them"""
+    global _tool
+    if _tool is None:
+        from tools.document_tool import DocumentTool
+        _tool = DocumentTool()
+    
+    analysis = DocumentAnalysis()
+    pdf_reader = _pdf_reader(file_path)
+    pages = (pdf_reader.pages[number].extract_text() or "" for number in range(start, stop))
+    chunks = list(_tool.iter_chunks(analysis.observe(pages)))
+    return chunks, analysis
+
+def parallel_pdf_chunks(executor: Executor, file_path: str, analysis: DocumentAnalysis,
+                        pages_per_task: int = 25, pages: Optional[int] = None) -> Iterator[str]:
+    """Chunks of a PDF extracted in page ranges across executor's workers.
+    
+    All ranges are submitted at once; results are consumed in page order,
+    so chunks can be indexed while later ranges are still being extracted.
+    Chunks do not run across range boundaries.
+    """
+    if pages is None:
+        pages = pdf_page_count(file_path)
+    futures = [executor.submit(extract_and_chunk, file_path, start, stop)
+               for start, stop in page_ranges(pages, pages_per_task)]
+    try:
+        for future in futures:
+            chunks, part = future.result()
+            analysis.merge(part)
+            yield from chunks
+    finally:
+        # The consumer stopped early (e.g. embedding failed); drop queued ranges
+        for future in futures:
+            future.cancel()
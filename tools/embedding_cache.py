@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional
+import hashlib
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_BATCH = 500
+
+class EmbeddingCache:
+    """Content-addressed embedding vectors in a local SQLite file.
+    
+    A vector is keyed by sha256(model, text), so the same chunk is embedded
+    once per model no matter which document or user it came from. Vectors
+    are stored as float32 bytes. Hit counters cover chunks and whole
+    documents (uploads whose file hash was already indexed).
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.document_hits = 0
+        self.document_misses = 0
+    
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_BATCH):
+                batch = keys[start:start + LOOKUP_BATCH]
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+    
+    def put_many(self, vectors: Dict[str, List[float]]):
+        try:
+            with self._lock:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()]
+                )
+                self._connection.commit()
+        except Exception as e:
+            logger.error(f"Error storing embeddings: {e}")
+    
+    def record_document(self, hit: bool):
+        if hit:
+            self.document_hits += 1
+        else:
+            self.document_misses += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        chunks = self.hits + self.misses
+        documents = self.document_hits + self.document_misses
+        return {
+            "chunk_hits": self.hits,
+            "chunk_misses": self.misses,
+            "chunk_hit_ratio": round(self.hits / chunks, 3) if chunks else None,
+            "document_hits": self.document_hits,
+            "document_misses": self.document_misses,
+            "document_hit_ratio": round(self.document_hits / documents, 3) if documents else None
+        }
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that sends only texts missing from the cache to the model"""
+    
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model: Optional[str] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model or getattr(embeddings, "model", type(embeddings).__name__)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [EmbeddingCache.key(self.model, text) for text in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        
+        # Embed each missing text once, even if it repeats within the batch
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new = dict(zip(missing, vectors))
+            self.cache.put_many(new)
+            found.update((key, np.asarray(vector, dtype=np.float32)) for key, vector in new.items())
+        
+        self.cache.hits += len(texts) - len(missing)
+        self.cache.misses += len(missing)
+        logger.info(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} chunks reused")
+        return [found[key].tolist() for key in keys]
+    
+    def embed_query(self, text: str) -> List[float]:
+        key = EmbeddingCache.key(self.model, text)
+        found = self.cache.get_many([key])
+        if key in found:
+            return found[key].tolist()
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many({key: vector})
+        return vector
@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import time
+
+import orjson
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from database.connection import db_manager
+from models.database import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+# An in-progress claim older than this is treated as abandoned (worker crashed)
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+class IdempotencyConflict(Exception):
+    """The key was already used with a different request body"""
+
+class IdempotencyInProgress(Exception):
+    """The first request with this key is still running after the wait"""
+
+class IdempotencyStore:
+    """Runs a handler at most once per Idempotency-Key and replays its result.
+    
+    The first request claims the key by inserting an in_progress row; the
+    primary key makes the claim atomic across workers. Its result is stored
+    as JSON for ttl_seconds. Duplicates that arrive while it runs wait for
+    it: same-process waiters on an asyncio.Event, others by polling the row.
+    If the handler raises, the claim is dropped so a retry can run it again.
+    """
+    
+    def __init__(self, ttl_seconds: float = 86400, wait_seconds: float = 30, poll_interval: float = 0.1):
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Event] = {}
+    
+    @staticmethod
+    def fingerprint(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+    
+    async def run(self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Dict[str, Any]]],
+                  cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True) -> Tuple[Dict[str, Any], bool]:
+        """Return (result, replayed), calling handler only if no result is stored for key.
+        
+        Results that are not cacheable (e.g. transient errors) release the key
+        instead of being stored, so a retry runs the handler again.
+        """
+        while True:
+            record = self._claim(key, fingerprint)
+            if record is None:
+                break
+            if record.request_hash != fingerprint:
+                raise IdempotencyConflict(key)
+            if record.status == "completed":
+                return orjson.loads(record.response), True
+            
+            result = await self._wait_for(key)
+            if result is not None:
+                return result, True
+            # The first request failed and released the key; claim it again
+        
+        event = asyncio.Event()
+        self._inflight[key] = event
+        try:
+            result = await handler()
+            if cacheable(result):
+                self._complete(key, result)
+            else:
+                self._release(key)
+            return result, False
+        except Exception:
+            self._release(key)
+            raise
+        finally:
+            event.set()
+            self._inflight.pop(key, None)
+    
+    def _claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """Claim key and return None, or return the record that already holds it"""
+        session = db_manager.get_session()
+        try:
+            while True:
+                now = datetime.now()
+                try:
+                    session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at < now))
+                    session.add(IdempotencyRecord(
+                        key=key, request_hash=fingerprint, status="in_progress",
+                        expires_at=now + CLAIM_TIMEOUT
+                    ))
+                    session.commit()
+                    return None
+                except IntegrityError:
+                    session.rollback()
+                record = session.get(IdempotencyRecord, key)
+                if record is not None:
+                    session.expunge(record)
+                    return record
+                # Released between our insert and read; try the claim again
+        finally:
+            session.close()
+    
+    async def _wait_for(self, key: str) -> Optional[Dict[str, Any]]:
+        """Wait for the in-flight request holding key; None if it released the key"""
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            event = self._inflight.get(key)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyInProgress(key)
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    raise IdempotencyInProgress(key)
+            else:
+                await asyncio.sleep(min(self.poll_interval, remaining))
+            
+            record = self._load(key)
+            if record is None:
+                return None
+            if record[0] == "completed":
+                return orjson.loads(record[1])
+    
+    def _load(self, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        session = db_manager.get_session()
+        try:
+            return session.execute(
+                select(IdempotencyRecord.status, IdempotencyRecord.response)
+                .where(IdempotencyRecord.key == key)
+            ).first()
+        finally:
+            session.close()
+    
+    def _complete(self, key: str, result: Dict[str, Any]):
+        session = db_manager.get_session()
+        try:
+            session.execute(update(IdempotencyRecord).where(IdempotencyRecord.key == key).values(
+                status="completed",
+                response=orjson.dumps(result, default=str).decode("utf-8"),
+                expires_at=datetime.now() + timedelta(seconds=self.ttl_seconds)
+            ))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error storing idempotent result for {key}: {e}")
+        finally:
+            session.close()
+    
+    def _release(self, key: str):
+        session = db_manager.get_session()
+        try:
+            session.execute(delete(IdempotencyRecord).where(
+                IdempotencyRecord.key == key, IdempotencyRecord.status == "in_progress"
+            ))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error releasing idempotency key {key}: {e}")
+        finally:
+            session.close()
+
+# Global idempotency store
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS
+)
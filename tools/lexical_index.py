@@ -0,0 +1,140 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+import re
+
+import numpy as np
+import orjson
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Above one posting per this many chunks, top_k accumulates scores densely
+DENSE_POSTINGS_RATIO = 16
+
+VOCABULARY_FILE = "bm25_vocabulary.json"
+POSTINGS_INDPTR_FILE = "bm25_postings_indptr.npy"
+POSTINGS_CHUNKS_FILE = "bm25_postings_chunks.npy"
+POSTINGS_WEIGHTS_FILE = "bm25_postings_weights.npy"
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+class BM25Index:
+    """BM25 lexical index over a document's chunks, built once at ingest.
+    
+    The chunk × term matrix is stored term-major as an inverted index:
+    for term t, chunks[indptr[t]:indptr[t + 1]] are the chunks containing
+    it and weights[...] their precomputed BM25 term weights. A question
+    only touches the postings of its own terms, so query cost grows with
+    the matching postings rather than with the number of chunks.
+    """
+    
+    def __init__(self, vocabulary: Dict[str, int], indptr: np.ndarray, chunks: np.ndarray,
+                 weights: np.ndarray, size: int):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.chunks = chunks
+        self.weights = weights
+        self.size = size
+    
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "BM25Index":
+        vocabulary: Dict[str, int] = {}
+        rows, terms, frequencies = [], [], []
+        size = 0
+        for row, text in enumerate(texts):
+            counts = Counter(vocabulary.setdefault(token, len(vocabulary)) for token in tokenize(text))
+            rows.extend([row] * len(counts))
+            terms.extend(counts.keys())
+            frequencies.extend(counts.values())
+            size = row + 1
+        
+        rows = np.array(rows, dtype=np.int32)
+        terms = np.array(terms, dtype=np.int32)
+        tf = np.array(frequencies, dtype=np.float32)
+        
+        lengths = np.bincount(rows, weights=tf, minlength=size)
+        average_length = lengths.mean() if size and lengths.mean() > 0 else 1.0
+        document_frequency = np.bincount(terms, minlength=len(vocabulary))
+        idf = np.log1p((size - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rows] / average_length)
+        weights = (idf[terms] * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+        
+        # Group the postings by term; the stable sort keeps each list in chunk order
+        order = np.argsort(terms, kind="stable")
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=indptr[1:])
+        return cls(vocabulary, indptr, rows[order], weights[order], size)
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    @property
+    def nbytes(self) -> int:
+        return int(self.indptr.nbytes + self.chunks.nbytes + self.weights.nbytes)
+    
+    def _postings(self, question: str):
+        """Chunk ids and weights of the postings of question's terms (repeated terms count again)"""
+        terms = [self.vocabulary[token] for token in tokenize(question) if token in self.vocabulary]
+        if not terms:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        spans = [slice(self.indptr[term], self.indptr[term + 1]) for term in terms]
+        return (np.concatenate([self.chunks[span] for span in spans]),
+                np.concatenate([self.weights[span] for span in spans]))
+    
+    def scores(self, question: str) -> np.ndarray:
+        """BM25 score of every chunk for question"""
+        chunks, weights = self._postings(question)
+        return np.bincount(chunks, weights=weights, minlength=self.size)
+    
+    def top_k(self, question: str, k: int = 3) -> List[Tuple[float, int]]:
+        """(score, chunk position) of the best k chunks with a positive score, best first.
+        
+        Only chunks sharing a term with the question are scored.
+        """
+        chunks, weights = self._postings(question)
+        if not len(chunks) or k <= 0:
+            return []
+        if len(chunks) * DENSE_POSTINGS_RATIO < self.size:
+            # Few postings: sort them, cost independent of the number of chunks
+            candidates, inverse = np.unique(chunks, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights, minlength=len(candidates))
+        else:
+            # Postings cover much of the corpus: a dense accumulator beats sorting them
+            dense = np.bincount(chunks, weights=weights, minlength=self.size)
+            candidates = np.flatnonzero(dense)
+            scores = dense[candidates]
+        k = min(k, len(candidates))
+        # Everything scoring at least the k-th best, so ties at the cut go to the earliest chunks
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        best = np.flatnonzero(scores >= kth)
+        best = best[np.lexsort((candidates[best], -scores[best]))][:k]
+        return [(float(scores[position]), int(candidates[position])) for position in best if scores[position] > 0]
+    
+    def save(self, directory: Path):
+        (directory / VOCABULARY_FILE).write_bytes(orjson.dumps({"size": self.size, "terms": list(self.vocabulary)}))
+        np.save(directory / POSTINGS_INDPTR_FILE, self.indptr)
+        np.save(directory / POSTINGS_CHUNKS_FILE, self.chunks)
+        np.save(directory / POSTINGS_WEIGHTS_FILE, self.weights)
+    
+    @classmethod
+    def load(cls, directory: Path) -> "BM25Index":
+        """Open a saved index with its postings memory-mapped"""
+        saved = orjson.loads((directory / VOCABULARY_FILE).read_bytes())
+        return cls(
+            {term: position for position, term in enumerate(saved["terms"])},
+            np.load(directory / POSTINGS_INDPTR_FILE, mmap_mode="r"),
+            np.load(directory / POSTINGS_CHUNKS_FILE, mmap_mode="r"),
+            np.load(directory / POSTINGS_WEIGHTS_FILE, mmap_mode="r"),
+            saved["size"]
+        )
+    
+    @staticmethod
+    def exists(directory: Path) -> bool:
+        # Indexes saved before postings were introduced are rebuilt from the chunks
+        return (directory / POSTINGS_INDPTR_FILE).exists()
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+
+from models.database import MeetingRow
+from tools.database_tool import DatabaseTool
+from utils.validator import validate_meeting_row
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+EXPORT_FIELDS = list(MeetingRow._fields)
+
+# Keep the response small on very dirty files; the counts stay exact
+MAX_REPORTED_ERRORS = 1000
+
+# Bytes of export text buffered before each write to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+STREAM_FORMATS = ("ndjson", "sse")
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+# Agenda streams are read as they arrive, so flush sooner than exports
+STREAM_CHUNK_SIZE = 8 * 1024
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8")
+
+class MeetingImporter:
+    """Streams NDJSON/CSV meetings into the database in validated batches"""
+    
+    def __init__(self, db_tool: DatabaseTool, batch_size: int = 1000):
+        self.db_tool = db_tool
+        self.batch_size = batch_size
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+    
+    async def run(self, chunks: AsyncIterator[bytes], fmt: str) -> Dict[str, Any]:
+        """Import every record in the stream and return a per-row error report"""
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        
+        records = self._ndjson_records if fmt == "ndjson" else self._csv_records
+        batch = []
+        async for line_number, raw in records(iter_lines(chunks)):
+            try:
+                batch.append((line_number, validate_meeting_row(raw)))
+            except ValueError as e:
+                self._record_error(line_number, str(e))
+                continue
+            
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        
+        await self._flush(batch)
+        
+        return {
+            "success": self.failed == 0,
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+    
+    async def _ndjson_records(self, lines: AsyncIterator[str]):
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                self._record_error(line_number, f"invalid JSON: {e.msg}")
+    
+    async def _csv_records(self, lines: AsyncIterator[str]):
+        header = None
+        pending = ""
+        start_line = line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not pending:
+                start_line = line_number
+            pending = f"{pending}\n{line}" if pending else line
+            
+            # A quoted field can span lines; wait until the quotes balance
+            if pending.count('"') % 2:
+                continue
+            
+            record, pending = pending, ""
+            if not record.strip():
+                continue
+            values = next(csv.reader([record]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                self._record_error(start_line, f"expected {len(header)} columns, got {len(values)}")
+                continue
+            yield start_line, dict(zip(header, values))
+        
+        if pending:
+            self._record_error(start_line, "unterminated quoted field")
+    
+    async def _flush(self, batch):
+        if not batch:
+            return
+        self.batches += 1
+        
+        result = await run_in_threadpool(self.db_tool.bulk_insert_meetings, [row for _, row in batch])
+        if result["success"]:
+            self.imported += result["inserted"]
+            return
+        
+        # Isolate the rows the database rejected
+        logger.warning(f"Batch insert failed, retrying rows individually: {result['error']}")
+        for line_number, row in batch:
+            single = await run_in_threadpool(self.db_tool.bulk_insert_meetings, [row])
+            if single["success"]:
+                self.imported += 1
+            else:
+                self._record_error(line_number, single["error"])
+    
+    def _record_error(self, line_number: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "error": error})
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def export_meetings(db_tool: DatabaseTool, fmt: str, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> Iterator[str]:
+    """Yield the meetings table as NDJSON or CSV text, one cursor batch at a time"""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(EXPORT_FIELDS)
+    
+    for row in db_tool.iter_meetings(start, end):
+        values = [_export_value(value) for value in row]
+        if fmt == "ndjson":
+            buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, values))))
+            buffer.write("\n")
+        else:
+            writer.writerow(values)
+        
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def encode_events(events: Iterator[Dict[str, Any]], fmt: str) -> Iterator[bytes]:
+    """Encode agent stream events as NDJSON lines or SSE messages.
+    
+    Each event is a dict with an "event" name. The first event is sent on its
+    own so clients get the first byte before the database is read; after that
+    output is buffered up to STREAM_CHUNK_SIZE.
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported stream format: {fmt}")
+    
+    buffer = bytearray()
+    first = True
+    for event in events:
+        payload = orjson.dumps(event)
+        if fmt == "ndjson":
+            buffer += payload + b"\n"
+        else:
+            buffer += b"event: " + event["event"].encode() + b"\ndata: " + payload + b"\n\n"
+        
+        if first or len(buffer) >= STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+            first = False
+    
+    if buffer:
+        yield bytes(buffer)
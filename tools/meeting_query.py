@@ -0,0 +1,391 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+import dateparser
+
+# Literal values are lifted out of a question before it is parsed, so questions
+# that differ only in emails, dates, numbers or quoted text share one plan.
+# Times of day are lifted too but not filtered on (agendas are day-grained).
+LITERAL_PATTERN = re.compile(
+    r'"(?P<quoted>[^"]+)"'
+    r'|(?P<email>[\w.+-]+@[\w-]+(?:\.[\w-]+)+)'
+    r'|\b(?P<date>\d{4}[/-]\d{1,2}[/-]\d{1,2}|\d{1,2}[/-]\d{1,2}[/-]\d{4})\b'
+    r'|\b(?P<time>\d{1,2}(?::\d{2})?\s*(?:am|pm)|\d{1,2}:\d{2})\b'
+    r'|\b(?P<n>\d+)\b'
+)
+
+PERIODS = {
+    'today': r'\b(today|right now|now(?! on)|current(?! (?:week|month)))\b',
+    'tomorrow': r'\b(tomorrow|next day)\b',
+    'yesterday': r'\byesterday\b',
+    'next_week': r'\b(next|following|upcoming) week\b',
+    'last_week': r'\b(last|previous|past) week\b',
+    'this_week': r'\b(this|current) week\b',
+    'next_month': r'\b(next|following|upcoming) month\b',
+    'last_month': r'\b(last|previous|past) month\b',
+    'this_month': r'\b(this|current) month\b',
+    'upcoming': r'\b(upcoming|coming up|from now on)\b',
+}
+
+STATS_GROUPS = ("day", "week", "month", "weekday", "hour", "organizer", "location", "status")
+TIME_STATS_GROUPS = ("day", "week", "month", "hour")
+
+# Analytics phrasing -> stats group; checked in order
+AGGREGATION_GROUPS = (
+    ('weekday', r'\b(?:by|per|each) (?:weekday|day of (?:the )?week)\b|\bweekdays?\b|\bday of (?:the )?week\b'),
+    ('hour', r'\b(?:by|per|each) hour\b|\bhourly\b|\btime of day\b|\bbusiest (?:hour|time)\b'),
+    ('day', r'\b(?:by|per|each|a) day\b|\bdaily\b|\b(?:busiest|quietest) day\b'),
+    ('week', r'\b(?:by|per|each|a) week\b|\bweekly\b|\b(?:busiest|quietest) week\b'),
+    ('month', r'\b(?:by|per|each|a) month\b|\bmonthly\b|\b(?:busiest|quietest) month\b'),
+    ('organizer', r'\b(?:by|per|each|for each) organi[sz]ers?\b|\borgani[sz]ers?\b'),
+    ('location', r'\b(?:by|per|each) (?:location|room|place)\b|\b(?:locations?|rooms?)\b'),
+    ('status', r'\b(?:by|per) status\b'),
+)
+AGGREGATION_PATTERN = (
+    r'\b(how many|count|number of|busiest|quietest|total|stats|statistics|breakdown|'
+    r'distribution|per (?:day|week|month|hour|organi[sz]er|location|room|weekday)|by (?:organi[sz]er|location|room|status|day|weekday))\b'
+)
+# Analytics words removed before the rest of the question is compiled as a filter
+AGGREGATION_NOISE = (
+    r'\b(how many|count|number of|busiest|quietest|total|stats|statistics|breakdown|distribution|'
+    r'meeting hours|hours|hour|time of day|durations?|by|per|each|for each|a|daily|weekly|monthly|hourly|'
+    r'day of (?:the )?week|weekdays?|day|week(?! ?\w)|month(?! ?\w)|organi[sz]ers?|locations?|rooms?|status)\b'
+)
+
+STATUSES = {
+    'cancelled': r'\b(cancell?ed)\b',
+    'completed': r'\b(completed|finished|done)\b',
+    'scheduled': r'\bscheduled\b',
+}
+
+# Words that end a free-text location or organizer name
+BOUNDARY_WORDS = (
+    "on|for|with|next|this|last|today|tomorrow|yesterday|from|between|before|after|since|"
+    "until|by|organized|organised|hosted|and|or|at|in|about|sorted|ordered|limit|first|top|"
+    "that|which|where|week|upcoming|meetings?"
+)
+FREE_TEXT = rf"((?:(?!(?:{BOUNDARY_WORDS})\b)[a-z][\w'&-]*\s*){{1,4}})"
+
+STOPWORDS = frozenset("""
+    a an the of to on for at in with and or from by is are was be do does did have has
+    i me my we our you your show list find search look get give display tell see all every
+    any some meeting meetings appointment appointments event events calendar agenda schedule
+    what whats what's which when where who how many much there please can could would
+    planned booked sorted ordered order sort up coming next is it its this that these those
+    am will should need know going happening happen held take place time day week
+    about regarding concerning re titled called named mentioning
+""".split())
+
+MeetingFilter = namedtuple(
+    "MeetingFilter",
+    ["start", "end", "keywords", "status", "location", "organizer",
+     "participant", "limit", "descending", "period"],
+    defaults=(None, None, (), None, None, None, None, None, False, None)
+)
+MeetingFilter.__doc__ = """Filter AST for a meeting query.
+
+start/end bound scheduled_time as [start, end); keywords are ANDed over title
+and description; location and organizer are substring matches. period only
+describes where the range came from (e.g. "today") and does not affect SQL.
+"""
+
+def filter_shape(meeting_filter: MeetingFilter) -> Tuple:
+    """Which clauses a filter uses, independent of their values"""
+    return (
+        meeting_filter.start is not None,
+        meeting_filter.end is not None,
+        len(meeting_filter.keywords),
+        meeting_filter.status is not None,
+        meeting_filter.location is not None,
+        meeting_filter.organizer is not None,
+        meeting_filter.participant is not None,
+        meeting_filter.limit is not None,
+        meeting_filter.descending,
+    )
+
+def is_plain_period(meeting_filter: MeetingFilter) -> bool:
+    """True for a bare day/week range, which the agenda cache already serves"""
+    return meeting_filter == MeetingFilter(
+        start=meeting_filter.start, end=meeting_filter.end,
+        status="scheduled", period=meeting_filter.period
+    ) and meeting_filter.period in ("today", "tomorrow", "next_week", "date")
+
+def normalize_question(question: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Lower-case a question and replace its literals with numbered placeholders"""
+    literals = []
+    
+    def lift(match):
+        kind = match.lastgroup
+        literals.append((kind, match.group(kind)))
+        return f" <{kind}{len(literals) - 1}> "
+    
+    shape = LITERAL_PATTERN.sub(lift, question.strip())
+    shape = re.sub(r"\s+", " ", shape.lower()).strip(" ?.!")
+    return shape, literals
+
+class QueryCompiler:
+    """Compiles natural-language meeting questions into MeetingFilter objects.
+    
+    Parsing works on the normalized question shape and produces a plan that
+    refers to literal slots and relative periods; plans are cached by shape,
+    then bound to the question's literals and the current time.
+    """
+    
+    def __init__(self, plan_cache_size: int = 1024):
+        self._plan = lru_cache(maxsize=plan_cache_size)(self._parse_shape)
+    
+    def compile(self, question: str, now: Optional[datetime] = None) -> MeetingFilter:
+        shape, literals = normalize_question(question)
+        return self._bind(self._plan(shape), literals, now or datetime.now())
+    
+    def plan_cache_info(self) -> Dict[str, Any]:
+        info = self._plan.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    
+    @staticmethod
+    def _take(pattern: str, text: str):
+        """Search text and blank out the match so later rules do not see it"""
+        match = re.search(pattern, text)
+        if not match:
+            return None, text
+        return match, text[:match.start()] + " " + text[match.end():]
+    
+    def _parse_shape(self, shape: str) -> Dict[str, Any]:
+        """Parse a normalized question into a plan.
+        
+        Field values are ("slot", i) for the i-th literal or ("text", value).
+        """
+        plan: Dict[str, Any] = {}
+        text = f" {shape} "
+        
+        # Date range: explicit dates first, then relative periods
+        match, text = self._take(r"\b(?:between|from) <date(\d+)> (?:and|to|until|-) <date(\d+)>", text)
+        if match:
+            plan['range'] = ("between", int(match.group(1)), int(match.group(2)))
+        else:
+            for kind, pattern in (("after", r"\b(?:after|since|from) <date(\d+)>"),
+                                  ("before", r"\b(?:before|until) <date(\d+)>"),
+                                  ("date", r"\b(?:(?:on|for|at) )?<date(\d+)>")):
+                match, text = self._take(pattern, text)
+                if match:
+                    plan['range'] = (kind, int(match.group(1)))
+                    break
+        if 'range' not in plan:
+            for period, pattern in PERIODS.items():
+                match, text = self._take(pattern, text)
+                if match:
+                    plan['range'] = (period,)
+                    break
+        
+        for status, pattern in STATUSES.items():
+            match, text = self._take(pattern, text)
+            if match:
+                plan['status'] = status
+                break
+        
+        # Organizer before participant: "organized by a@b.com" is not an attendee
+        match, text = self._take(
+            rf"\b(?:organi[sz]ed|hosted|run|booked|created|set up) by (?:<(?:email|quoted)(\d+)>|{FREE_TEXT})"
+            r"|\borgani[sz]er (?:is )?(?:<(?:email|quoted)(\d+)>|" + FREE_TEXT + ")", text
+        )
+        if match:
+            plan['organizer'] = self._slot_or_text(match.group(1) or match.group(3),
+                                                   match.group(2) or match.group(4))
+        
+        match, text = self._take(r"(?:\b(?:with|for|attended by|including|involving) )?<email(\d+)>", text)
+        if match:
+            plan['participant'] = ("slot", int(match.group(1)))
+        
+        match, text = self._take(
+            rf"\b(?:at|in|located at|location(?: is)?) (?:the )?(?:<quoted(\d+)>|{FREE_TEXT})", text
+        )
+        if match and match.group(2) and re.fullmatch(r"(?:the )?(?:morning|afternoon|evening|night|office hours)\s*", match.group(2)):
+            match = None
+        if match:
+            plan['location'] = self._slot_or_text(match.group(1), match.group(2))
+        
+        # Limit and sort order
+        match, text = self._take(r"\b(first|top|next|last|latest|earliest|limit(?: to)?) <n(\d+)>", text)
+        if match:
+            plan['limit'] = ("slot", int(match.group(2)))
+            plan['descending'] = match.group(1) in ("last", "latest")
+            if match.group(1) == "next" and 'range' not in plan:
+                plan['range'] = ("upcoming",)
+        else:
+            match, text = self._take(r"<n(\d+)> (?:meetings?|appointments?|events?)", text)
+            if match:
+                plan['limit'] = ("slot", int(match.group(1)))
+        if 'limit' not in plan:
+            match, text = self._take(r"\b(?:next|upcoming) (?:meeting|appointment|event)\b", text)
+            if match:
+                plan['limit'] = ("text", 1)
+                plan.setdefault('range', ("upcoming",))
+        match, text = self._take(r"\b(latest|most recent|newest|last)\b", text)
+        if match:
+            plan['descending'] = True
+        match, text = self._take(r"\b(earliest|oldest|soonest|first)\b", text)
+        if match:
+            plan['descending'] = False
+        
+        # Whatever is left over is matched against title and description
+        keywords = []
+        for slot in re.findall(r"<quoted(\d+)>", text):
+            keywords.append(("slot", int(slot)))
+        text = re.sub(r"<\w+?\d+>", " ", text)
+        for word in re.findall(r"[a-z][\w'-]*", text):
+            if word not in STOPWORDS and ("text", word) not in keywords:
+                keywords.append(("text", word))
+        if keywords:
+            plan['keywords'] = tuple(keywords)
+        
+        return plan
+    
+    @staticmethod
+    def _slot_or_text(slot: Optional[str], text: Optional[str]):
+        if slot is not None:
+            return ("slot", int(slot))
+        return ("text", text.strip())
+    
+    def _bind(self, plan: Dict[str, Any], literals: List[Tuple[str, str]], now: datetime) -> MeetingFilter:
+        """Fill a cached plan in with this question's literal values"""
+        def value(spec):
+            kind, item = spec
+            return literals[item][1] if kind == "slot" else item
+        
+        fields: Dict[str, Any] = {}
+        if 'range' in plan:
+            fields.update(self._bind_range(plan['range'], literals, now))
+        for name in ('organizer', 'location'):
+            if name in plan:
+                fields[name] = value(plan[name])
+        if 'participant' in plan:
+            fields['participant'] = value(plan['participant']).strip().lower()
+        if 'keywords' in plan:
+            fields['keywords'] = tuple(value(spec) for spec in plan['keywords'])
+        if 'limit' in plan:
+            fields['limit'] = max(1, int(value(plan['limit'])))
+        fields['descending'] = plan.get('descending', False)
+        
+        # Date-bounded questions have always meant scheduled meetings
+        status = plan.get('status')
+        if status is None and fields.get('start') and fields.get('end'):
+            status = "scheduled"
+        fields['status'] = status
+        return MeetingFilter(**fields)
+    
+    @staticmethod
+    def _bind_range(spec: Tuple, literals: List[Tuple[str, str]], now: datetime) -> Dict[str, Any]:
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = today - timedelta(days=today.weekday())
+        
+        def day(index: int) -> datetime:
+            parsed = dateparser.parse(literals[index][1])
+            if parsed is None:
+                raise ValueError(f"Could not understand the date '{literals[index][1]}'")
+            return parsed.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        kind = spec[0]
+        if kind == "between":
+            start, end = sorted((day(spec[1]), day(spec[2])))
+            return {"start": start, "end": end + timedelta(days=1), "period": "range"}
+        if kind == "after":
+            return {"start": day(spec[1]), "period": "range"}
+        if kind == "before":
+            return {"end": day(spec[1]), "period": "range"}
+        if kind == "date":
+            start = day(spec[1])
+            return {"start": start, "end": start + timedelta(days=1), "period": "date"}
+        if kind == "upcoming":
+            return {"start": now, "period": "upcoming"}
+        
+        starts = {
+            "today": (today, timedelta(days=1)),
+            "tomorrow": (today + timedelta(days=1), timedelta(days=1)),
+            "yesterday": (today - timedelta(days=1), timedelta(days=1)),
+            "this_week": (week_start, timedelta(days=7)),
+            "next_week": (week_start + timedelta(days=7), timedelta(days=7)),
+            "last_week": (week_start - timedelta(days=7), timedelta(days=7)),
+        }
+        if kind in starts:
+            start, length = starts[kind]
+            return {"start": start, "end": start + length, "period": kind}
+        
+        month_start = today.replace(day=1)
+        months = {"this_month": 0, "next_month": 1, "last_month": -1}
+        start = add_months(month_start, months[kind])
+        return {"start": start, "end": add_months(start, 1), "period": kind}
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a first-of-month datetime by whole months"""
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+def parse_aggregation(question: str) -> Optional[Tuple[Optional[str], str, str]]:
+    """Detect an analytics question.
+    
+    Returns (group_by, rank_by, filter_question) where filter_question is the
+    question with analytics phrasing removed, or None for ordinary questions.
+    """
+    text = question.lower()
+    if not re.search(AGGREGATION_PATTERN, text):
+        return None
+    
+    group_by = None
+    for group, pattern in AGGREGATION_GROUPS:
+        if re.search(pattern, text):
+            group_by = group
+            break
+    rank_by = "hours" if re.search(r'\b(hours|time spent|duration|longest)\b', text) else "meetings"
+    
+    def strip_noise(segment: str) -> str:
+        # Keep period phrases like "this week" intact for the filter compiler
+        segment = re.sub(r'\b(this|next|last|current|following|previous|past|upcoming) (week|month)\b',
+                         lambda match: f"{match.group(1)}_{match.group(2)}", segment.lower())
+        return re.sub(AGGREGATION_NOISE, " ", segment).replace("_", " ")
+    
+    # Literals (emails, dates, quoted text) pass through untouched
+    pieces, position = [], 0
+    for match in LITERAL_PATTERN.finditer(question):
+        pieces += [strip_noise(question[position:match.start()]), match.group(0)]
+        position = match.end()
+    pieces.append(strip_noise(question[position:]))
+    return group_by, rank_by, "".join(pieces)
+
+def describe_filter(meeting_filter: MeetingFilter) -> str:
+    """Human-readable qualifiers of a filter, status excluded (e.g. at hq today)"""
+    parts = []
+    if meeting_filter.keywords:
+        parts.append("matching " + " ".join(f"'{keyword}'" for keyword in meeting_filter.keywords))
+    if meeting_filter.participant:
+        parts.append(f"with {meeting_filter.participant}")
+    if meeting_filter.organizer:
+        parts.append(f"organized by {meeting_filter.organizer}")
+    if meeting_filter.location:
+        parts.append(f"at {meeting_filter.location}")
+    
+    period = meeting_filter.period
+    if period in ("today", "tomorrow"):
+        parts.append(period)
+    elif period in ("this_week", "next_week", "last_week", "this_month", "next_month", "last_month"):
+        parts.append(period.replace("_", " "))
+    elif period == "upcoming":
+        parts.append("from now on")
+    elif period == "yesterday":
+        parts.append("yesterday")
+    elif meeting_filter.start and meeting_filter.end:
+        last_day = meeting_filter.end - timedelta(days=1)
+        if last_day.date() == meeting_filter.start.date():
+            parts.append(f"on {meeting_filter.start.strftime('%A, %B %d, %Y')}")
+        else:
+            parts.append(f"from {meeting_filter.start:%Y-%m-%d} to {last_day:%Y-%m-%d}")
+    elif meeting_filter.start:
+        parts.append(f"from {meeting_filter.start:%Y-%m-%d}")
+    elif meeting_filter.end:
+        parts.append(f"before {meeting_filter.end:%Y-%m-%d}")
+    return " ".join(parts)
+
+# Global compiler instance
+query_compiler = QueryCompiler()
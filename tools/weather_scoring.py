@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Forecast entries are 3-hour slots starting at their "time"
+FORECAST_SLOT = timedelta(hours=3)
+
+# Score weights; each component is in [0, 1]
+PRECIPITATION_WEIGHT = 0.5
+COMFORT_WEIGHT = 0.3
+WIND_WEIGHT = 0.2
+
+COMFORT_TEMPERATURE = 21.0  # °C
+COMFORT_SPREAD = 7.0  # °C away from COMFORT_TEMPERATURE where comfort drops to ~37%
+CALM_WIND = 4.0  # m/s, no penalty below this
+GALE_WIND = 14.0  # m/s, no credit above this
+SEVERE_CONDITIONS = ("storm", "thunder", "snow", "heavy", "extreme", "sleet", "hail")
+SEVERE_PENALTY = 0.3
+WET_CONDITIONS = ("rain", "drizzle", "shower", "snow", "sleet")
+
+# Scores at or above this count as good meeting weather
+GOOD_WEATHER_SCORE = 0.6
+
+def _precipitation(slot: Dict[str, Any]) -> float:
+    """Probability of precipitation in percent; current conditions have none, so infer it"""
+    probability = slot.get("probability_of_precipitation")
+    if probability is None:
+        weather = str(slot.get("weather", "")).lower()
+        return 100.0 if any(word in weather for word in WET_CONDITIONS) else 0.0
+    return probability
+
+def score_forecast_slots(slots: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Score every forecast slot in [0, 1] at once from precipitation, comfort and wind"""
+    if not slots:
+        return np.zeros(0)
+    
+    precipitation = np.fromiter((_precipitation(slot) for slot in slots), dtype=float, count=len(slots))
+    temperature = np.fromiter((slot.get("feels_like", slot.get("temperature", COMFORT_TEMPERATURE))
+                               for slot in slots), dtype=float, count=len(slots))
+    wind = np.fromiter((slot.get("wind_speed") or 0 for slot in slots), dtype=float, count=len(slots))
+    severe = np.fromiter((any(word in str(slot.get("weather", "")).lower() for word in SEVERE_CONDITIONS)
+                          for slot in slots), dtype=bool, count=len(slots))
+    
+    dry = 1.0 - np.clip(precipitation, 0, 100) / 100.0
+    comfort = np.exp(-np.square((temperature - COMFORT_TEMPERATURE) / COMFORT_SPREAD))
+    calm = 1.0 - np.clip((wind - CALM_WIND) / (GALE_WIND - CALM_WIND), 0, 1)
+    
+    scores = PRECIPITATION_WEIGHT * dry + COMFORT_WEIGHT * comfort + WIND_WEIGHT * calm
+    return np.where(severe, scores * SEVERE_PENALTY, scores)
+
+def rank_candidates(candidates: Sequence[Tuple[datetime, datetime]], slots: Sequence[Dict[str, Any]],
+                    scores: np.ndarray, limit: int = 3) -> List[Dict[str, Any]]:
+    """Attach forecast scores to candidate meeting times and return the best.
+    
+    Candidates must be sorted by start. One spanning several forecast slots
+    gets the worst of their scores; candidates outside the forecast are
+    dropped. Ties go to the earliest candidate.
+    """
+    if not candidates or not len(scores):
+        return []
+    
+    slot_times = np.array([slot["time"] for slot in slots], dtype="datetime64[us]")
+    starts = np.array([start for start, _ in candidates], dtype="datetime64[us]")
+    ends = np.array([end for _, end in candidates], dtype="datetime64[us]")
+    
+    first = np.searchsorted(slot_times, starts, side="right") - 1
+    last = np.searchsorted(slot_times, ends - np.timedelta64(1, "us"), side="right") - 1
+    forecast_end = slot_times[-1] + np.timedelta64(int(FORECAST_SLOT.total_seconds()), "s")
+    covered = (first >= 0) & (ends <= forecast_end)
+    
+    # Worst score over each candidate's slots; candidates span at most a few slots
+    first_index = np.clip(first, 0, len(scores) - 1)
+    last_index = np.clip(last, 0, len(scores) - 1)
+    candidate_scores = scores[first_index]
+    for offset in range(1, int((last_index - first_index).max()) + 1):
+        candidate_scores = np.minimum(candidate_scores, scores[np.minimum(first_index + offset, last_index)])
+    candidate_scores = np.where(covered, candidate_scores, -1.0)
+    
+    # Stable sort on negated scores keeps earlier candidates first on ties;
+    # at most one proposal per forecast slot so the options differ
+    order = np.argsort(-candidate_scores, kind="stable")
+    ranked, used_slots = [], set()
+    for position in order:
+        if len(ranked) >= limit or candidate_scores[position] < 0:
+            break
+        if first[position] in used_slots:
+            continue
+        used_slots.add(first[position])
+        slot = slots[int(first[position])]
+        ranked.append({
+            "start": candidates[position][0],
+            "end": candidates[position][1],
+            "score": round(float(candidate_scores[position]), 3),
+            "weather": slot.get("weather"),
+            "temperature": slot.get("temperature"),
+            "probability_of_precipitation": slot.get("probability_of_precipitation"),
+            "wind_speed": slot.get("wind_speed")
+        })
+    return ranked
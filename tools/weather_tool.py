@@ -1,18 +1,35 @@
 import requests
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# OpenWeatherMap refreshes current conditions about every 10 minutes and
+# forecasts every 3 hours, so identical requests within this window are reused
+CACHE_TTL_SECONDS = 600
+CACHE_MAX_ENTRIES = 256
+
+FORECAST_SLOTS = 40  # 5 days x 8 three-hour slots, the free tier maximum
+
 class WeatherTool:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_ttl_seconds: float = CACHE_TTL_SECONDS):
         self.api_key = api_key
         self.base_url = "http://api.openweathermap.org/data/2.5"
+        self.cache_ttl_seconds = cache_ttl_seconds
+        # Cities don't move; remember geocoding results for the process lifetime
+        self._coordinates: Dict[str, Dict[str, Any]] = {}
+        # Raw API responses keyed by endpoint, coordinates and parameters
+        self._responses: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
         
     def get_coordinates(self, city: str) -> Optional[Dict[str, float]]:
         """Get latitude and longitude for a city"""
+        key = city.strip().lower()
+        if key in self._coordinates:
+            return self._coordinates[key]
+        
         geocode_url = f"http://api.openweathermap.org/geo/1.0/direct"
         params = {
             "q": city,
@@ -26,12 +43,13 @@ class WeatherTool:
             data = response.json()
             
             if data:
-                return {
+                self._coordinates[key] = {
                     "lat": data[0]["lat"],
                     "lon": data[0]["lon"],
                     "city": data[0]["name"],
                     "country": data[0]["country"]
                 }
+                return self._coordinates[key]
             return None
         except Exception as e:
             logger.error(f"Error getting coordinates for {city}: {e}")
@@ -43,20 +61,8 @@ class WeatherTool:
         if not coords:
             return {"error": f"Could not find city: {city}"}
         
-        url = f"{self.base_url}/weather"
-        params = {
-            "lat": coords["lat"],
-            "lon": coords["lon"],
-            "appid": self.api_key,
-            "units": "metric",  # Celsius
-            "lang": "en"
-        }
-        
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
+            data = self._fetch("weather", coords, units="metric", lang="en")  # Celsius
             return self._format_current_weather(data, coords["city"])
         except Exception as e:
             logger.error(f"Error getting current weather: {e}")
@@ -68,25 +74,32 @@ class WeatherTool:
         if not coords:
             return {"error": f"Could not find city: {city}"}
         
-        url = f"{self.base_url}/forecast"
-        params = {
-            "lat": coords["lat"],
-            "lon": coords["lon"],
-            "appid": self.api_key,
-            "units": "metric",
-            "cnt": days * 8  # 8 forecasts per day
-        }
-        
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
+            # The full forecast is shared with get_forecast_slots; formatting keeps `days`
+            data = self._fetch("forecast", coords, units="metric", cnt=FORECAST_SLOTS)
             return self._format_forecast(data, coords["city"], days)
         except Exception as e:
             logger.error(f"Error getting forecast: {e}")
             return {"error": f"Forecast API error: {str(e)}"}
     
+    def get_forecast_slots(self, city: str) -> Dict[str, Any]:
+        """Get every 3-hour slot of the 5-day forecast for a city"""
+        coords = self.get_coordinates(city)
+        if not coords:
+            return {"error": f"Could not find city: {city}"}
+        
+        try:
+            data = self._fetch("forecast", coords, units="metric", cnt=FORECAST_SLOTS)
+            return {
+                "city": coords["city"],
+                "country": data["city"]["country"],
+                "slots": [self._format_forecast_slot(item) for item in data["list"]],
+                "request_time": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Error getting forecast slots: {e}")
+            return {"error": f"Forecast API error: {str(e)}"}
+    
     def get_historical_weather(self, city: str, date: datetime) -> Dict[str, Any]:
         """Get historical weather for a specific date (last 5 days)"""
         coords = self.get_coordinates(city)
@@ -94,26 +107,37 @@ class WeatherTool:
             return {"error": f"Could not find city: {city}"}
         
         # OpenWeatherMap One Call API 3.0 for historical data
-        timestamp = int(date.timestamp())
-        url = f"{self.base_url}/onecall/timemachine"
-        params = {
-            "lat": coords["lat"],
-            "lon": coords["lon"],
-            "dt": timestamp,
-            "appid": self.api_key,
-            "units": "metric"
-        }
-        
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
+            data = self._fetch("onecall/timemachine", coords, dt=int(date.timestamp()), units="metric")
             return self._format_historical_weather(data, coords["city"], date)
         except Exception as e:
             logger.error(f"Error getting historical weather: {e}")
             return {"error": f"Historical weather not available for {date.strftime('%Y-%m-%d')}"}
     
+    def _fetch(self, endpoint: str, coords: Dict[str, Any], **params) -> Dict[str, Any]:
+        """GET an endpoint for coords, reusing a response younger than cache_ttl_seconds"""
+        key = (endpoint, coords["lat"], coords["lon"], tuple(sorted(params.items())))
+        now = time.monotonic()
+        cached = self._responses.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        response = requests.get(
+            f"{self.base_url}/{endpoint}",
+            params={"lat": coords["lat"], "lon": coords["lon"], "appid": self.api_key, **params},
+            timeout=10
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        if self.cache_ttl_seconds > 0:
+            if len(self._responses) >= CACHE_MAX_ENTRIES:
+                self._responses = {k: v for k, v in self._responses.items() if v[0] > now}
+                while len(self._responses) >= CACHE_MAX_ENTRIES:
+                    del self._responses[next(iter(self._responses))]
+            self._responses[key] = (now + self.cache_ttl_seconds, data)
+        return data
+    
     def _format_current_weather(self, data: Dict, city: str) -> Dict[str, Any]:
         """Format current weather response"""
         return {
@@ -158,6 +182,18 @@ class WeatherTool:
             "request_time": datetime.now().isoformat()
         }
     
+    def _format_forecast_slot(self, item: Dict) -> Dict[str, Any]:
+        """Format one 3-hour forecast entry, keeping its start as a datetime"""
+        return {
+            "time": datetime.fromtimestamp(item["dt"]),
+            "temperature": item["main"]["temp"],
+            "feels_like": item["main"]["feels_like"],
+            "weather": item["weather"][0]["description"].title(),
+            "humidity": item["main"]["humidity"],
+            "wind_speed": item["wind"]["speed"],
+            "probability_of_precipitation": item.get("pop", 0) * 100
+        }
+    
     def _format_historical_weather(self, data: Dict, city: str, date: datetime) -> Dict[str, Any]:
         """Format historical weather response"""
         if "current" not in data:
@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Dict, Any
+from models.database import Meeting, split_participants
+
+MEETING_STATUSES = ("scheduled", "cancelled", "completed")
+
+# Fields accepted from bulk imports, with their maximum string lengths
+MEETING_TEXT_FIELDS = {
+    "title": 255,
+    "description": None,
+    "location": 100,
+    "organizer": 100,
+    "weather_condition": 50,
+}
+
+def parse_datetime(value: Any) -> datetime:
+    """Parse an ISO 8601 string (or pass through a datetime)"""
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("expected an ISO 8601 datetime string")
+    return datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+
+def to_local_naive(value: datetime) -> datetime:
+    """Convert an aware datetime to naive local time, as meetings are stored"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if value in (None, ""):
+        return False
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "y"):
+        return True
+    if text in ("false", "0", "no", "n"):
+        return False
+    raise ValueError(f"invalid boolean: {value!r}")
+
+def validate_meeting_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one imported meeting and return column values ready for insert.
+    
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("row must be an object")
+    
+    row = {}
+    for field, max_length in MEETING_TEXT_FIELDS.items():
+        value = raw.get(field)
+        if value in (None, ""):
+            continue
+        value = str(value).strip()
+        if max_length and len(value) > max_length:
+            raise ValueError(f"{field} longer than {max_length} characters")
+        row[field] = value
+    
+    if not row.get("title"):
+        raise ValueError("title is required")
+    
+    try:
+        row["scheduled_time"] = parse_datetime(raw.get("scheduled_time"))
+    except ValueError as e:
+        raise ValueError(f"scheduled_time: {e}")
+    
+    duration = raw.get("duration_minutes")
+    if duration in (None, ""):
+        row["duration_minutes"] = 60
+    else:
+        try:
+            row["duration_minutes"] = int(duration)
+        except (TypeError, ValueError):
+            raise ValueError(f"duration_minutes must be an integer, got {duration!r}")
+        if row["duration_minutes"] <= 0:
+            raise ValueError("duration_minutes must be positive")
+    
+    status = str(raw.get("status") or "scheduled").strip().lower()
+    if status not in MEETING_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(MEETING_STATUSES)}")
+    row["status"] = status
+    
+    row["weather_checked"] = parse_bool(raw.get("weather_checked"))
+    
+    emails = split_participants(raw.get("participants"))
+    row["participants"] = ",".join(emails) if emails else None
+    
+    if raw.get("recurrence_rule"):
+        series = Meeting(scheduled_time=row["scheduled_time"], duration_minutes=row["duration_minutes"])
+        series.set_recurrence(str(raw["recurrence_rule"]))
+        row["recurrence_rule"] = series.recurrence_rule
+        row["recurrence_end"] = series.recurrence_end
+    
+    return row